@@ -0,0 +1,3 @@
+from kabosu_core.io.tts.bigvgan.config import BigVGANConfig
+from kabosu_core.io.tts.bigvgan.runtime import BACKENDS, Vocoder, VocoderStream, export_onnx
+
@@ -0,0 +1,69 @@
+"""BigVGAN の生成器のハイパーパラメータ。torch なしで読めるよう model.py とは分けてある"""
+
+from dataclasses import dataclass, field, fields
+import json
+import math
+from pathlib import Path
+
+
+@dataclass
+class BigVGANConfig:
+    """
+    BigVGAN の config.json のうち，推論に使う項目
+
+    学習用の項目 (batch_size や discriminator の設定など) は読み込むときに捨てる。
+    """
+    num_mels: int = 100
+    upsample_rates: list[int] = field(default_factory=lambda: [4, 4, 2, 2, 2, 2])
+    upsample_kernel_sizes: list[int] = field(default_factory=lambda: [8, 8, 4, 4, 4, 4])
+    upsample_initial_channel: int = 1536
+    resblock: str = "1"
+    resblock_kernel_sizes: list[int] = field(default_factory=lambda: [3, 7, 11])
+    resblock_dilation_sizes: list[list[int]] = field(default_factory=lambda: [[1, 3, 5], [1, 3, 5], [1, 3, 5]])
+    activation: str = "snakebeta"
+    snake_logscale: bool = True
+    use_tanh_at_final: bool = True
+    use_bias_at_final: bool = True
+    sampling_rate: int = 24000
+    hop_size: int = 256
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BigVGANConfig":
+        names = {f.name for f in fields(cls)}
+        config = cls(**{key: value for key, value in data.items() if key in names})
+        if math.prod(config.upsample_rates) != config.hop_size:
+            raise ValueError(f"product of upsample_rates {config.upsample_rates} does not match hop_size {config.hop_size}")
+        return config
+
+    @classmethod
+    def from_json(cls, path: Path | str) -> "BigVGANConfig":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def to_json(self, path: Path | str) -> None:
+        Path(path).write_text(json.dumps(self.__dict__, indent=4), encoding="utf-8")
+
+    @property
+    def receptive_field(self) -> int:
+        """
+        出力の 1 サンプルが片側で何フレーム先 (前) のメルスペクトログラムまで参照するかの上限
+
+        チャンクごとに合成するとき，前後にこのフレーム数の文脈を付ければ一括で合成した場合と同じ出力になる。
+        """
+        # エイリアス除去付きの活性化は 2 倍にアップサンプルして 12 タップのフィルタを 2 回かけるので，片側 6 サンプル
+        activation = 6
+        frames = 3.0  # conv_pre
+        rate = 1
+        for upsample_rate, kernel_size in zip(self.upsample_rates, self.upsample_kernel_sizes):
+            frames += math.ceil(kernel_size / upsample_rate) / rate
+            rate *= upsample_rate
+            resblock = 0
+            for kernel, dilations in zip(self.resblock_kernel_sizes, self.resblock_dilation_sizes):
+                span = 0
+                for dilation in dilations:
+                    span += activation + (kernel - 1) * dilation // 2
+                    if self.resblock == "1":
+                        span += activation + (kernel - 1) // 2
+                resblock = max(resblock, span)  # 各 resblock は並列なので一番広いもの
+            frames += resblock / rate
+        frames += (activation + 3) / rate  # activation_post と conv_post
+        return math.ceil(frames)
@@ -0,0 +1,238 @@
+# BigVGAN (https://github.com/NVIDIA/BigVGAN, MIT License) の生成器を CPU での推論用に移植したもの。
+# パラメータの名前は元の実装と同じなので，公開されているチェックポイントの "generator" をそのまま読める。
+# weight norm は読み込むときに重みへ畳み込み，CUDA カーネルや学習用のコードは持たない。
+
+import math
+from pathlib import Path
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+from kabosu_core.io.tts.bigvgan.config import BigVGANConfig
+
+
+class Snake(nn.Module):
+    """x + 1/a * sin^2(a x)"""
+    def __init__(self, channels: int, alpha_logscale: bool = False):
+        super().__init__()
+        self.alpha_logscale = alpha_logscale
+        self.alpha = nn.Parameter(torch.zeros(channels) if alpha_logscale else torch.ones(channels))
+
+    def forward(self, x):
+        alpha = self.alpha[None, :, None]
+        if self.alpha_logscale:
+            alpha = torch.exp(alpha)
+        return x + (1.0 / (alpha + 1e-9)) * torch.sin(x * alpha) ** 2
+
+
+class SnakeBeta(nn.Module):
+    """x + 1/b * sin^2(a x)"""
+    def __init__(self, channels: int, alpha_logscale: bool = False):
+        super().__init__()
+        self.alpha_logscale = alpha_logscale
+        self.alpha = nn.Parameter(torch.zeros(channels) if alpha_logscale else torch.ones(channels))
+        self.beta = nn.Parameter(torch.zeros(channels) if alpha_logscale else torch.ones(channels))
+
+    def forward(self, x):
+        alpha = self.alpha[None, :, None]
+        beta = self.beta[None, :, None]
+        if self.alpha_logscale:
+            alpha = torch.exp(alpha)
+            beta = torch.exp(beta)
+        return x + (1.0 / (beta + 1e-9)) * torch.sin(x * alpha) ** 2
+
+
+def kaiser_sinc_filter1d(cutoff: float, half_width: float, kernel_size: int) -> torch.Tensor:
+    """カイザー窓をかけた sinc の低域通過フィルタ。形は [1, 1, kernel_size]"""
+    half_size = kernel_size // 2
+    delta_f = 4 * half_width
+    attenuation = 2.285 * (half_size - 1) * math.pi * delta_f + 7.95
+    if attenuation > 50.0:
+        beta = 0.1102 * (attenuation - 8.7)
+    elif attenuation >= 21.0:
+        beta = 0.5842 * (attenuation - 21) ** 0.4 + 0.07886 * (attenuation - 21.0)
+    else:
+        beta = 0.0
+    window = torch.kaiser_window(kernel_size, beta=beta, periodic=False)
+    if kernel_size % 2 == 0:
+        time = torch.arange(-half_size, half_size) + 0.5
+    else:
+        time = torch.arange(kernel_size) - half_size
+    filter_ = 2 * cutoff * window * torch.sinc(2 * cutoff * time)
+    filter_ /= filter_.sum()  # 直流成分が漏れないよう和を 1 にする
+    return filter_.view(1, 1, kernel_size)
+
+
+# チャンネル数は引数で固定しておく (入力の形から取ると ONNX に書き出せない)
+class UpSample1d(nn.Module):
+    def __init__(self, channels: int, ratio: int = 2, kernel_size: int = 12):
+        super().__init__()
+        self.channels = channels
+        self.ratio = ratio
+        self.pad = kernel_size // ratio - 1
+        self.pad_left = self.pad * ratio + (kernel_size - ratio) // 2
+        self.pad_right = self.pad * ratio + (kernel_size - ratio + 1) // 2
+        self.register_buffer("filter", kaiser_sinc_filter1d(0.5 / ratio, 0.6 / ratio, kernel_size))
+
+    def forward(self, x):
+        x = F.pad(x, (self.pad, self.pad), mode="replicate")
+        x = self.ratio * F.conv_transpose1d(x, self.filter.expand(self.channels, -1, -1), stride=self.ratio, groups=self.channels)
+        return x[..., self.pad_left:-self.pad_right]
+
+
+class LowPassFilter1d(nn.Module):
+    def __init__(self, channels: int, cutoff: float, half_width: float, stride: int, kernel_size: int = 12):
+        super().__init__()
+        self.channels = channels
+        self.stride = stride
+        self.pad_left = kernel_size // 2 - int(kernel_size % 2 == 0)
+        self.pad_right = kernel_size // 2
+        self.register_buffer("filter", kaiser_sinc_filter1d(cutoff, half_width, kernel_size))
+
+    def forward(self, x):
+        x = F.pad(x, (self.pad_left, self.pad_right), mode="replicate")
+        return F.conv1d(x, self.filter.expand(self.channels, -1, -1), stride=self.stride, groups=self.channels)
+
+
+class DownSample1d(nn.Module):
+    def __init__(self, channels: int, ratio: int = 2, kernel_size: int = 12):
+        super().__init__()
+        self.lowpass = LowPassFilter1d(channels, 0.5 / ratio, 0.6 / ratio, stride=ratio, kernel_size=kernel_size)
+
+    def forward(self, x):
+        return self.lowpass(x)
+
+
+class Activation1d(nn.Module):
+    """2 倍にアップサンプルしてから活性化関数をかけ，元に戻す (エイリアス除去)"""
+    def __init__(self, activation: nn.Module, channels: int):
+        super().__init__()
+        self.act = activation
+        self.upsample = UpSample1d(channels)
+        self.downsample = DownSample1d(channels)
+
+    def forward(self, x):
+        return self.downsample(self.act(self.upsample(x)))
+
+
+def _activation(config: BigVGANConfig, channels: int) -> nn.Module:
+    if config.activation == "snake":
+        return Snake(channels, alpha_logscale=config.snake_logscale)
+    if config.activation == "snakebeta":
+        return SnakeBeta(channels, alpha_logscale=config.snake_logscale)
+    raise ValueError(f"unknown activation: {config.activation}")
+
+
+def _padding(kernel_size: int, dilation: int = 1) -> int:
+    return (kernel_size * dilation - dilation) // 2
+
+
+class AMPBlock1(nn.Module):
+    def __init__(self, config: BigVGANConfig, channels: int, kernel_size: int, dilation: list[int]):
+        super().__init__()
+        self.convs1 = nn.ModuleList(
+            [nn.Conv1d(channels, channels, kernel_size, dilation=d, padding=_padding(kernel_size, d)) for d in dilation]
+        )
+        self.convs2 = nn.ModuleList(
+            [nn.Conv1d(channels, channels, kernel_size, padding=_padding(kernel_size)) for _ in dilation]
+        )
+        self.activations = nn.ModuleList(
+            [Activation1d(_activation(config, channels), channels) for _ in range(2 * len(dilation))]
+        )
+
+    def forward(self, x):
+        for c1, c2, a1, a2 in zip(self.convs1, self.convs2, self.activations[::2], self.activations[1::2]):
+            x = x + c2(a2(c1(a1(x))))
+        return x
+
+
+class AMPBlock2(nn.Module):
+    def __init__(self, config: BigVGANConfig, channels: int, kernel_size: int, dilation: list[int]):
+        super().__init__()
+        self.convs = nn.ModuleList(
+            [nn.Conv1d(channels, channels, kernel_size, dilation=d, padding=_padding(kernel_size, d)) for d in dilation]
+        )
+        self.activations = nn.ModuleList([Activation1d(_activation(config, channels), channels) for _ in dilation])
+
+    def forward(self, x):
+        for c, a in zip(self.convs, self.activations):
+            x = x + c(a(x))
+        return x
+
+
+class BigVGAN(nn.Module):
+    """
+    メルスペクトログラム [batch, num_mels, frames] から波形 [batch, 1, frames * hop_size] を合成する
+    """
+    def __init__(self, config: BigVGANConfig):
+        super().__init__()
+        self.config = config
+        if config.resblock == "1":
+            resblock_class = AMPBlock1
+        elif config.resblock == "2":
+            resblock_class = AMPBlock2
+        else:
+            raise ValueError(f"unknown resblock: {config.resblock}")
+        self.num_kernels = len(config.resblock_kernel_sizes)
+
+        self.conv_pre = nn.Conv1d(config.num_mels, config.upsample_initial_channel, 7, 1, padding=3)
+        self.ups = nn.ModuleList()
+        self.resblocks = nn.ModuleList()
+        for i, (u, k) in enumerate(zip(config.upsample_rates, config.upsample_kernel_sizes)):
+            channels = config.upsample_initial_channel // (2 ** (i + 1))
+            # 元の実装に合わせて ModuleList に包む (パラメータ名が ups.0.0.weight になる)
+            self.ups.append(nn.ModuleList([
+                nn.ConvTranspose1d(config.upsample_initial_channel // (2 ** i), channels, k, u, padding=(k - u) // 2)
+            ]))
+            for kernel_size, dilation in zip(config.resblock_kernel_sizes, config.resblock_dilation_sizes):
+                self.resblocks.append(resblock_class(config, channels, kernel_size, dilation))
+
+        self.activation_post = Activation1d(_activation(config, channels), channels)
+        self.conv_post = nn.Conv1d(channels, 1, 7, 1, padding=3, bias=config.use_bias_at_final)
+
+    def forward(self, x):
+        x = self.conv_pre(x)
+        for i, up in enumerate(self.ups):
+            x = up[0](x)
+            xs = self.resblocks[i * self.num_kernels](x)
+            for j in range(1, self.num_kernels):
+                xs = xs + self.resblocks[i * self.num_kernels + j](x)
+            x = xs / self.num_kernels
+        x = self.conv_post(self.activation_post(x))
+        if self.config.use_tanh_at_final:
+            return torch.tanh(x)
+        return torch.clamp(x, min=-1.0, max=1.0)
+
+
+def fold_weight_norm(state_dict: dict) -> dict:
+    """
+    weight norm のパラメータ (weight_g, weight_v または parametrizations.weight.original0/1) を普通の weight にする
+    """
+    folded = {}
+    for key, value in state_dict.items():
+        if key.endswith(".weight_g") or key.endswith(".parametrizations.weight.original0"):
+            continue
+        if key.endswith(".weight_v"):
+            prefix = key[:-len(".weight_v")]
+            g = state_dict[prefix + ".weight_g"]
+        elif key.endswith(".parametrizations.weight.original1"):
+            prefix = key[:-len(".parametrizations.weight.original1")]
+            g = state_dict[prefix + ".parametrizations.weight.original0"]
+        else:
+            folded[key] = value
+            continue
+        # weight norm の dim=0 について，それ以外の軸のノルムで割る
+        norm = value.flatten(1).norm(dim=1).view(-1, *([1] * (value.dim() - 1)))
+        folded[prefix + ".weight"] = g * value / norm
+    return folded
+
+
+def load_model(checkpoint_path: Path | str, config: BigVGANConfig) -> BigVGAN:
+    """チェックポイントを読んで推論用 (eval) のモデルを返す。学習時のチェックポイントなら "generator" を使う"""
+    state_dict = torch.load(checkpoint_path, map_location="cpu", weights_only=True)
+    if "generator" in state_dict:
+        state_dict = state_dict["generator"]
+    model = BigVGAN(config)
+    model.load_state_dict(fold_weight_norm(state_dict))
+    return model.eval()
@@ -0,0 +1,194 @@
+"""
+BigVGAN でメルスペクトログラムから波形を合成する CPU 向けの実行環境
+
+音響モデルがメルスペクトログラムを出し終わるのを待たず，チャンクごとに合成して波形を流す。
+各チャンクの前後に receptive_field フレームの文脈を付けて合成し，文脈の部分を捨てるので，
+出力は一括で合成したものと (浮動小数点の誤差を除いて) 同じになる。
+
+>>> vocoder = Vocoder("bigvgan_generator.pt", num_threads=2)
+>>> stream = vocoder.stream(chunk_frames=32)
+>>> for mel in acoustic_model_outputs:  # [num_mels, フレーム数] を少しずつ
+...     play(stream.push(mel))
+>>> play(stream.flush())
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from kabosu_core.io.tts.bigvgan.config import BigVGANConfig
+
+BACKENDS = ("torch", "onnx")
+
+
+def _config_path(checkpoint_path: Path) -> Path:
+    return checkpoint_path.parent / "config.json"
+
+
+def export_onnx(checkpoint_path: Path | str, config_path: Path | str | None = None, onnx_path: Path | str | None = None) -> Path:
+    """
+    チェックポイントを ONNX に書き出す。既定の書き出し先はチェックポイントの拡張子を .onnx にしたもの
+
+    入力は "mel" [batch, num_mels, frames]，出力は "audio" [batch, 1, frames * hop_size] で，フレーム数は可変。
+    """
+    import torch
+
+    from kabosu_core.io.tts.bigvgan.model import load_model
+
+    checkpoint_path = Path(checkpoint_path)
+    config = BigVGANConfig.from_json(config_path or _config_path(checkpoint_path))
+    model = load_model(checkpoint_path, config)
+    onnx_path = Path(onnx_path) if onnx_path is not None else checkpoint_path.with_suffix(".onnx")
+    dummy = torch.zeros((1, config.num_mels, 2 * config.receptive_field + 1))
+    torch.onnx.export(
+        model,
+        (dummy,),
+        str(onnx_path),
+        input_names=["mel"],
+        output_names=["audio"],
+        dynamic_axes={"mel": {0: "batch", 2: "frames"}, "audio": {0: "batch", 2: "samples"}},
+        opset_version=17,
+        dynamo=False,
+    )
+    return onnx_path
+
+
+class Vocoder:
+    """
+    Args:
+        checkpoint_path: BigVGAN の生成器のチェックポイント (学習時の "generator" を含むものでもよい)
+        config_path: config.json。省略するとチェックポイントと同じディレクトリのもの
+        backend (str): "torch" か "onnx"。onnx は export_onnx で書き出したモデルを onnxruntime で動かす
+        onnx_path: backend="onnx" のときのモデル。省略するとチェックポイントの拡張子を .onnx にしたもの
+        num_threads (int | None): 演算に使うスレッド数。torch ではプロセス全体の設定になる
+    """
+    def __init__(
+        self,
+        checkpoint_path: Path | str,
+        config_path: Path | str | None = None,
+        backend: str = "torch",
+        onnx_path: Path | str | None = None,
+        num_threads: int | None = None
+        ):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend should be one of {BACKENDS}, but got {backend}")
+        checkpoint_path = Path(checkpoint_path)
+        self.config = BigVGANConfig.from_json(config_path or _config_path(checkpoint_path))
+        self.backend = backend
+
+        if backend == "onnx":
+            import onnxruntime
+
+            onnx_path = Path(onnx_path) if onnx_path is not None else checkpoint_path.with_suffix(".onnx")
+            if not onnx_path.exists():
+                raise FileNotFoundError(f"{onnx_path} does not exist. Export it with export_onnx({str(checkpoint_path)!r})")
+            session_options = onnxruntime.SessionOptions()
+            if num_threads is not None:
+                session_options.intra_op_num_threads = num_threads
+            self.session = onnxruntime.InferenceSession(
+                str(onnx_path), sess_options=session_options, providers=["CPUExecutionProvider"]
+            )
+        else:
+            import torch
+
+            from kabosu_core.io.tts.bigvgan.model import load_model
+
+            if num_threads is not None:
+                torch.set_num_threads(num_threads)
+            self.model = load_model(checkpoint_path, self.config)
+
+    @property
+    def hop_size(self) -> int:
+        return self.config.hop_size
+
+    @property
+    def sampling_rate(self) -> int:
+        return self.config.sampling_rate
+
+    def __call__(self, mel: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            mel (np.ndarray): [num_mels, frames] のメルスペクトログラム
+
+        Returns:
+            np.ndarray: frames * hop_size サンプルの float32 の波形
+        """
+        mel = np.ascontiguousarray(mel, dtype=np.float32)[None]
+        if self.backend == "onnx":
+            audio = self.session.run(["audio"], {"mel": mel})[0]
+        else:
+            import torch
+
+            with torch.inference_mode():
+                audio = self.model(torch.from_numpy(mel)).numpy()
+        return audio[0, 0]
+
+    def stream(self, chunk_frames: int = 32, context_frames: int | None = None) -> "VocoderStream":
+        return VocoderStream(self, chunk_frames=chunk_frames, context_frames=context_frames)
+
+    def synthesize_stream(self, mels: Iterable[np.ndarray], chunk_frames: int = 32,
+                          context_frames: int | None = None) -> Iterator[np.ndarray]:
+        """メルスペクトログラムの断片を受け取るたびに，合成できた分の波形を返す"""
+        stream = self.stream(chunk_frames=chunk_frames, context_frames=context_frames)
+        for mel in mels:
+            audio = stream.push(mel)
+            if len(audio):
+                yield audio
+        audio = stream.flush()
+        if len(audio):
+            yield audio
+
+
+class VocoderStream:
+    """
+    メルスペクトログラムを少しずつ受け取り，chunk_frames フレームずつ合成する
+
+    合成済みの位置より前の context_frames フレームだけを保持し，それより古いものは捨てる。
+    チャンクを合成するには後ろに context_frames フレームが届いている必要があるので，
+    遅延は (chunk_frames + context_frames) フレームになる。
+
+    Args:
+        chunk_frames (int): 1 回に合成するフレーム数
+        context_frames (int | None): チャンクの前後に付けるフレーム数。省略すると receptive_field で，
+            一括で合成した場合と同じ出力になる。小さくすると速くなるが，チャンクの境目で出力が変わる
+    """
+    def __init__(self, vocoder: Vocoder, chunk_frames: int = 32, context_frames: int | None = None):
+        if chunk_frames <= 0:
+            raise ValueError("chunk_frames must be positive")
+        self.vocoder = vocoder
+        self.chunk_frames = chunk_frames
+        self.context_frames = vocoder.config.receptive_field if context_frames is None else context_frames
+        self._buffer = np.zeros((vocoder.config.num_mels, 0), dtype=np.float32)
+        self._offset = 0  # _buffer の先頭が全体の何フレーム目か
+        self._done = 0  # 合成し終わったフレーム数
+
+    def push(self, mel: np.ndarray) -> np.ndarray:
+        """[num_mels, frames] を追加し，合成できた分の波形を返す (無ければ長さ 0)"""
+        self._buffer = np.concatenate([self._buffer, np.asarray(mel, dtype=np.float32)], axis=1)
+        outputs = []
+        while self._offset + self._buffer.shape[1] >= self._done + self.chunk_frames + self.context_frames:
+            outputs.append(self._synthesize(self._done + self.chunk_frames))
+        return np.concatenate(outputs) if outputs else np.zeros(0, dtype=np.float32)
+
+    def flush(self) -> np.ndarray:
+        """残りのフレームをすべて合成する"""
+        end = self._offset + self._buffer.shape[1]
+        if end <= self._done:
+            return np.zeros(0, dtype=np.float32)
+        return self._synthesize(end)
+
+    def _synthesize(self, end: int) -> np.ndarray:
+        """self._done から end までのフレームを，前後の文脈を付けて合成する"""
+        start = max(self._done - self.context_frames, self._offset)
+        stop = min(end + self.context_frames, self._offset + self._buffer.shape[1])
+        audio = self.vocoder(self._buffer[:, start - self._offset:stop - self._offset])
+        hop = self.vocoder.hop_size
+        audio = audio[(self._done - start) * hop:(end - start) * hop]
+
+        self._done = end
+        # 次のチャンクの左の文脈だけを残す
+        keep_from = max(self._done - self.context_frames, self._offset)
+        self._buffer = self._buffer[:, keep_from - self._offset:]
+        self._offset = keep_from
+        return audio
@@ -0,0 +1,179 @@
+"""
+フルコンテキストラベルを音響モデルに渡す整数の配列にする
+
+ラベルを 1 つずつ正規表現で解析する代わりに，バッチのラベルをまとめて 1 回の正規表現で読み，
+数値への変換・音素 ID の引き当て・アクセントや境界の計算はすべて NumPy の配列演算で行う。
+出力は (バッチ, 最大音素数) にパディングした int64 の配列で，to_torch() でコピーせずに torch に渡せる。
+
+>>> batch = encode_labels([extract_fullcontext("こんにちは。"), extract_fullcontext("ヒホです？")])
+>>> batch.phonemes.shape, batch.lengths
+((2, 12), array([12, 10]))
+>>> tensors = batch.to_torch()
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import torch
+
+    from kabosu_core.language.types import NjdObject
+
+# 音素の表。ID は学習済みのモデルと対応するので，並びは変えずに末尾へ追加すること
+PHONEMES = (
+    "<pad>", "<unk>", "sil", "pau",
+    "a", "i", "u", "e", "o", "A", "I", "U", "E", "O", "N", "cl",
+    "b", "by", "ch", "d", "dy", "f", "g", "gw", "gy", "h", "hy", "j", "k", "kw", "ky",
+    "m", "my", "n", "ny", "p", "py", "r", "ry", "s", "sh", "t", "ts", "ty", "v", "w", "y", "z",
+)
+PHONEME_TO_ID = {phoneme: i for i, phoneme in enumerate(PHONEMES)}
+PAD_ID = PHONEME_TO_ID["<pad>"]
+UNK_ID = PHONEME_TO_ID["<unk>"]
+
+# 音素の後ろに付く韻律の記号 (pyopenjtalk_g2p_prosody の "#", "[", "]" に当たる)
+PROSODY_NONE = 0
+PROSODY_PHRASE_BOUNDARY = 1  # アクセント句の境界 "#"
+PROSODY_RISE = 2  # ピッチの上昇 "["
+PROSODY_FALL = 3  # ピッチの下降 "]"
+
+# p3 (音素), a1, a2, a3, e3 (疑問文か), f1 (アクセント句のモーラ数), f2 (アクセント型)
+_LABEL_PATTERN = re.compile(
+    r"^[^\^\n]*\^[^-\n]*-([^+\n]+)\+[^/\n]*/A:([^+\n]+)\+([^+\n]+)\+([^/\n]+)"
+    r"/B:[^/\n]*/C:[^/\n]*/D:[^/\n]*/E:[^!\n]*!([^_\n]+)_[^/\n]*/F:([^_\n]+)_([^#\n]+)#",
+    re.MULTILINE,
+)
+_UNVOICED_VOWELS = {"A": "a", "I": "i", "U": "u", "E": "e", "O": "o"}
+_MORA_END = {"a", "i", "u", "e", "o", "A", "I", "U", "E", "O", "N", "cl"}
+
+
+@dataclass
+class FrontendBatch:
+    """
+    パディングしたバッチ。音素に対応する配列はすべて (バッチ, 最大音素数) の int64 で，パディングは 0
+
+    Args:
+        phonemes: PHONEMES の ID。文頭と文末の sil を含む
+        accents: アクセント核から決まる高 (1) 低 (0)。sil と pau は 0
+        prosody: 音素の後ろの韻律の記号 (PROSODY_*)
+        mora_positions: アクセント句の中で何モーラ目か (1 始まり)。sil と pau は 0
+        mora_positions_backward: アクセント句の中で後ろから何モーラ目か (1 始まり)。sil と pau は 0
+        lengths: 各発話の音素数
+        is_question: 疑問文 (文末が "?") か
+    """
+    phonemes: np.ndarray
+    accents: np.ndarray
+    prosody: np.ndarray
+    mora_positions: np.ndarray
+    mora_positions_backward: np.ndarray
+    lengths: np.ndarray
+    is_question: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def mask(self) -> np.ndarray:
+        """音素がある位置が True の (バッチ, 最大音素数) の配列"""
+        return np.arange(self.phonemes.shape[1]) < self.lengths[:, None]
+
+    def to_torch(self) -> dict[str, "torch.Tensor"]:
+        """各配列とメモリを共有する torch.Tensor を返す"""
+        import torch
+
+        return {field.name: torch.from_numpy(getattr(self, field.name)) for field in fields(self)}
+
+
+def encode_labels(labels_batch: Sequence[Sequence[str]], drop_unvoiced_vowels: bool = True) -> FrontendBatch:
+    """
+    Args:
+        labels_batch: 発話ごとのフルコンテキストラベル (extract_fullcontext や make_label の出力) の列
+        drop_unvoiced_vowels (bool): 無声化した母音 (A I U E O) を有声の母音として扱う
+
+    Returns:
+        FrontendBatch: パディングしたバッチ
+    """
+    lengths = np.fromiter((len(labels) for labels in labels_batch), dtype=np.int64, count=len(labels_batch))
+    text = "\n".join(label for labels in labels_batch for label in labels)
+    matched = _LABEL_PATTERN.findall(text)
+    if len(matched) != lengths.sum():
+        raise ValueError("some labels are not in the full-context label format")
+    if not matched:
+        empty = np.zeros((len(lengths), 0), dtype=np.int64)
+        return FrontendBatch(empty, empty, empty, empty, empty, lengths, np.zeros(len(lengths), dtype=bool))
+
+    phoneme_names, *number_columns = zip(*matched)
+    # 数値の項目をまとめて 1 つの文字列にし，C で一度に読む。値の無い項目 (sil や pau) は 0
+    numbers = ",".join(",".join(column) for column in number_columns).replace("xx", "0")
+    a1, a2, a3, e3, f1, f2 = np.fromstring(numbers, dtype=np.int64, sep=",").reshape(6, -1)
+
+    # 音素の種類は少ないので，種類ごとに一度だけ表を引く
+    names, inverse = np.unique(np.array(phoneme_names), return_inverse=True)
+    if drop_unvoiced_vowels:
+        ids = [PHONEME_TO_ID.get(_UNVOICED_VOWELS.get(name, name), UNK_ID) for name in names]
+    else:
+        ids = [PHONEME_TO_ID.get(name, UNK_ID) for name in names]
+    phonemes = np.array(ids, dtype=np.int64)[inverse.reshape(-1)]
+    is_phone = (phonemes != PHONEME_TO_ID["sil"]) & (phonemes != PHONEME_TO_ID["pau"])
+    mora_end = np.isin(names, list(_MORA_END))[inverse.reshape(-1)]
+
+    # 東京方言のアクセント: 1 モーラ目は 1 型のときだけ高く，2 モーラ目以降はアクセント核まで高い (0 型は最後まで)
+    accents = np.where(a2 == 1, f2 == 1, (f2 == 0) | (a2 <= f2)) & is_phone
+
+    # 次の音素の a2。各発話は sil で終わり，sil の a2 は 0 なので発話をまたいでも条件は成り立たない
+    a2_next = np.append(a2[1:], 0)
+    prosody = np.select(
+        [
+            (a3 == 1) & (a2_next == 1) & mora_end,
+            (a1 == 0) & (a2_next == a2 + 1) & (a2 != f1),
+            (a2 == 1) & (a2_next == 2),
+        ],
+        [PROSODY_PHRASE_BOUNDARY, PROSODY_FALL, PROSODY_RISE],
+        PROSODY_NONE,
+    ) * is_phone
+
+    # 文末の sil の e3 は直前のアクセント句が疑問形か
+    ends = np.cumsum(lengths) - 1
+    is_question = np.zeros(len(lengths), dtype=bool)
+    nonempty = lengths > 0
+    is_question[nonempty] = e3[ends[nonempty]] == 1
+
+    return FrontendBatch(
+        phonemes=_pad(phonemes, lengths),
+        accents=_pad(accents.astype(np.int64), lengths),
+        prosody=_pad(prosody.astype(np.int64), lengths),
+        mora_positions=_pad(a2 * is_phone, lengths),
+        mora_positions_backward=_pad(a3 * is_phone, lengths),
+        lengths=lengths,
+        is_question=is_question,
+    )
+
+
+def _pad(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """連結された発話ごとの値を (バッチ, 最大長) に並べ直す"""
+    padded = np.zeros((len(lengths), lengths.max(initial=0)), dtype=values.dtype)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    padded[rows, np.arange(len(values)) - np.repeat(starts, lengths)] = values
+    return padded
+
+
+def encode_njd(njd_features_batch: Sequence[list["NjdObject"]], drop_unvoiced_vowels: bool = True) -> FrontendBatch:
+    """run_frontend の出力の列からバッチを作る"""
+    from kabosu_core.language import make_label
+
+    return encode_labels([make_label(njd_features) for njd_features in njd_features_batch],
+                         drop_unvoiced_vowels=drop_unvoiced_vowels)
+
+
+def encode_text(texts: Sequence[str], drop_unvoiced_vowels: bool = True, **frontend_options) -> FrontendBatch:
+    """
+    文の列からバッチを作る。frontend_options は extract_fullcontext に渡す (run_marine など)
+    """
+    from kabosu_core.language import extract_fullcontext
+
+    return encode_labels([extract_fullcontext(text, **frontend_options) for text in texts],
+                         drop_unvoiced_vowels=drop_unvoiced_vowels)
@@ -20,59 +20,234 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from pydub import AudioSegment
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+import struct
+import zipfile
 import librosa
 import soundfile as sf
 from pathlib import Path
 import numpy as np
 from scipy import interpolate
 from scipy.ndimage import zoom
+from scipy.signal import lfilter
 
 import pyworld as pw
 
+@dataclass
+class WorldFeatures:
+    """
+    WORLD で分析した音声の特徴量
+
+    一度分析したものを save で .npz に保存し，load で読み戻して使い回せる。
+
+    Args:
+        f0 (np.ndarray): stonemask で修正した基本周波数
+        sp (np.ndarray): スペクトル包絡
+        ap (np.ndarray): 非周期性指標
+        samplerate (int): サンプリング周波数
+        frame_period (float): フレーム周期 (ミリ秒)
+        raw_f0 (np.ndarray | None): 修正前の基本周波数
+    """
+    f0: np.ndarray
+    sp: np.ndarray
+    ap: np.ndarray
+    samplerate: int
+    frame_period: float = pw.default_frame_period
+    raw_f0: np.ndarray | None = None
+
+    @classmethod
+    def analyze(
+        cls,
+        raw_wave: np.ndarray,
+        samplerate: int,
+        f0_method: str = "dio",
+        fft_size: int | None = None,
+        frame_period: float = pw.default_frame_period
+        ) -> "WorldFeatures":
+        """
+        Args:
+            f0_method (str): 基本周波数の抽出に "dio" (速い) か "harvest" (高精度) を使う
+            fft_size (int | None): cheaptrick と d4c の FFT 長。小さくすると速くなるが周波数分解能が下がる
+        """
+        raw_wave = np.asarray(raw_wave, dtype=np.float64)  # pyworld は float64 のみ
+        if f0_method == "dio":
+            _f0, t = pw.dio(raw_wave, samplerate, frame_period=frame_period)  # 基本周波数の抽出 
+        elif f0_method == "harvest":
+            _f0, t = pw.harvest(raw_wave, samplerate, frame_period=frame_period)  # 基本周波数の抽出 
+        else:
+            raise ValueError(f"unknown f0_method: {f0_method}")
+        f0 = pw.stonemask(raw_wave, _f0, t, samplerate)  # 基本周波数の修正 
+        sp = pw.cheaptrick(raw_wave, f0, t, samplerate, fft_size=fft_size)  # スペクトル包絡の抽出 
+        ap = pw.d4c(raw_wave, f0, t, samplerate, fft_size=fft_size)  # 非周期性指標の抽出
+        return cls(f0=f0, sp=sp, ap=ap, samplerate=samplerate, frame_period=frame_period, raw_f0=_f0)
+
+    def synthesize(self, f0: np.ndarray | None = None, sp: np.ndarray | None = None, ap: np.ndarray | None = None) -> np.ndarray:
+        return pw.synthesize(
+            np.ascontiguousarray(self.f0 if f0 is None else f0, dtype=np.float64),
+            np.ascontiguousarray(self.sp if sp is None else sp, dtype=np.float64),
+            np.ascontiguousarray(self.ap if ap is None else ap, dtype=np.float64),
+            self.samplerate,
+            frame_period=self.frame_period
+        )
+
+    def save(self, path: Path | str, compress: bool = True) -> None:
+        """compress=False で保存すると load(mmap_mode="r") でメモリマップして読める"""
+        arrays = {"f0": self.f0, "sp": self.sp, "ap": self.ap,
+                  "samplerate": np.array(self.samplerate), "frame_period": np.array(self.frame_period)}
+        if self.raw_f0 is not None:
+            arrays["raw_f0"] = self.raw_f0
+        with open(path, "wb") as f:  # np.savez は拡張子 .npz を付け足すのでファイルで渡す
+            (np.savez_compressed if compress else np.savez)(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path | str, mmap_mode: str | None = None) -> "WorldFeatures":
+        """mmap_mode を指定すると，無圧縮で保存された配列をメモリマップする"""
+        arrays = _load_npz(path, mmap_mode)
+        return cls(f0=arrays["f0"], sp=arrays["sp"], ap=arrays["ap"],
+                   samplerate=int(arrays["samplerate"]), frame_period=float(arrays["frame_period"]),
+                   raw_f0=arrays.get("raw_f0"))
+
+
+def _load_npz(path: Path | str, mmap_mode: str | None = None) -> dict:
+    """np.load は .npz をメモリマップしないので，無圧縮のメンバーは自分で np.memmap する"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename.removesuffix(".npy")
+            if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # ローカルファイルヘッダの後ろに .npy がそのまま置かれている
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, shape=shape,
+                                     order="F" if fortran_order else "C", offset=f.tell())
+    return arrays
+
+
+def _as_world_features(source, f0_method: str = "dio", fft_size: int | None = None) -> WorldFeatures:
+    """WorldFeatures，保存した .npz，または WAV ファイルから WorldFeatures を得る"""
+    if isinstance(source, WorldFeatures):
+        return source
+    if Path(source).suffix == ".npz":
+        return WorldFeatures.load(source, mmap_mode="r")
+    raw_wave, samplerate = sf.read(source)
+    return WorldFeatures.analyze(raw_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+
+
 def voicecanger_robot(
     input_wav_path: Path | str,
-    output_wav_path: Path | str
+    output_wav_path: Path | str,
+    f0_method: str = "dio",
+    fft_size: int | None = None
     ):
 
     raw_wave, samplerate = sf.read(input_wav_path) 
-    _f0, t = pw.dio(raw_wave, samplerate)  # 基本周波数の抽出 
-    f0 = pw.stonemask(raw_wave, _f0, t, samplerate)  # 基本周波数の修正 
-    sp = pw.cheaptrick(raw_wave, f0, t, samplerate)  # スペクトル包絡の抽出 
-    ap = pw.d4c(raw_wave, f0, t, samplerate)  # 非周期性指標の抽出
-    
-    synthesized = pw.synthesize(_f0, sp, ap, samplerate)
+    synthesized = voicecanger_robot_ndarray(raw_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
     sf.write(file=output_wav_path, data=synthesized, samplerate=samplerate)
 
+def voicecanger_robot_ndarray(raw_wave, samplerate, f0_method: str = "dio", fft_size: int | None = None):
+    features = WorldFeatures.analyze(raw_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+    # 修正前の基本周波数で合成する
+    return features.synthesize(f0=features.raw_f0)
+
 def merge_wav(
     base_input_wav_path: Path | str,
-    speaker_input_wav_path: Path | str,
-    output_wav_path: Path | str
+    speaker_input_wav_path: Path | str | WorldFeatures,
+    output_wav_path: Path | str,
+    f0_method: str = "dio",
+    fft_size: int | None = None
     ):
+    """speaker_input_wav_path には WAV のほか，WorldFeatures か保存した .npz も渡せる"""
 
-    raw_wave, samplerate = sf.read(speaker_input_wav_path) 
-    _speaker_f0, t = pw.dio(raw_wave, samplerate)  # 基本周波数の抽出 
-    speaker_f0 = pw.stonemask(raw_wave, _speaker_f0, t, samplerate)  # 基本周波数の修正 
-    speaker_sp = pw.cheaptrick(raw_wave, speaker_f0, t, samplerate)  # スペクトル包絡の抽出 
-    speaker_ap = pw.d4c(raw_wave, speaker_f0, t, samplerate)  # 非周期性指標の抽出
-
+    speaker = _as_world_features(speaker_input_wav_path, f0_method=f0_method, fft_size=fft_size)
     raw_wave, samplerate = sf.read(base_input_wav_path) 
-    _base_f0, t = pw.dio(raw_wave, samplerate)  # 基本周波数の抽出 
-    base_f0 = pw.stonemask(raw_wave, _base_f0, t, samplerate)  # 基本周波数の修正 
-    base_sp = pw.cheaptrick(raw_wave, base_f0, t, samplerate)  # スペクトル包絡の抽出 
-    base_ap = pw.d4c(raw_wave, base_f0, t, samplerate)  # 非周期性指標の抽出
+    base = WorldFeatures.analyze(raw_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+    synthesized = merge_features(base, speaker)
+    sf.write(file=output_wav_path, data=synthesized, samplerate=samplerate)
+
+def merge_ndarray(base_wave, speaker_wave, samplerate, f0_method: str = "dio", fft_size: int | None = None):
+    """base_wave の声質を speaker_wave に近づける。speaker_wave は samplerate で読んだものとして扱う。"""
+    speaker = WorldFeatures.analyze(speaker_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+    base = WorldFeatures.analyze(base_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+    return merge_features(base, speaker)
 
-    fix_f0_rate = speaker_f0.mean() / base_f0.mean()
-    fix_sp_rate = speaker_sp.mean() / base_sp.mean()
-    fix_ap_rate = speaker_ap.mean() / base_ap.mean()
+def merge_features(base: WorldFeatures, speaker: WorldFeatures):
+    fix_f0_rate = speaker.f0.mean() / base.f0.mean()
+    fix_sp_rate = speaker.sp.mean() / base.sp.mean()
+    fix_ap_rate = speaker.ap.mean() / base.ap.mean()
 
     convert_rate = 1.0
-    modified_f0 = base_f0 * fix_f0_rate
-    modified_sp = base_sp * (fix_sp_rate * convert_rate) 
-    modified_ap = base_ap * (fix_ap_rate * convert_rate) 
+    modified_f0 = base.f0 * fix_f0_rate
+    modified_sp = base.sp * (fix_sp_rate * convert_rate) 
+    modified_ap = base.ap * (fix_ap_rate * convert_rate) 
+
+    return base.synthesize(modified_f0, modified_sp, modified_ap)
+
+def merge_wav_batch(
+    base_input_wav_paths: Sequence[Path | str],
+    speaker_input_wav_path: Path | str | WorldFeatures,
+    output_dir: Path | str,
+    workers: int = 1,
+    f0_method: str = "dio",
+    fft_size: int | None = None,
+    input_root: Path | str | None = None
+    ) -> list[Path]:
+    """
+    複数の WAV を同じ話者に近づける
 
-    synthesized = pw.synthesize(modified_f0, modified_sp, modified_ap, samplerate)
-    sf.write(file=output_wav_path, data=synthesized, samplerate=samplerate)
+    話者は一度だけ分析し，各ワーカーはそれを使い回す。出力は output_dir/<input_root からの相対パス> に書き出す。
+    input_root を省略すると入力の共通の親ディレクトリを使うので，別のフォルダにある同名のファイルも上書きし合わない。
+
+    Returns:
+        list[Path]: 出力したファイルのパス
+    """
+    speaker = speaker_input_wav_path
+    if not (isinstance(speaker, (str, Path)) and Path(speaker).suffix == ".npz"):
+        speaker = _as_world_features(speaker, f0_method=f0_method, fft_size=fft_size)
+    # 保存済みの .npz はパスのまま渡して各ワーカーでメモリマップする
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    inputs = [Path(path) for path in base_input_wav_paths]
+    if input_root is None:
+        input_root = Path(os.path.commonpath([path.parent.absolute() for path in inputs])) if inputs else Path(".")
+    output_paths = [output_dir / path.absolute().relative_to(Path(input_root).absolute()) for path in inputs]
+    if len(set(output_paths)) != len(output_paths):
+        raise ValueError("the same input wav is given more than once")
+    for parent in {path.parent for path in output_paths}:
+        parent.mkdir(parents=True, exist_ok=True)
+    jobs = list(zip(base_input_wav_paths, output_paths))
+
+    if workers <= 1 or len(jobs) <= 1:
+        _init_merge_worker(speaker, f0_method, fft_size)
+        for job in jobs:
+            _merge_worker(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_merge_worker,
+                                 initargs=(speaker, f0_method, fft_size)) as executor:
+            list(executor.map(_merge_worker, jobs))
+    return output_paths
+
+
+_worker_merge_options = None
+
+def _init_merge_worker(speaker, f0_method, fft_size):
+    global _worker_merge_options
+    _worker_merge_options = (_as_world_features(speaker, f0_method, fft_size), f0_method, fft_size)
+
+def _merge_worker(job):
+    speaker, f0_method, fft_size = _worker_merge_options
+    merge_wav(job[0], speaker, job[1], f0_method=f0_method, fft_size=fft_size)
 
 
 def add_white_noise(
@@ -92,16 +267,17 @@ def convert_to_echo(
     num_echos:int = 3,
     decay:int = 500
     ):
-    audio = AudioSegment.from_wav(input_wav_path)
-    echo_audio = add_echo(audio, delay=delay, num_echos=num_echos, decay=decay)
-    echo_audio.export(output_wav_path, format="wav")
+    raw_wave, samplerate = sf.read(input_wav_path)
+    raw_wave = add_echo_ndarray(raw_wave, samplerate, delay=delay, num_echos=num_echos, decay=decay)
+    sf.write(file=output_wav_path, data=raw_wave, samplerate=samplerate)
 
 def convert_to_youmu(
     input_wav_path: Path | str,
-    output_wav_path: Path | str):
+    output_wav_path: Path | str,
+    backend: str = "librosa"):
 
     raw_wave, samplerate = sf.read(input_wav_path)
-    raw_wave = librosa.effects.pitch_shift(raw_wave, sr=samplerate, n_steps=3.6)#12 = 200%, 130% pitch
+    raw_wave = pitch_change_ndarray(raw_wave, samplerate, n_steps=3.6, backend=backend)#12 = 200%, 130% pitch
     sf.write(file=output_wav_path, data=raw_wave, samplerate=samplerate)
 
 def convert_to_reverb(
@@ -119,19 +295,108 @@ def convert_to_reverb(
 def wav_pitch_change(
     input_wav_path: Path | str,
     output_wav_path: Path | str,
-    n_steps: int
+    n_steps: int,
+    backend: str = "librosa"
     ):
 
     raw_wave, samplerate = sf.read(input_wav_path)
-    raw_wave, samplerate = sf.read(input_wav_path)
-    raw_wave = librosa.effects.pitch_shift(raw_wave, sr=samplerate, n_steps=n_steps)
+    raw_wave = pitch_change_ndarray(raw_wave, samplerate, n_steps=n_steps, backend=backend)
     sf.write(file=output_wav_path, data=raw_wave, samplerate=samplerate)
 
+PITCH_SHIFT_BACKENDS = ("librosa", "world", "psola")
+
+def pitch_change_ndarray(raw_wave, samplerate, n_steps, backend: str = "librosa"):
+    """
+    音の高さを n_steps 半音変える。長さは変わらない
+
+    Args:
+        backend (str): "librosa" (位相ボコーダ + リサンプリング。楽器や環境音にも使える),
+            "world" (WORLD で F0 だけを変えて再合成。声向けで，スペクトル包絡を保つ),
+            "psola" (ピッチ同期の重ね合わせ。声向けで最も軽い)
+    """
+    if backend == "librosa":
+        return librosa.effects.pitch_shift(raw_wave, sr=samplerate, n_steps=n_steps)
+    if backend == "world":
+        return pitch_shift_world(raw_wave, samplerate, n_steps)
+    if backend == "psola":
+        return pitch_shift_psola(raw_wave, samplerate, n_steps)
+    raise ValueError(f"unknown backend: {backend}")
+
+def pitch_shift_world(raw_wave, samplerate, n_steps, f0_method: str = "dio", fft_size: int | None = None):
+    """WORLD で分析し，F0 を 2 ** (n_steps / 12) 倍して再合成する"""
+    raw_wave = np.asarray(raw_wave)
+    if raw_wave.ndim > 1:
+        return np.stack([pitch_shift_world(raw_wave[:, c], samplerate, n_steps, f0_method, fft_size)
+                         for c in range(raw_wave.shape[1])], axis=1)
+    features = WorldFeatures.analyze(raw_wave, samplerate, f0_method=f0_method, fft_size=fft_size)
+    synthesized = features.synthesize(f0=features.f0 * 2 ** (n_steps / 12))
+    # 合成結果はフレーム単位の長さになるので入力にそろえる
+    out = np.zeros(len(raw_wave))
+    out[:min(len(out), len(synthesized))] = synthesized[:len(out)]
+    return out
+
+def pitch_shift_psola(raw_wave, samplerate, n_steps, frame_period: float = pw.default_frame_period):
+    """
+    TD-PSOLA で音の高さを変える
+
+    有声区間では 1 周期ごとの分析点から 2 周期分をハン窓で切り出し，周期を 1 / 2 ** (n_steps / 12) 倍した間隔で重ね合わせる。
+    無声区間は 10 ミリ秒ごとにそのまま重ね合わせる。F0 は dio と stonemask で求める。
+    """
+    raw_wave = np.asarray(raw_wave)
+    if raw_wave.ndim > 1:
+        return np.stack([pitch_shift_psola(raw_wave[:, c], samplerate, n_steps, frame_period)
+                         for c in range(raw_wave.shape[1])], axis=1)
+    x = np.asarray(raw_wave, dtype=np.float64)
+    n = len(x)
+    ratio = 2 ** (n_steps / 12)
+    _f0, t = pw.dio(x, samplerate, frame_period=frame_period)
+    f0 = pw.stonemask(x, _f0, t, samplerate)
+
+    # 分析点: 有声区間では 1 周期ごと，無声区間では 10 ミリ秒ごと
+    unvoiced_period = samplerate / 100
+    frame_samples = samplerate * frame_period / 1000
+    marks, periods, voiced = [], [], []
+    position = 0.0
+    while position < n:
+        frame_f0 = f0[min(len(f0) - 1, int(position / frame_samples + 0.5))]
+        period = samplerate / frame_f0 if frame_f0 > 0 else unvoiced_period
+        marks.append(position)
+        periods.append(period)
+        voiced.append(frame_f0 > 0)
+        position += period
+    marks = np.array(marks)
+
+    # 合成点ごとに最も近い分析点の 2 周期分を重ね合わせ，窓の重なりで正規化する
+    out = np.zeros(n)
+    weight = np.zeros(n)
+    windows = {}
+    position = 0.0
+    while position < n:
+        i = min(int(np.searchsorted(marks, position)), len(marks) - 1)
+        if i > 0 and position - marks[i - 1] < marks[i] - position:
+            i -= 1
+        half = max(1, int(periods[i]))
+        if half not in windows:
+            windows[half] = np.hanning(2 * half + 1)
+        window = windows[half]
+        source = int(marks[i])
+        target = int(position)
+        # 両端で信号の外に出る部分は切り詰める
+        lo = max(half - source, half - target, 0)
+        hi = min(n - source + half, n - target + half, 2 * half + 1)
+        out[target - half + lo:target - half + hi] += x[source - half + lo:source - half + hi] * window[lo:hi]
+        weight[target - half + lo:target - half + hi] += window[lo:hi]
+        position += periods[i] / ratio if voiced[i] else periods[i]
+
+    return out / np.maximum(weight, 1e-3)
+
 #----------------------------------------------------------------------------------------------
 # 以下のコードはこちらからお借りした。
 # #https://qiita.com/Tadataka_Takahashi/items/1c1681bc2e931b92bca9
 #--------------------------------------------------------------------------------------------------------
-def add_echo(sound: AudioSegment, delay:int, num_echos:int, decay:int):
+def add_echo(sound: "AudioSegment", delay:int, num_echos:int, decay:int):
+    from pydub import AudioSegment
+
     echo = sound.fade_out(duration=decay)
     for i in range(num_echos):
         echo_delay = delay * (i + 1)
@@ -140,6 +405,57 @@ def add_echo(sound: AudioSegment, delay:int, num_echos:int, decay:int):
         sound = sound.overlay(delayed_echo)
     return sound
 
+# add_echo を pydub を使わずに ndarray で行う
+def _fade_out_gain(positions, length:int, samplerate, duration:int):
+    """長さ length の音声に _fade_out でかかる音量を，positions の各サンプルについて返す"""
+    fade_samples = min(length, int(duration * samplerate / 1000))
+    gain = np.ones(len(positions))
+    index = positions - (length - fade_samples)  # フェード区間の中での位置
+    fading = index >= 0
+    if fade_samples <= 0 or not fading.any():
+        return gain
+    if duration > 100:
+        # 1 ミリ秒ごとに音量を変える
+        gain[fading] = 1 + (1e-6 - 1) * (index[fading] * 1000 // samplerate) / duration
+    else:
+        # 1 サンプルごとに音量を変える
+        gain[fading] = 1 + (1e-6 - 1) * index[fading] / fade_samples
+    return gain
+
+def _fade_out(samples, samplerate, duration:int):
+    """pydub の fade_out と同じく，最後の duration ミリ秒で -120 dB まで線形に下げる"""
+    gain = _fade_out_gain(np.arange(len(samples)), len(samples), samplerate, duration)
+    return samples * gain.astype(samples.dtype).reshape((-1,) + (1,) * (samples.ndim - 1))
+
+def add_echo_ndarray(samples, samplerate, delay:int = 500, num_echos:int = 3, decay:int = 500):
+    """
+    ディレイとフェードアウトをかけた音を重ねてエコーをかける (add_echo の ndarray 版)
+
+    Args:
+        samples (np.ndarray): 入力オーディオデータ (サンプル数, ) または (サンプル数, チャンネル数)
+        samplerate (int): サンプリング周波数
+        delay (int): エコーの間隔 (ミリ秒)
+        num_echos (int): エコーの回数
+        decay (int): フェードアウトの長さ (ミリ秒)
+
+    Returns:
+        np.ndarray: エコーをかけたオーディオデータ
+    """
+    samples = np.asarray(samples)
+    if not np.issubdtype(samples.dtype, np.floating):
+        samples = samples.astype(np.float32)
+    echo = _fade_out(samples, samplerate, decay)
+    sound = samples.copy()
+    for i in range(num_echos):
+        echo_delay = int(delay * (i + 1) * samplerate / 1000)
+        echo_decay = decay * (num_echos - i)
+        if echo_delay >= len(sound):
+            break
+        sound[echo_delay:] += _fade_out(echo, samplerate, echo_decay)[:len(sound) - echo_delay]
+        # pydub の overlay と同じく飽和させる
+        np.clip(sound, -1.0, 1.0, out=sound)
+    return sound
+
 def add_reverb(samples, reverberance:int =50, damping=50, room_scale=75):
 
     # パラメータを正規化
@@ -150,13 +466,20 @@ def add_reverb(samples, reverberance:int =50, damping=50, room_scale=75):
     delay_samples = int(8000 * room_scale * 0.1)
     decay = 1 - damping
     # リバーブを適用
-    reverb_samples = np.zeros_like(samples)
-    for i in range(len(samples)):
-        if i < delay_samples:
-            reverb_samples[i] = samples[i]
-        else:
-            reverb_samples[i] = samples[i] + reverberance * decay * reverb_samples[i - delay_samples]
-    
+    # y[i] = x[i] + reverberance * decay * y[i - delay_samples] のフィードバックコムフィルタ
+    samples = np.asarray(samples)
+    if delay_samples == 0:
+        return samples.copy()
+    # delay_samples ごとのブロックに分けると，ブロック間の 1 次の IIR フィルタになる
+    n_blocks = -(-len(samples) // delay_samples)
+    padded = np.zeros((n_blocks * delay_samples,) + samples.shape[1:], dtype=np.result_type(samples.dtype, np.float64))
+    padded[:len(samples)] = samples
+    blocks = padded.reshape((n_blocks, delay_samples) + samples.shape[1:])
+    reverb_samples = lfilter([1.0], [1.0, -reverberance * decay], blocks, axis=0)
+    reverb_samples = reverb_samples.reshape(padded.shape)[:len(samples)]
+
+    if np.issubdtype(samples.dtype, np.floating):
+        reverb_samples = reverb_samples.astype(samples.dtype, copy=False)
     return reverb_samples
 
 
@@ -171,22 +494,28 @@ def cahnge_speed(
 # 再生速度を通常の何倍にするか
 
 
-    # 元音声の読み込み（16ビットモノラル限定）
+    # 元音声の読み込み
     raw_wave, samplerate = sf.read(input_wav_path)
+    dst = change_speed_ndarray(raw_wave, speed=speed)
+    sf.write(file=output_wav_path, data=dst, samplerate=samplerate)
 
-    # 変換後のデータを格納する配列を用意
-    count = int((len(raw_wave)-1)/speed)
-    dst = np.empty(count, dtype="float64")
-
-    # 補間関数を求める
-    f = interpolate.interp1d(range(len(raw_wave)), raw_wave, kind="cubic")     
+def change_speed_ndarray(raw_wave, speed=0.5):
+    """
+    3 次スプライン補間で再生速度を変える
 
-    # 再生速度変換
-    for i in range(0,count):
-        dst[i] = f(i*speed)
+    Args:
+        raw_wave (np.ndarray): 入力オーディオデータ (サンプル数, ) または (サンプル数, チャンネル数)
+        speed (float): 再生速度を通常の何倍にするか
 
+    Returns:
+        np.ndarray: 速度を変えたオーディオデータ
+    """
+    # 変換後のサンプル数
+    count = int((len(raw_wave)-1)/speed)
 
-    sf.write(file=output_wav_path, data=dst, samplerate=samplerate)
+    # 補間関数を求め，全サンプルの位置でまとめて評価する
+    f = interpolate.interp1d(np.arange(len(raw_wave)), raw_wave, kind="cubic", axis=0)
+    return f(np.arange(count) * speed)
 
 #----------------------------------------------------------------------------------------------
 # 以下のコードはgeminiに考えてもらった。
@@ -216,4 +545,276 @@ def add_white_noise_ndarry(audio_array, noise_level=0.05):
     # オーバーフローを避けるために値をクリッピング
     noisy_audio = np.clip(noisy_audio, -1.0, 1.0)
     
-    return noisy_audio
\ No newline at end of file
+    return noisy_audio
+
+#----------------------------------------------------------------------------------------------
+# ndarray のままエフェクトをつなぐ
+#--------------------------------------------------------------------------------------------------------
+# 名前で指定できるエフェクト。いずれも (samples, samplerate, **パラメータ) を受け取り ndarray を返す
+def _reverb_effect(samples, samplerate, reverberance:int = 60, damping:int = 40, room_scale:int = 80):
+    return add_reverb(samples, reverberance=reverberance, damping=damping, room_scale=room_scale)
+
+def _white_noise_effect(samples, samplerate, noise_level: float = 0.05):
+    return add_white_noise_ndarry(samples, noise_level=noise_level)
+
+def _speed_effect(samples, samplerate, speed: float = 0.5):
+    return change_speed_ndarray(samples, speed=speed)
+
+def _youmu_effect(samples, samplerate, backend: str = "librosa"):
+    return pitch_change_ndarray(samples, samplerate, n_steps=3.6, backend=backend)
+
+EFFECTS = {
+    "reverb": _reverb_effect,
+    "echo": add_echo_ndarray,
+    "pitch_change": pitch_change_ndarray,
+    "youmu": _youmu_effect,
+    "white_noise": _white_noise_effect,
+    "robot": voicecanger_robot_ndarray,
+    "speed": _speed_effect,
+}
+
+
+class EffectChain:
+    """
+    複数のエフェクトをメモリ上で順にかける
+
+    ファイルを使う場合も読み込みと書き出しは 1 回ずつで，途中の音声は float32 の ndarray のまま渡す。
+
+    Args:
+        effects: エフェクトの列。各要素は EFFECTS の名前，(名前, パラメータの dict)，
+            または (samples, samplerate) を受け取り ndarray を返す関数
+
+    >>> chain = EffectChain([("echo", {"delay": 300}), "reverb", ("white_noise", {"noise_level": 0.01})])
+    >>> chain.process_file("input.wav", "output.wav")
+    """
+    def __init__(self, effects: Sequence[str | tuple[str, dict] | Callable[[np.ndarray, int], np.ndarray]]):
+        self.effects = list(effects)
+        self._functions = [self._resolve(effect) for effect in self.effects]
+
+    @staticmethod
+    def _name_and_params(effect) -> tuple[str, dict]:
+        # (名前, パラメータ) は tuple でも list でもよい (JSON から読んだ指定は list になる)
+        if isinstance(effect, str):
+            return effect, {}
+        name, params = effect
+        return name, params
+
+    @classmethod
+    def _resolve(cls, effect) -> Callable[[np.ndarray, int], np.ndarray]:
+        if callable(effect):
+            return effect
+        name, params = cls._name_and_params(effect)
+        if name not in EFFECTS:
+            raise ValueError(f"unknown effect: {name}")
+        function = EFFECTS[name]
+        return lambda samples, samplerate: function(samples, samplerate, **params)
+
+    def __call__(self, samples: np.ndarray, samplerate: int) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float32)
+        for function in self._functions:
+            samples = np.asarray(function(samples, samplerate), dtype=np.float32)
+        return samples
+
+    def process_file(self, input_wav_path: Path | str, output_wav_path: Path | str, blocksize: int | None = None) -> None:
+        """
+        Args:
+            blocksize (int | None): 指定すると blocksize サンプルずつ読み書きするストリーミングで処理する。
+                メモリ使用量はファイルの長さによらない。使えるエフェクトは STREAMING_EFFECTS にあるものだけ
+        """
+        if blocksize is not None:
+            self._stream_file(input_wav_path, output_wav_path, blocksize)
+            return
+        raw_wave, samplerate = sf.read(input_wav_path, dtype="float32")
+        sf.write(file=output_wav_path, data=self(raw_wave, samplerate), samplerate=samplerate)
+
+    def _stream_file(self, input_wav_path, output_wav_path, blocksize: int) -> None:
+        info = sf.info(input_wav_path)
+        length = info.frames
+        processors = []
+        for effect in self.effects:
+            if callable(effect):
+                raise ValueError(f"effect does not support streaming: {effect}")
+            name, params = self._name_and_params(effect)
+            if name not in STREAMING_EFFECTS:
+                raise ValueError(f"effect does not support streaming: {effect}")
+            processor = STREAMING_EFFECTS[name](info.samplerate, length, **params)
+            processors.append(processor)
+            length = processor.output_length
+
+        with sf.SoundFile(output_wav_path, "w", samplerate=info.samplerate, channels=info.channels) as output:
+            for block in sf.blocks(input_wav_path, blocksize=blocksize, dtype="float32"):
+                for processor in processors:
+                    block = np.asarray(processor.process(block), dtype=np.float32)
+                output.write(block)
+            # 後ろのエフェクトに残りを流す
+            for i, processor in enumerate(processors):
+                block = np.asarray(processor.flush(), dtype=np.float32)
+                if len(block) == 0:
+                    continue
+                for following in processors[i + 1:]:
+                    block = np.asarray(following.process(block), dtype=np.float32)
+                output.write(block)
+
+
+#----------------------------------------------------------------------------------------------
+# ストリーミング処理。ブロックをまたぐ状態を持ち，process で受け取ったブロックを処理して返す。
+# 最後に flush で残りを返す。length は入力全体のサンプル数
+#--------------------------------------------------------------------------------------------------------
+class _StreamingReverb:
+    """add_reverb と同じフィードバックコムフィルタ。直前の delay_samples サンプルの出力を持ち越す"""
+    def __init__(self, samplerate, length, reverberance:int = 60, damping:int = 40, room_scale:int = 80):
+        reverberance = max(0, min(100, reverberance)) / 100
+        damping = max(0, min(100, damping)) / 100
+        room_scale = max(0, min(100, room_scale)) / 100
+        self.delay_samples = int(8000 * room_scale * 0.1)
+        self.gain = reverberance * (1 - damping)
+        self.output_length = length
+        self.history = None
+
+    def process(self, block):
+        if self.delay_samples == 0:
+            return block
+        if self.history is None:
+            self.history = np.zeros((self.delay_samples,) + block.shape[1:])
+        buffer = np.concatenate([self.history, block])
+        for start in range(self.delay_samples, len(buffer), self.delay_samples):
+            end = min(start + self.delay_samples, len(buffer))
+            buffer[start:end] += self.gain * buffer[start - self.delay_samples:end - self.delay_samples]
+        self.history = buffer[-self.delay_samples:]
+        return buffer[self.delay_samples:].astype(block.dtype, copy=False)
+
+    def flush(self):
+        return np.zeros(0, dtype=np.float32)
+
+
+class _StreamingEcho:
+    """add_echo_ndarray と同じエコー。フェードアウトの位置は全体の長さから求め，最大の遅延分の入力を持ち越す"""
+    def __init__(self, samplerate, length, delay:int = 500, num_echos:int = 3, decay:int = 500):
+        self.samplerate = samplerate
+        self.length = length
+        self.output_length = length
+        self.decay = decay
+        self.echos = []  # (遅延サンプル数, フェードアウトの長さ)
+        for i in range(num_echos):
+            echo_delay = int(delay * (i + 1) * samplerate / 1000)
+            if echo_delay >= length:
+                break
+            self.echos.append((echo_delay, decay * (num_echos - i)))
+        self.max_delay = max((echo_delay for echo_delay, _ in self.echos), default=0)
+        self.history = None
+        self.position = 0  # 次のブロックの先頭の位置
+
+    def process(self, block):
+        if self.history is None:
+            self.history = np.zeros((0,) + block.shape[1:], dtype=block.dtype)
+        buffer = np.concatenate([self.history, block])
+        buffer_start = self.position - len(self.history)
+        positions = np.arange(self.position, self.position + len(block))
+        shape = (-1,) + (1,) * (block.ndim - 1)
+
+        sound = block.copy()
+        for echo_delay, echo_decay in self.echos:
+            source = positions - echo_delay
+            valid = source >= 0
+            source = source[valid]
+            samples = buffer[source - buffer_start]
+            gain = _fade_out_gain(source, self.length, self.samplerate, self.decay).astype(block.dtype).reshape(shape)
+            echo_gain = _fade_out_gain(source, self.length, self.samplerate, echo_decay).astype(block.dtype).reshape(shape)
+            sound[valid] += samples * gain * echo_gain
+            np.clip(sound, -1.0, 1.0, out=sound)
+
+        self.history = buffer[max(0, len(buffer) - self.max_delay):]
+        self.position += len(block)
+        return sound
+
+    def flush(self):
+        return np.zeros(0, dtype=np.float32)
+
+
+class _StreamingSpeed:
+    """change_speed_ndarray と同じ 3 次スプライン補間。前後に margin サンプルの文脈を付けて区間ごとに補間する"""
+    margin = 64
+
+    def __init__(self, samplerate, length, speed: float = 0.5):
+        self.speed = speed
+        self.length = length
+        self.output_length = int((length - 1) / speed)
+        self.buffer = None
+        self.buffer_start = 0  # buffer の先頭の位置
+        self.next_output = 0
+
+    def _interpolate(self, end_output):
+        positions = np.arange(self.next_output, end_output) * self.speed
+        f = interpolate.interp1d(np.arange(len(self.buffer)), self.buffer, kind="cubic", axis=0)
+        out = f(positions - self.buffer_start)
+        self.next_output = end_output
+        # 次の出力に必要な文脈より前は捨てる
+        keep_from = max(0, int(self.next_output * self.speed) - self.margin - self.buffer_start)
+        self.buffer = self.buffer[keep_from:]
+        self.buffer_start += keep_from
+        return out
+
+    def process(self, block):
+        self.buffer = block if self.buffer is None else np.concatenate([self.buffer, block])
+        buffer_end = self.buffer_start + len(self.buffer)
+        # 後ろに margin サンプルの文脈がある出力まで求める
+        end_output = min(self.output_length, int(np.ceil((buffer_end - 1 - self.margin) / self.speed)))
+        if end_output <= self.next_output or len(self.buffer) < 4:
+            return np.zeros((0,) + block.shape[1:])
+        return self._interpolate(end_output)
+
+    def flush(self):
+        if self.buffer is None or self.next_output >= self.output_length:
+            return np.zeros(0, dtype=np.float32)
+        return self._interpolate(self.output_length)
+
+
+class _StreamingPitch:
+    """chunk 秒ごとに pitch_change_ndarray をかけ，overlap 秒ずつ重ねてクロスフェードする (overlap-add)"""
+    def __init__(self, samplerate, length, n_steps: float = 3.6, chunk: float = 4.0, overlap: float = 0.1,
+                 backend: str = "librosa"):
+        self.samplerate = samplerate
+        self.n_steps = n_steps
+        self.backend = backend
+        self.chunk_samples = int(chunk * samplerate)
+        self.overlap_samples = int(overlap * samplerate)
+        self.output_length = length
+        self.buffer = None
+        self.tail = None  # 前のチャンクの出力のうち，次と重ねる部分
+
+    def _shift(self, chunk):
+        out = pitch_change_ndarray(chunk, self.samplerate, n_steps=self.n_steps, backend=self.backend)
+        if self.tail is not None:
+            n = min(len(self.tail), len(out))
+            fade = (np.arange(n) + 0.5) / n
+            fade = fade.reshape((-1,) + (1,) * (out.ndim - 1))
+            out = out.copy()
+            out[:n] = self.tail[:n] * (1 - fade) + out[:n] * fade
+        return out
+
+    def process(self, block):
+        self.buffer = block if self.buffer is None else np.concatenate([self.buffer, block])
+        outputs = []
+        while len(self.buffer) >= self.chunk_samples:
+            out = self._shift(self.buffer[:self.chunk_samples])
+            step = self.chunk_samples - self.overlap_samples
+            outputs.append(out[:step])
+            self.tail = out[step:]
+            self.buffer = self.buffer[step:]
+        if not outputs:
+            return np.zeros((0,) + block.shape[1:])
+        return np.concatenate(outputs)
+
+    def flush(self):
+        if self.buffer is None or len(self.buffer) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._shift(self.buffer)
+
+
+STREAMING_EFFECTS = {
+    "reverb": _StreamingReverb,
+    "echo": _StreamingEcho,
+    "speed": _StreamingSpeed,
+    "pitch_change": _StreamingPitch,
+    "youmu": lambda samplerate, length, **params: _StreamingPitch(samplerate, length, n_steps=3.6, **params),
+}
@@ -0,0 +1,270 @@
+"""
+natsumikan のエフェクトでコーパス全体のデータ拡張を行う
+
+入力ファイルの一覧 (マニフェスト) と，エフェクトとパラメータの範囲を書いた設定を受け取り，
+プロセスプールで拡張した音声を書き出す。出力先の manifest.jsonl に終わったものを 1 行ずつ追記するので，
+中断しても同じコマンドで続きから再開できる。
+
+設定の例::
+
+    {
+        "seed": 1234,
+        "variants": [
+            {"name": "noisy", "effects": [["white_noise", {"noise_level": [0.005, 0.03]}]]},
+            {"name": "room", "count": 2, "effects": [["reverb", {"reverberance": [30, 80], "damping": 40}]]},
+            {"name": "pitch", "effects": [["pitch_change", {"n_steps": [-3.0, 3.0], "backend": {"choice": ["world", "psola"]}}]]}
+        ]
+    }
+
+パラメータの値は，数値 2 つのリストなら一様乱数 (両方 int なら整数)，{"choice": [...]} ならその中から 1 つ，
+それ以外はそのまま使う。乱数は seed・入力ファイル・バリアントから決まるので，ワーカー数や再開の有無によらず同じ結果になる。
+
+実行コマンドは `python -m kabosu_core.io.tts.natsumikan_augment manifest.txt spec.json output_dir --workers 4` である。
+"""
+
+from collections.abc import Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+import time
+
+import numpy as np
+import soundfile as sf
+
+from kabosu_core.io.tts.natsumikan import EFFECTS
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+@dataclass
+class EffectStats:
+    """
+    エフェクトごとの処理量
+
+    Args:
+        files (int): 処理したファイル数
+        audio_seconds (float): 処理した音声の長さ (秒)
+        processing_seconds (float): 処理にかかった時間 (秒)
+    """
+    files: int = 0
+    audio_seconds: float = 0.0
+    processing_seconds: float = 0.0
+
+    @property
+    def realtime_factor(self) -> float:
+        """音声 1 秒あたりの処理時間。小さいほど速い"""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+def load_spec(spec: dict | Path | str) -> dict:
+    """設定を読み込み，エフェクト名を確かめる。dict はそのまま，それ以外は JSON ファイルのパスとして扱う"""
+    if not isinstance(spec, dict):
+        spec = json.loads(Path(spec).read_text(encoding="utf-8"))
+    names = set()
+    for variant in spec["variants"]:
+        if variant["name"] in names:
+            raise ValueError(f"duplicate variant name: {variant['name']}")
+        names.add(variant["name"])
+        for effect in variant["effects"]:
+            name = effect if isinstance(effect, str) else effect[0]
+            if name not in EFFECTS:
+                raise ValueError(f"unknown effect: {name}")
+    return spec
+
+
+def read_manifest(path: Path | str) -> list[Path]:
+    """1 行に 1 ファイルのマニフェストを読む。空行と # で始まる行は飛ばし，相対パスはマニフェストの場所から解決する"""
+    path = Path(path)
+    inputs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            inputs.append(path.parent / line)
+    return inputs
+
+
+def sample_params(params: dict, rng: np.random.Generator) -> dict:
+    """パラメータの範囲から値を 1 つ選ぶ"""
+    sampled = {}
+    for key, value in params.items():
+        if isinstance(value, dict) and "choice" in value:
+            value = value["choice"][int(rng.integers(len(value["choice"])))]
+        elif isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(v, (int, float)) for v in value):
+            low, high = value
+            if isinstance(low, int) and isinstance(high, int):
+                value = int(rng.integers(low, high + 1))
+            else:
+                value = float(rng.uniform(low, high))
+        sampled[key] = value
+    return sampled
+
+
+def _job_seed(seed: int, *keys) -> int:
+    digest = hashlib.blake2b(":".join(map(str, (seed, *keys))).encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+def plan_jobs(inputs: Sequence[Path | str], spec: dict, output_dir: Path | str, input_root: Path | str | None = None) -> list[dict]:
+    """
+    入力ファイルとバリアントの組ごとに，出力先・パラメータ・乱数の種を決める
+
+    出力は output_dir/<バリアント名>/<input_root からの相対パス> で，count が 2 以上なら名前に _<番号> を付ける。
+    """
+    inputs = [Path(path) for path in inputs]
+    output_dir = Path(output_dir)
+    if input_root is None:
+        input_root = Path(os.path.commonpath([path.parent.absolute() for path in inputs])) if inputs else Path(".")
+    seed = spec.get("seed", 0)
+
+    jobs = []
+    for path in inputs:
+        relative = path.absolute().relative_to(Path(input_root).absolute())
+        for variant in spec["variants"]:
+            count = variant.get("count", 1)
+            for index in range(count):
+                output = output_dir / variant["name"] / relative
+                if count > 1:
+                    output = output.with_name(f"{output.stem}_{index}{output.suffix}")
+                job_seed = _job_seed(seed, relative.as_posix(), variant["name"], index)
+                rng = np.random.default_rng(job_seed)
+                effects = []
+                for effect in variant["effects"]:
+                    name, params = (effect, {}) if isinstance(effect, str) else effect
+                    effects.append([name, sample_params(params, rng)])
+                jobs.append({"input": str(path), "output": str(output), "variant": variant["name"],
+                             "effects": effects, "seed": job_seed})
+    return jobs
+
+
+def _read_done(manifest_path: Path) -> set[str]:
+    """出力のマニフェストから，書き出しが終わっているファイルを集める。中断で途切れた行は無視する"""
+    done = set()
+    if manifest_path.exists():
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if Path(record["output"]).exists():
+                done.add(record["output"])
+    return done
+
+
+def _augment_worker(job: dict) -> dict:
+    """1 つの入力に 1 つのバリアントをかけて書き出し，エフェクトごとの処理時間を返す"""
+    info = sf.info(job["input"])
+    samples, samplerate = sf.read(job["input"], dtype="float32")
+    # white_noise などは numpy の大域的な乱数を使うので，ジョブごとに種を決めておく
+    np.random.seed(job["seed"] % 2 ** 32)
+    timings = []
+    for name, params in job["effects"]:
+        start = time.perf_counter()
+        samples = np.asarray(EFFECTS[name](samples, samplerate, **params), dtype=np.float32)
+        timings.append(time.perf_counter() - start)
+
+    output = Path(job["output"])
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # 途中で止まっても書きかけのファイルが残らないよう，一時ファイルに書いてから置き換える
+    tmp_output = output.with_name(f".{output.stem}.{os.getpid()}.tmp{output.suffix}")
+    sf.write(file=tmp_output, data=samples, samplerate=samplerate, format=info.format)
+    tmp_output.replace(output)
+    return {**job, "duration": info.duration, "timings": timings}
+
+
+def run_augmentation(
+    inputs: Sequence[Path | str],
+    spec: dict | Path | str,
+    output_dir: Path | str,
+    workers: int = 1,
+    input_root: Path | str | None = None,
+    max_pending: int | None = None
+    ) -> dict[str, EffectStats]:
+    """
+    コーパスにデータ拡張をかけて output_dir に書き出す
+
+    Args:
+        inputs: 入力ファイルのパス
+        spec: 設定の dict か JSON ファイルのパス
+        output_dir: 出力先。終わったものは output_dir/manifest.jsonl に記録し，次の実行では飛ばす
+        workers (int): プロセス数
+        input_root: 出力のディレクトリ構成の基準。省略すると入力の共通の親ディレクトリ。
+            一部の入力だけで実行してから再開するときは，出力先が変わらないよう指定しておく
+        max_pending (int | None): 同時に投入するジョブの数。メモリに載る音声はこの数までに抑えられる。省略すると workers の 2 倍
+
+    Returns:
+        dict[str, EffectStats]: この実行で処理したエフェクトごとの処理量
+    """
+    spec = load_spec(spec)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    done = _read_done(manifest_path)
+    jobs = [job for job in plan_jobs(inputs, spec, output_dir, input_root) if job["output"] not in done]
+
+    stats: dict[str, EffectStats] = {}
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        if manifest.tell() > 0 and not manifest_path.read_bytes().endswith(b"\n"):
+            manifest.write("\n")  # 中断で途切れた行に続けて書かない
+        for result in _run_jobs(jobs, workers, max_pending or 2 * max(workers, 1)):
+            manifest.write(json.dumps(result, ensure_ascii=False) + "\n")
+            manifest.flush()
+            for (name, _), seconds in zip(result["effects"], result["timings"]):
+                effect_stats = stats.setdefault(name, EffectStats())
+                effect_stats.files += 1
+                effect_stats.audio_seconds += result["duration"]
+                effect_stats.processing_seconds += seconds
+    return stats
+
+
+def _run_jobs(jobs: list[dict], workers: int, max_pending: int) -> Iterable[dict]:
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _augment_worker(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = iter(jobs)
+        pending = set()
+        while True:
+            # 音声を抱えたままの結果が溜まらないよう，投入するジョブの数を抑える
+            for job in jobs:
+                pending.add(executor.submit(_augment_worker, job))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+
+def format_report(stats: dict[str, EffectStats], elapsed: float | None = None) -> str:
+    """エフェクトごとの処理量を表にする"""
+    lines = [f"{'effect':<14}{'files':>8}{'audio [s]':>12}{'time [s]':>12}{'x realtime':>12}"]
+    for name, effect_stats in stats.items():
+        speed = 1 / effect_stats.realtime_factor if effect_stats.realtime_factor else float("inf")
+        lines.append(f"{name:<14}{effect_stats.files:>8}{effect_stats.audio_seconds:>12.1f}"
+                     f"{effect_stats.processing_seconds:>12.2f}{speed:>12.1f}")
+    if elapsed is not None:
+        lines.append(f"elapsed: {elapsed:.2f} sec")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="natsumikan のエフェクトでデータ拡張を行う")
+    parser.add_argument("manifest", type=Path, help="入力ファイルを 1 行に 1 つ書いたファイル")
+    parser.add_argument("spec", type=Path, help="エフェクトとパラメータの範囲を書いた JSON")
+    parser.add_argument("output_dir", type=Path, help="出力先")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="プロセス数")
+    parser.add_argument("--input-root", type=Path, default=None, help="出力のディレクトリ構成の基準。省略するとマニフェストのあるディレクトリ")
+    parser.add_argument("--max-pending", type=int, default=None, help="同時に投入するジョブの数")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = run_augmentation(read_manifest(args.manifest), args.spec, args.output_dir, workers=args.workers,
+                             input_root=args.input_root or args.manifest.parent, max_pending=args.max_pending)
+    print(format_report(stats, time.perf_counter() - start))
@@ -1,16 +1,49 @@
-import jpreprocess 
+from __future__ import annotations
+
+import importlib
 import re
 
-from kabosu_core.language.njd.ja.normalizer import (
-    dictreader_furigana,
-    reader_furigana,
-    kanalizer_convert,
-    normalize_itaiji,
-    normalize_text
-)
-from typing import Union, TypeVar
+from typing import TYPE_CHECKING, Union, TypeVar
 from kabosu_core.language.types import NjdObject
-from kabosu_core.language.njd.ja import apply_postprocessing
+
+if TYPE_CHECKING:
+    import jpreprocess
+
+    from kabosu_core.language.njd.ja.normalizer import (
+        dictreader_furigana,
+        reader_furigana,
+        kanalizer_convert,
+        normalize_itaiji,
+        normalize_text
+    )
+    from kabosu_core.language.njd.ja import apply_postprocessing
+
+# jpreprocess や正規化 (torch, transformers, kanalizer) は import に時間がかかるので，
+# 属性として最初に参照されたときに読み込む
+_LAZY_ATTRIBUTES = {
+    "jpreprocess": ("jpreprocess", None),
+    "dictreader_furigana": ("kabosu_core.language.njd.ja.normalizer", "dictreader_furigana"),
+    "reader_furigana": ("kabosu_core.language.njd.ja.normalizer", "reader_furigana"),
+    "kanalizer_convert": ("kabosu_core.language.njd.ja.normalizer", "kanalizer_convert"),
+    "normalize_itaiji": ("kabosu_core.language.njd.ja.normalizer", "normalize_itaiji"),
+    "normalize_text": ("kabosu_core.language.njd.ja.normalizer", "normalize_text"),
+    "apply_postprocessing": ("kabosu_core.language.njd.ja", "apply_postprocessing"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 #----------------------------------------------------
 #
@@ -36,7 +69,9 @@ from kabosu_core.language.njd.ja import apply_postprocessing
 #> SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #/bAmFru).
 
-from collections.abc import Callable, Generator
+from collections import deque
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from contextlib import AbstractContextManager, contextmanager
 
 from threading import Lock
@@ -62,10 +97,19 @@ def _global_instance_manager(
 
     return manager
 
+def _create_jpreprocess(user_dictionary: str | Path | None = None) -> jpreprocess.JPreprocess:
+    import jpreprocess
+
+    if user_dictionary is None:
+        return jpreprocess.jpreprocess()
+    return jpreprocess.jpreprocess(user_dictionary=user_dictionary)
+
 # Global instance of OpenJTalk
-_global_jpreprocess = _global_instance_manager(lambda: jpreprocess.jpreprocess())
+_global_jpreprocess = _global_instance_manager(_create_jpreprocess)
 # Global instance of Marine
 _global_marine = None
+# Global instance of Bunkai
+_global_bunkai = None
 
 def load_marine_model(model_dir: Union[str, None] = None, dict_dir: Union[str, None] = None):
     global _global_marine
@@ -88,7 +132,7 @@ def update_global_jtalk_with_user_dict(
     global _global_jpreprocess
     with _global_jpreprocess():
         _global_jpreprocess = _global_instance_manager(
-            instance=jpreprocess.jpreprocess(user_dictionary=user_dictionary),
+            instance=_create_jpreprocess(user_dictionary),
         )
 #-----------------------------------------------------------
 
@@ -190,7 +234,7 @@ def run_frontend(
     => list[NjdObject] : njd_features
     """
 
-
+    from kabosu_core.language.njd.ja import apply_postprocessing
 
 
     if jpreprocess is not None:
@@ -242,6 +286,110 @@ def make_label(
         return jpreprocess.make_label(njd_features)
 
 
+def load_bunkai_model(path_model: Union[str, Path, None] = None):
+    global _global_bunkai
+    if _global_bunkai is None:
+        from kabosu_core.language.njd.ja.lib.bunkai import Bunkai
+        _global_bunkai = Bunkai(path_model=None if path_model is None else Path(path_model))
+
+
+def split_sentences(text: Union[str, Iterable[str]]) -> Iterator[str]:
+    """
+    ### input
+    text (str | Iterable[str]): input text or paragraphs (e.g. lines of a file)
+    ## output
+    => Iterator[str] : sentences split by bunkai
+
+    Each paragraph is split only when the previous one has been consumed,
+    so a long document is never analyzed as one huge string.
+    """
+
+    global _global_bunkai
+    if _global_bunkai is None:
+        load_bunkai_model()
+        assert _global_bunkai is not None
+
+    paragraphs = text.splitlines() if isinstance(text, str) else text
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for sentence in _global_bunkai(paragraph):
+            sentence = sentence.strip()
+            if sentence:
+                yield sentence
+
+
+def _sentence_fullcontext(sentence: str, options: dict) -> list[str]:
+    # module level function so that it can be sent to a process pool
+    return extract_fullcontext(sentence, **options)
+
+
+def stream_fullcontext(
+        text: Union[str, Iterable[str]],
+        use_vanilla: bool = False,
+        run_marine: bool = False,
+        keihan: bool = False,
+        babytalk: bool = False,
+        dakuten: bool = False,
+        workers: int = 1,
+        lookahead: int = 4,
+        executor: Union[Executor, None] = None,
+        ) -> Generator[tuple[str, list[str]], None, None]:
+    """
+    ### input
+    text (str | Iterable[str]): input text or paragraphs (e.g. lines of a file)
+    workers (int): number of worker processes. 1 runs the frontend inline
+    lookahead (int): max number of sentences analyzed ahead of the consumer
+    executor (Executor): use this executor instead of creating a process pool
+    ## output
+    => Generator[tuple[str, list[str]]] : (sentence, fullcontext label) in input order
+
+    Labels are yielded as soon as each sentence is ready. Work is submitted
+    only while fewer than `lookahead` results are waiting to be consumed,
+    so a slow consumer stops the pipeline instead of filling memory.
+    """
+
+    if lookahead < 1:
+        raise ValueError("lookahead must be >= 1")
+
+    options = dict(
+        use_vanilla=use_vanilla,
+        run_marine=run_marine,
+        keihan=keihan,
+        babytalk=babytalk,
+        dakuten=dakuten,
+    )
+    sentences = split_sentences(text)
+
+    if executor is None and workers <= 1:
+        for sentence in sentences:
+            yield sentence, _sentence_fullcontext(sentence, options)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    pending: deque[tuple[str, Future]] = deque()
+    try:
+        for sentence in sentences:
+            pending.append((sentence, executor.submit(_sentence_fullcontext, sentence, options)))
+            if len(pending) >= lookahead:
+                done_sentence, future = pending.popleft()
+                yield done_sentence, future.result()
+
+        while pending:
+            done_sentence, future = pending.popleft()
+            yield done_sentence, future.result()
+    finally:
+        # consumer stopped early or an error occurred
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
 def pyopenjtalk_g2p_prosody(text: str, drop_unvoiced_vowels: bool = True) -> list[str]:
 #                                      Apache License
 #                            Version 2.0, January 2004
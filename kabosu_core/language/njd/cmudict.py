@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+'''
+Compact CMU pronouncing dictionary shared by the English (en) and Korean (ko) G2P.
+
+The cmudict corpus bundled for NLTK is converted once into a single binary file of sorted words
+and phoneme ids, which is mmapped and searched by bisection instead of being
+parsed into a dict of lists in every process.
+'''
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+from kabosu_core.assets import NLTK_DIR
+
+CACHE_NAME = "cmudict"
+CACHE_VERSION = 1
+
+_MAGIC = b"KBCMU\x00\x00\x01"
+# magic, number of words, pronunciations, phonemes, bytes of words, bytes of symbols
+_HEADER = struct.Struct("<8sIIIII")
+
+
+class CMULexicon(object):
+    '''Read-only mapping of lowercase word -> list of pronunciations (lists of ARPAbet).
+    Supports `word in lexicon`, `lexicon[word]`, `lexicon.get(word)` and len().
+    '''
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, n_words, n_prons, n_phones, n_word_bytes, n_symbol_bytes = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError("not a cmudict lexicon file")
+
+        offset = _HEADER.size
+        sections = []
+        for size in (4 * (n_words + 1), 4 * (n_words + 1), 4 * (n_prons + 1), 2 * n_phones, n_word_bytes, n_symbol_bytes):
+            sections.append(view[offset:offset + size])
+            offset += size
+        self._word_offsets = sections[0].cast("I")  # words[i] = word_bytes[word_offsets[i]:word_offsets[i + 1]]
+        self._word_prons = sections[1].cast("I")  # pronunciations of words[i]: word_prons[i]:word_prons[i + 1]
+        self._pron_offsets = sections[2].cast("I")  # phonemes of a pronunciation, indices into phones
+        self._phones = sections[3].cast("H")  # phoneme ids
+        self._word_base = offset - n_word_bytes - n_symbol_bytes  # slices of the buffer are bytes, comparable
+        self._symbols = bytes(sections[5]).decode("ascii").split()
+        self._n_words = n_words
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        return self._n_words
+
+    def _find(self, word):
+        key = word.encode("utf8")
+        offsets, buffer, base = self._word_offsets, self._buffer, self._word_base
+        lo, hi = 0, self._n_words
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if buffer[base + offsets[mid]:base + offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_words and buffer[base + offsets[lo]:base + offsets[lo + 1]] == key:
+            return lo
+        return -1
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self._find(word) >= 0
+
+    def __getitem__(self, word):
+        index = self._find(word) if isinstance(word, str) else -1
+        if index < 0:
+            raise KeyError(word)
+        prons = []
+        for pron in range(self._word_prons[index], self._word_prons[index + 1]):
+            phones = self._phones[self._pron_offsets[pron]:self._pron_offsets[pron + 1]]
+            prons.append([self._symbols[phone] for phone in phones])
+        return prons
+
+    def get(self, word, default=None):
+        try:
+            return self[word]
+        except KeyError:
+            return default
+
+
+def build_lexicon(entries):
+    '''Serialize (word, pronunciation) entries into the lexicon file format.
+    Several entries of the same word keep their order, like cmudict.dict().
+    '''
+    grouped = {}
+    for word, pron in entries:
+        grouped.setdefault(word, []).append(pron)
+
+    symbols = sorted({phone for prons in grouped.values() for pron in prons for phone in pron})
+    symbol2id = {symbol: i for i, symbol in enumerate(symbols)}
+
+    word_offsets, word_prons, pron_offsets, phones = [0], [0], [0], []
+    word_bytes = bytearray()
+    for key, word in sorted((word.encode("utf8"), word) for word in grouped):
+        word_bytes += key
+        word_offsets.append(len(word_bytes))
+        for pron in grouped[word]:
+            phones.extend(symbol2id[phone] for phone in pron)
+            pron_offsets.append(len(phones))
+        word_prons.append(len(pron_offsets) - 1)
+
+    symbol_bytes = " ".join(symbols).encode("ascii")
+    return b"".join([
+        _HEADER.pack(_MAGIC, len(grouped), len(pron_offsets) - 1, len(phones), len(word_bytes), len(symbol_bytes)),
+        struct.pack(f"<{len(word_offsets)}I", *word_offsets),
+        struct.pack(f"<{len(word_prons)}I", *word_prons),
+        struct.pack(f"<{len(pron_offsets)}I", *pron_offsets),
+        struct.pack(f"<{len(phones)}H", *phones),
+        bytes(word_bytes),
+        symbol_bytes,
+    ])
+
+
+def _read_source():
+    '''Raw bytes of the nltk cmudict corpus, either unpacked or as cmudict.zip.'''
+    path = Path(NLTK_DIR) / "cmudict" / "cmudict"
+    if not path.exists() and path.parent.with_suffix(".zip").exists():
+        with zipfile.ZipFile(path.parent.with_suffix(".zip")) as archive:
+            return archive.read("cmudict/cmudict")
+    return path.read_bytes()
+
+
+def read_entries(data):
+    '''Parse cmudict lines "word variant phoneme ...", as nltk's CMUDictCorpusReader does.'''
+    for line in data.decode("utf8").splitlines():
+        pieces = line.split()
+        if pieces:
+            yield pieces[0], pieces[2:]
+
+
+def _source_hash(data):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_VERSION).encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def load_lexicon(cache_dir=None, use_cache=True):
+    '''Return the CMU lexicon, shared within the process.
+    With use_cache, the converted lexicon is written to cache_dir
+    (default: the nltk asset directory) under a name containing the hash
+    of the source, and later processes just mmap it.
+    '''
+    source = _read_source()
+    if not use_cache:
+        return CMULexicon(build_lexicon(read_entries(source)))
+
+    cache_file = Path(cache_dir if cache_dir is not None else NLTK_DIR) / f"{CACHE_NAME}.{_source_hash(source)}.lex"
+    try:
+        return CMULexicon.open(cache_file)
+    except (OSError, ValueError, TypeError, struct.error):
+        pass
+
+    data = build_lexicon(read_entries(source))
+    tmp_file = cache_file.with_name(cache_file.name + f".{os.getpid()}.tmp")
+    try:
+        tmp_file.write_bytes(data)
+        tmp_file.replace(cache_file)
+        # remove lexicons of older sources
+        for old_file in cache_file.parent.glob(f"{CACHE_NAME}.*.lex"):
+            if old_file != cache_file:
+                old_file.unlink(missing_ok=True)
+    except OSError:
+        # not writable: keep the lexicon in memory
+        tmp_file.unlink(missing_ok=True)
+    return CMULexicon(data)
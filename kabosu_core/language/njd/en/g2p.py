@@ -4,34 +4,38 @@
 By kyubyong park(kbpark.linguist@gmail.com) and Jongseok Kim(https://github.com/ozmig77)
 https://www.github.com/kyubyong/g2p
 '''
-from nltk import pos_tag
 import nltk
+from nltk.tag.perceptron import PerceptronTagger
 from nltk.tokenize import TweetTokenizer
 word_tokenize = TweetTokenizer().tokenize
 import numpy as np
 
+import functools
+import json
+import os
 import re
+from collections import OrderedDict
+from pathlib import Path
 
 import unicodedata
 from builtins import str as unicode
 from kabosu_core.language.njd.en.expand import normalize_numbers
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger_eng.zip')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger_eng')
-
-
-from nltk.corpus.util import LazyCorpusLoader
-from nltk.corpus.reader.cmudict import CMUDictCorpusReader
-from kabosu_core.asseets import NLTK_DIR, G2P_EN_DIR
-
-cmudict = LazyCorpusLoader(name="cmudict",
-                            reader_cls=CMUDictCorpusReader,
-                            nltk_data_subdir=NLTK_DIR,
-                            fileids=["cmudict"]
-                            )
-
+from kabosu_core.assets import G2P_EN_DIR
+from kabosu_core.language.njd.cmudict import load_lexicon
+
+@functools.lru_cache(maxsize=None)
+def load_tagger():
+    '''The averaged perceptron tagger used by nltk.pos_tag, loaded once per process.
+    It is downloaded on first use if missing.
+    '''
+    try:
+        nltk.data.find('taggers/averaged_perceptron_tagger_eng.zip')
+    except LookupError:
+        nltk.download('averaged_perceptron_tagger_eng')
+    return PerceptronTagger()
+
+@functools.lru_cache(maxsize=None)
 def construct_homograph_dictionary():
     f = G2P_EN_DIR / 'homographs.en'
     homograph2features = dict()
@@ -53,7 +57,11 @@ def construct_homograph_dictionary():
 #     return text.split()
 
 class G2p(object):
-    def __init__(self):
+    def __init__(self, oov_cache_size=10000, oov_cache_path=None, preload_tagger=True):
+        '''oov_cache_size: number of predicted out-of-vocabulary words kept in memory (LRU).
+        oov_cache_path: json file the OOV cache is loaded from, and written to by save_oov_cache().
+        preload_tagger: load the POS tagger now instead of on the first sentence with a homograph.
+        '''
         super().__init__()
         self.graphemes = ["<pad>", "<unk>", "</s>"] + list("abcdefghijklmnopqrstuvwxyz")
         self.phonemes = ["<pad>", "<unk>", "<s>", "</s>"] + ['AA0', 'AA1', 'AA2', 'AE0', 'AE1', 'AE2', 'AH0', 'AH1', 'AH2', 'AO0',
@@ -71,10 +79,52 @@ class G2p(object):
         self.p2idx = {p: idx for idx, p in enumerate(self.phonemes)}
         self.idx2p = {idx: p for idx, p in enumerate(self.phonemes)}
 
-        self.cmu = cmudict.dict()
+        self.cmu = load_lexicon()  # shared with g2pk4
         self.load_variables()
         self.homograph2features = construct_homograph_dictionary()
 
+        self.tagger = load_tagger() if preload_tagger else None
+
+        self.oov_cache_size = oov_cache_size
+        self.oov_cache_path = oov_cache_path
+        self.oov_cache = OrderedDict()
+        if oov_cache_path is not None and Path(oov_cache_path).exists():
+            self.load_oov_cache(oov_cache_path)
+
+    def load_oov_cache(self, path):
+        with open(path, encoding="utf8") as f:
+            for word, pron in json.load(f).items():
+                self._cache_oov(word, pron)
+
+    def save_oov_cache(self, path=None):
+        '''Write the OOV cache as json, least recently used first.'''
+        path = Path(path if path is not None else self.oov_cache_path)
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(self.oov_cache, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def _cache_oov(self, word, pron):
+        if self.oov_cache_size <= 0:
+            return
+        self.oov_cache[word] = pron
+        self.oov_cache.move_to_end(word)
+        if len(self.oov_cache) > self.oov_cache_size:
+            self.oov_cache.popitem(last=False)
+
+    def predict_oov(self, words):
+        '''Pronunciations of distinct OOV words, from the cache or predict_batch.'''
+        prons = {}
+        for word in words:
+            if word in self.oov_cache:
+                self.oov_cache.move_to_end(word)
+                prons[word] = self.oov_cache[word]
+        misses = [word for word in words if word not in prons]
+        for word, pron in zip(misses, self.predict_batch(misses)):
+            prons[word] = pron
+            self._cache_oov(word, pron)
+        return prons
+
     def load_variables(self):
         self.variables = np.load( str(G2P_EN_DIR / 'checkpoint20.npz'))
         self.enc_emb = self.variables["enc_emb"]  # (29, 64). (len(graphemes), emb)
@@ -91,6 +141,14 @@ class G2p(object):
         self.fc_w = self.variables["fc_w"]  # (74, 128)
         self.fc_b = self.variables["fc_b"]  # (74,)
 
+        # for predict_batch: embeddings are looked up by index, so fold them into the
+        # input projection, emb[idx] @ w_ih.T + b_ih == (emb @ w_ih.T + b_ih)[idx]
+        self.enc_gi = np.matmul(self.enc_emb, self.enc_w_ih.T) + self.enc_b_ih  # (29, 3*128)
+        self.dec_gi = np.matmul(self.dec_emb, self.dec_w_ih.T) + self.dec_b_ih  # (74, 3*128)
+        self.enc_w_hh_t = np.ascontiguousarray(self.enc_w_hh.T)  # (128, 3*128)
+        self.dec_w_hh_t = np.ascontiguousarray(self.dec_w_hh.T)  # (128, 3*128)
+        self.fc_w_t = np.ascontiguousarray(self.fc_w.T)  # (128, 74)
+
     def sigmoid(self, x):
         return 1 / (1 + np.exp(-x))
 
@@ -109,6 +167,22 @@ class G2p(object):
 
         return h
 
+    def grucell_fused(self, gi, h, w_hh_t, b_hh, gh):
+        """grucell with the input projection `gi` already computed.
+        `gh` is a preallocated (b, 3*h) buffer for the hidden projection.
+        """
+        np.matmul(h, w_hh_t, out=gh)
+        gh += b_hh
+        size = h.shape[-1]
+
+        rz = self.sigmoid(gi[:, :size * 2] + gh[:, :size * 2])
+        r, z = rz[:, :size], rz[:, size:]
+
+        n = np.tanh(gi[:, size * 2:] + r * gh[:, size * 2:])
+        h = (1 - z) * n + z * h
+
+        return h
+
     def gru(self, x, steps, w_ih, w_hh, b_ih, b_hh, h0=None):
         if h0 is None:
             h0 = np.zeros((x.shape[0], w_hh.shape[1]), np.float32)
@@ -149,7 +223,55 @@ class G2p(object):
         preds = [self.idx2p.get(idx, "<unk>") for idx in preds]
         return preds
 
-    def __call__(self, text):
+    def predict_batch(self, words, batch_size=1024):
+        """Batched version of predict. Returns one phoneme list per word.
+        Words are sorted by length, so the rows still running at each step
+        are a prefix of the batch.
+        """
+        words = list(words)
+        preds = [None] * len(words)
+        order = sorted(range(len(words)), key=lambda i: -len(words[i]))
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            for i, pred in zip(indices, self._predict_sorted([words[i] for i in indices])):
+                preds[i] = pred
+        return preds
+
+    def _predict_sorted(self, words):
+        # encoder: (b, t) grapheme ids, padded with <pad>
+        unk, eos = self.g2idx["<unk>"], self.g2idx["</s>"]
+        lengths = [len(word) + 1 for word in words]
+        x = np.zeros((len(words), lengths[0]), np.int64)
+        for i, word in enumerate(words):
+            x[i, :lengths[i]] = [self.g2idx.get(char, unk) for char in word] + [eos]
+        gi = self.enc_gi[x]  # (b, t, 3*h)
+
+        h = np.zeros((len(words), self.enc_w_hh.shape[-1]), np.float32)
+        gh = np.empty((len(words), self.enc_w_hh.shape[0]), np.float32)
+        n_active = len(words)
+        for t in range(lengths[0]):
+            while lengths[n_active - 1] <= t:
+                n_active -= 1
+            h[:n_active] = self.grucell_fused(gi[:n_active, t], h[:n_active], self.enc_w_hh_t,
+                                              self.enc_b_hh, gh[:n_active])
+
+        # decoder: greedy, in lockstep until every word has emitted </s>
+        preds = [[] for _ in words]
+        active = np.arange(len(words))
+        dec = np.full(len(words), 2)  # 2: <s>
+        for i in range(20):
+            h = self.grucell_fused(self.dec_gi[dec], h, self.dec_w_hh_t, self.dec_b_hh, gh[:len(active)])
+            logits = np.matmul(h, self.fc_w_t) + self.fc_b
+            pred = logits.argmax(-1)
+            running = pred != 3  # 3: </s>
+            active, h, dec = active[running], h[running], pred[running]
+            for j, idx in zip(active.tolist(), dec.tolist()):
+                preds[j].append(idx)
+            if not len(active): break
+
+        return [[self.idx2p.get(idx, "<unk>") for idx in pred] for pred in preds]
+
+    def tokenize(self, text):
         # preprocessing
         text = unicode(text)
         text = normalize_numbers(text)
@@ -161,9 +283,38 @@ class G2p(object):
         text = text.replace("e.g.", "for example")
 
         # tokenization
-        words = word_tokenize(text)
-        tokens = pos_tag(words)  # tuples of (word, tag)
-
+        return word_tokenize(text)
+
+    def pos_tag_sents(self, sentences):
+        '''Same as nltk.pos_tag_sents, with the tagger loaded once.'''
+        if self.tagger is None:
+            self.tagger = load_tagger()
+        return self.tagger.tag_sents(sentences)
+
+    def batch(self, texts):
+        '''Convert many texts at once. Only sentences containing a homograph
+        are POS tagged, all in one pos_tag_sents call, and OOV words of all
+        texts are predicted together.
+        '''
+        sentences = [self.tokenize(text) for text in texts]
+
+        # POS is only used to choose the pronunciation of homographs
+        tokens = [[(word, None) for word in words] for words in sentences]
+        tagged = [i for i, words in enumerate(sentences)
+                  if any(word in self.homograph2features for word in words)]
+        if tagged:
+            for i, sentence in zip(tagged, self.pos_tag_sents([sentences[i] for i in tagged])):
+                tokens[i] = sentence  # tuples of (word, tag)
+
+        # predict all oov words at once
+        oov = list({word for words in sentences for word in words
+                    if re.search("[a-z]", word) is not None and word not in self.homograph2features
+                    and word not in self.cmu})
+        oov2pron = self.predict_oov(oov)
+
+        return [self._pronounce(sentence, oov2pron) for sentence in tokens]
+
+    def _pronounce(self, tokens, oov2pron):
         # steps
         prons = []
         for word, pos in tokens:
@@ -179,13 +330,19 @@ class G2p(object):
             elif word in self.cmu:  # lookup CMU dict
                 pron = self.cmu[word][0]
             else: # predict for oov
-                pron = self.predict(word)
+                pron = oov2pron[word]
 
             prons.extend(pron)
             prons.extend([" "])
 
         return prons[:-1]
 
+    def __call__(self, text):
+        '''text: a string, or a list of strings converted with batch().'''
+        if isinstance(text, (list, tuple)):
+            return self.batch(text)
+        return self.batch([text])[0]
+
 if __name__ == '__main__':
     texts = ["I have $250 in my pocket.", # number -> spell-out
              "popular pets, e.g. cats and dogs", # e.g. -> for example
@@ -23,7 +23,9 @@
 #/bAmFru).
 
 
-from typing import Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
 from kabosu_core.language.types import NjdObject
 
 from kabosu_core.language.njd.ja.modify_acc import (
@@ -32,8 +34,6 @@ from kabosu_core.language.njd.ja.modify_acc import (
     retreat_acc_nuc,
     modify_filler_accent,
 )
-from kabosu_core.language.njd.ja.modify_yomi import modify_kanji_yomi
-from kabosu_core.language.njd.ja.odoriji import process_odori_features
 from kabosu_core.language.njd.ja.utils import (
     preserve_noun_accent,
     MULTI_READ_KANJI_LIST
@@ -42,11 +42,22 @@ from kabosu_core.assets import MARINE_MODEL_DIR, MARINE_VOCAB_DIR
 from kabosu_core.language.njd.ja.hougen import convert_to_keihan_acc
 from kabosu_core.language.njd.ja.talk_styles import convert_talkstyle
 
-from jpreprocess import JPreprocess
+if TYPE_CHECKING:
+    from jpreprocess import JPreprocess
 
 _global_marine = None
 
 
+def __getattr__(name: str):
+    # 読みの修正は sudachipy と onnxruntime を使うので，import 時には読み込まない
+    if name == "modify_kanji_yomi":
+        from kabosu_core.language.njd.ja.modify_yomi import modify_kanji_yomi
+        return modify_kanji_yomi
+    if name == "process_odori_features":
+        from kabosu_core.language.njd.ja.odoriji import process_odori_features
+        return process_odori_features
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def load_marine_model(model_dir: Union[str, None] = None, dict_dir: Union[str, None] = None):
     global _global_marine
@@ -110,6 +121,9 @@ def apply_postprocessing(
         njd_features = preserve_noun_accent(njd_features, pred_njd_features)
 
     if use_vanilla is False:
+        from kabosu_core.language.njd.ja.modify_yomi import modify_kanji_yomi
+        from kabosu_core.language.njd.ja.odoriji import process_odori_features
+
         njd_features = modify_filler_accent(njd_features)
         njd_features = modify_kanji_yomi(text, njd_features, MULTI_READ_KANJI_LIST)
         njd_features = retreat_acc_nuc(njd_features)
@@ -1,60 +1,66 @@
 
 from kabosu_core.assets import ASAPY_JSON_DIR, ASAPY_TSV_DIR
+import functools
+import hashlib
 import json
+import os
+import pickle
+from pathlib import Path
+
+# 読み込むリソースの属性名とファイル名
+JSON_RESOURCES = {
+    "ccharts": "ccharts.json",
+    "categorys": "new_categorys.json",
+    "idioms": "idioms.json",
+    "filters": "filters.json",
+    "compoundPredicates": "compoundPredicates.json",
+    "nouns": "NounTest.json",
+}
+FRAME_RESOURCE = "new_argframes.tsv"
+CACHE_NAME = "asapy_resources"
+CACHE_VERSION = 2
+
 
 class LoadJson():
 
-    def __init__(self):
+    def __init__(self, cache_dir: Path | str | None = None, use_cache: bool = True):
 
-        self.frames = self.__load_frame("new_argframes.tsv")  
-        self.ccharts = self.__load_json("ccharts.json")
+        # リソースはプロセス内で一度だけ読み込み，全インスタンスで共有する(読み取り専用として扱うこと)
+        resources = load_resources(cache_dir, use_cache)
+
+        self.frames = resources["frames"]
+        self.ccharts = resources["ccharts"]
         #self.verb = "dict/verbs.json"
-        self.categorys = self.__load_json("new_categorys.json")
-        self.idioms = self.__load_json("idioms.json")
-        self.filters = self.__load_json("filters.json")
-        self.compoundPredicates = self.__load_json("compoundPredicates.json")
-        self.nouns = self.__load_json("NounTest.json")
+        self.categorys = resources["categorys"]
+        self.idioms = resources["idioms"]
+        self.filters = resources["filters"]
+        self.compoundPredicates = resources["compoundPredicates"]
+        self.nouns = resources["nouns"]
+        self.noun_index = resources["noun_index"]
 
         #self.dicframe = "new_argframes.dic"
         #self.diccchart = "ccharts.dic"
         #self.dicfilter = "filters.dic"
         #"new_argframes.json"
 
-    def __load_json(self, jsonpath: str) -> dict:
-        dirname = ASAPY_JSON_DIR
-        with open(str(dirname / jsonpath), 'r+') as f:
-            return json.load(f)
-    
-    def __load_frame(self, tsvpath):
-        index = {}
-        data = (ASAPY_TSV_DIR / tsvpath).read_text(encoding="utf8")
-        for line in data.split("\n"):
-            n = line.split("\t")
-            index.update({n[0]: (int(n[1]), int(n[2]))})
-        return index 
+    def __find_noun(self, noun: str) -> int | None:
+        # head, head + support のどちらかが noun か noun[:-1] と一致する最初のフレーム
+        positions = [self.noun_index[key] for key in (noun, noun[:-1]) if key in self.noun_index]
+        return min(positions) if positions else None
 
     def get_frame_noun(self, noun: str) -> dict:
         frame = None
         if noun:
-            for frame_ in self.noun['dict']:
-                head = frame_['head'] if frame_['head'] else ''
-                support = frame_['support'] if frame_['support'] else ''
-                bol = (head == noun) or (head + support == noun) or (head == noun[:-1]) or (head + support == noun[:-1])
-                if bol:
-                    frame = frame_
-                    break
+            position = self.__find_noun(noun)
+            if position is not None:
+                frame = self.nouns['dict'][position]
         return frame
     
     
     def isframe_noun(self, noun: str) -> bool:
         bol = False
         if noun:
-            for frame in self.nouns['dict']:
-                head = frame['head'] if frame['head'] else ''
-                support = frame['support'] if frame['support'] else ''
-                bol = (head == noun) or (head + support == noun) or (head == noun[:-1]) or (head + support == noun[:-1])
-                if bol:
-                    break
+            bol = self.__find_noun(noun) is not None
         return bol
         
     def get_frame(self, verb: str) -> dict:
@@ -69,4 +75,92 @@ class LoadJson():
     
     def isframe(self, verb: str) -> bool:
         return verb in self.index
-        
\ No newline at end of file
+
+
+@functools.lru_cache(maxsize=None)
+def load_resources(cache_dir: Path | str | None = None, use_cache: bool = True) -> dict:
+    """json/tsv をパースした結果と索引を返す
+
+    結果はプロセス内でキャッシュされる。use_cache の場合はアセットのハッシュを
+    ファイル名に含む pickle を cache_dir (既定はアセットと同じ場所)に置き，
+    次のプロセスからはパースせずにそれを読む。
+    """
+    resources = None
+    if use_cache:
+        cache_file = Path(cache_dir if cache_dir is not None else ASAPY_JSON_DIR) / f"{CACHE_NAME}.{_asset_hash()}.pickle"
+        resources = _load_cache(cache_file)
+    if resources is None:
+        resources = _load_resources()
+        if use_cache:
+            _save_cache(cache_file, resources)
+    return resources
+
+
+def _source_paths() -> list:
+    return [ASAPY_TSV_DIR / FRAME_RESOURCE] + [ASAPY_JSON_DIR / jsonpath for jsonpath in JSON_RESOURCES.values()]
+
+
+def _asset_hash() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_VERSION).encode())
+    for path in _source_paths():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_resources() -> dict:
+    resources = {"frames": _load_frame(FRAME_RESOURCE)}
+    for name, jsonpath in JSON_RESOURCES.items():
+        resources[name] = _load_json(jsonpath)
+    resources["noun_index"] = build_noun_index(resources["nouns"])
+    return resources
+
+
+def _load_cache(cache_file: Path) -> dict | None:
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _save_cache(cache_file: Path, resources: dict) -> None:
+    tmp_file = cache_file.with_name(cache_file.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump(resources, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file.replace(cache_file)
+        # 古いアセットのキャッシュを消す
+        for old_file in cache_file.parent.glob(f"{CACHE_NAME}.*.pickle"):
+            if old_file != cache_file:
+                old_file.unlink(missing_ok=True)
+    except OSError:
+        # 書き込めない場所にある場合はキャッシュせずに続ける
+        tmp_file.unlink(missing_ok=True)
+
+
+def _load_json(jsonpath: str) -> dict:
+    dirname = ASAPY_JSON_DIR
+    with open(str(dirname / jsonpath), 'r+') as f:
+        return json.load(f)
+
+
+def _load_frame(tsvpath):
+    index = {}
+    data = (ASAPY_TSV_DIR / tsvpath).read_text(encoding="utf8")
+    for line in data.split("\n"):
+        n = line.split("\t")
+        index.update({n[0]: (int(n[1]), int(n[2]))})
+    return index
+
+
+def build_noun_index(nouns: dict) -> dict:
+    """head と head + support から NounTest.json の最初の該当フレームの位置を引く索引"""
+    index = {}
+    for position, frame in enumerate(nouns['dict']):
+        head = frame['head'] if frame['head'] else ''
+        support = frame['support'] if frame['support'] else ''
+        index.setdefault(head, position)
+        index.setdefault(head + support, position)
+    return index
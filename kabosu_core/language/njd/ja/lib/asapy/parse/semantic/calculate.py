@@ -1,6 +1,40 @@
 from kabosu_core.language.njd.ja.lib.asapy.result import Chunk
 
 from operator import itemgetter
+from typing import Callable, Hashable
+
+#
+# 類似度の高い組み合わせから順に，事例の格(key)と入力文の文節が重複しないように選ぶ
+# 類似度の降順(同値は元の順)に一度だけ走査するので，選ぶたびに候補を作り直す必要はない
+#
+def greedy_match(comb: list, key: Callable[[tuple], Hashable]) -> list:
+    if any(c[0] < 0 for c in comb):
+        # 負の類似度は「残りの類似度の和が 0 になるまで」の条件が単調でないので素直に計算する
+        return _greedy_match_naive(comb, key)
+    insts = []
+    used_keys = set()
+    used_chunks = set()
+    for c in sorted(comb, key=lambda c: -c[0]):
+        if not c[0]:
+            break
+        c_key = key(c)
+        if c_key in used_keys or id(c[2]) in used_chunks:
+            continue
+        insts.append(c)
+        used_keys.add(c_key)
+        used_chunks.add(id(c[2]))
+    return insts
+
+
+def _greedy_match_naive(comb: list, key: Callable[[tuple], Hashable]) -> list:
+    insts = []
+    while(sum(c[0] for c in comb)):
+        max_ = max(comb, key=lambda c: c[0])
+        insts.append(max_)
+        m_key = key(max_)
+        comb = [c for c in comb if (key(c) != m_key) and (c[2] is not max_[2])]
+    return insts
+
 
 #
 # フレームより曖昧性を解消する計算を行うクラス
@@ -39,22 +73,16 @@ class Calculate():
     #
     def __calculateSntSimilar(self, instance: dict, linkchunks: list) -> tuple:
         comb = self.__calculateAllCombinations(instance, linkchunks)
-        insts = []
-        while(sum(c[0] for c in comb)):
-            tmp_comb = []
-            max_ = max(comb, key=lambda c: c[0])
-            insts.append(max_)
-            for c in comb:
-                c_noun = c[1]['noun'] if c[1]['noun'] else ''
-                c_part = c[1]['part'] if c[1]['part'] else ''
-                m_noun = max_[1]['noun'] if max_[1]['noun'] else ''
-                m_part = max_[1]['part'] if max_[1]['part'] else ''
-                if (c_noun + c_part != m_noun + m_part) and (c[2] != max_[2]):
-                    tmp_comb.append(c)
-            comb = tmp_comb
+        insts = greedy_match(comb, self.__caseKey)
         similar = sum(c[0] for c in insts)
         return (similar, insts)
 
+    @staticmethod
+    def __caseKey(c: tuple) -> str:
+        c_noun = c[1]['noun'] if c[1]['noun'] else ''
+        c_part = c[1]['part'] if c[1]['part'] else ''
+        return c_noun + c_part
+
     #
     # 入力文と事例の項のすべての組み合わせの項類似度を求める
     #
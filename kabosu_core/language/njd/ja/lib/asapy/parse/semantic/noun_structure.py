@@ -1,5 +1,6 @@
 from kabosu_core.language.njd.ja.lib.asapy.result import Chunk
 from kabosu_core.language.njd.ja.lib.asapy.load import LoadJson
+from kabosu_core.language.njd.ja.lib.asapy.parse.semantic.calculate import greedy_match
 
 
 class NounStructure():
@@ -24,15 +25,11 @@ class NounStructure():
 
     def __calculateSntSimilar(self, instance: dict, chunk: Chunk) -> tuple:
         comb = self.__calculateAllCombinations(instance, chunk)
-        insts = []
-        while(sum(c[0] for c in comb)):
-            tmp_comb = []
-            max_ = max(comb, key=lambda c: c[0])
-            insts.append(max_)
-            for c in comb:
-                if c[1] != max_[1] and c[2] != max_[2]:
-                    tmp_comb.append(c)
-            comb = tmp_comb
+        # 等しい格は同じ番号で扱う
+        cases = instance['cases']
+        case_ids = [next(j for j, case in enumerate(cases) if case == icase) for icase in cases]
+        case_ids = {id(icase): case_id for icase, case_id in zip(cases, case_ids)}
+        insts = greedy_match(comb, lambda c: case_ids[id(c[1])])
         similar = sum(c[0] for c in insts)
         return (similar, insts)
 
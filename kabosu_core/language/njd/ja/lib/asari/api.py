@@ -1,24 +1,78 @@
 
+import json
+
+import numpy as np
 import onnxruntime as rt
 
-from kabosu_core.language.njd.ja.lib.asari.preprocess import tokenize
+from kabosu_core.language.njd.ja.lib.asari.preprocess import tokenize, tokenize_batch
 from kabosu_core.assets import ASARI_MODEL_PATH
 
 class Sonar:
-    def __init__(self):
+    def __init__(
+        self,
+        intra_op_num_threads: int | None = None,
+        inter_op_num_threads: int | None = None,
+        sess_options: rt.SessionOptions | None = None,
+        providers: list[str] | None = None,
+    ):
         pipeline_file = ASARI_MODEL_PATH
-        self.sess = rt.InferenceSession(str(pipeline_file))
+        if sess_options is None:
+            sess_options = rt.SessionOptions()
+        if intra_op_num_threads is not None:
+            sess_options.intra_op_num_threads = intra_op_num_threads
+        if inter_op_num_threads is not None:
+            sess_options.inter_op_num_threads = inter_op_num_threads
+        self.sess = rt.InferenceSession(str(pipeline_file), sess_options=sess_options, providers=providers)
         self.input_name = self.sess.get_inputs()[0].name
         self.prob_name = self.sess.get_outputs()[1].name
+        # column order of the arrays returned by ping_batch(..., return_proba=True).
+        # train.py stores it in the model metadata; older pipelines give it with the first result
+        metadata = self.sess.get_modelmeta().custom_metadata_map
+        self.classes: list[str] | None = json.loads(metadata["classes"]) if "classes" in metadata else None
 
-    def ping(self, text: str):
-        tokenized = tokenize(text)
-        proba = self.sess.run([self.prob_name], {self.input_name: [tokenized]})[0][0]
-        res = {
+    def _run(self, tokenized: list[str]) -> list[dict[str, float]]:
+        probas = self.sess.run([self.prob_name], {self.input_name: tokenized})[0]
+        if self.classes is None and probas:
+            self.classes = list(probas[0].keys())
+        return probas
+
+    @staticmethod
+    def _to_result(text: str, proba: dict[str, float]) -> dict:
+        return {
             "text": text,
             "top_class": max(proba, key=lambda k: proba[k]),
             "classes": [
                 {"class_name": class_name, "confidence": confidence} for class_name, confidence in proba.items()
             ],
         }
-        return res
+
+    def ping(self, text: str):
+        tokenized = tokenize(text)
+        proba = self._run([tokenized])[0]
+        return self._to_result(text, proba)
+
+    def ping_batch(
+        self,
+        texts: list[str],
+        workers: int = 1,
+        batch_size: int = 1024,
+        return_proba: bool = False,
+    ) -> list[dict] | np.ndarray:
+        """Score many texts, feeding batch_size documents to the pipeline per run.
+
+        texts are tokenized with up to `workers` processes, which are kept for
+        the next call; small batches are tokenized in this process. With return_proba=True,
+        a (len(texts), len(self.classes)) float32 array is returned instead of
+        the per-text dicts of ping().
+        """
+        texts = list(texts)
+        tokenized = tokenize_batch(texts, workers=workers)
+        probas = []
+        for start in range(0, len(tokenized), batch_size):
+            probas.extend(self._run(tokenized[start:start + batch_size]))
+        if return_proba:
+            array = np.empty((len(probas), len(self.classes or [])), dtype=np.float32)
+            for i, proba in enumerate(probas):
+                array[i] = [proba[class_name] for class_name in self.classes]
+            return array
+        return [self._to_result(text, proba) for text, proba in zip(texts, probas)]
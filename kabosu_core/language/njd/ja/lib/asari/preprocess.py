@@ -1,7 +1,33 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 from kabosu_core.language import vibrato
 
 t = vibrato.Tagger(dictionary="ipa-dic")
 
+# below this many texts per worker, starting or feeding the worker processes costs more than tokenizing here
+MIN_TEXTS_PER_WORKER = 256
+
+_executors: dict[int, ProcessPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
 
 def tokenize(text: str) -> str:
     return " ".join([ i[0] for i in t(text)])
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """one pool per requested number of workers, kept for the lifetime of the process"""
+    with _executor_lock:
+        if workers not in _executors:
+            _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _executors[workers]
+
+
+def tokenize_batch(texts: list[str], workers: int = 1) -> list[str]:
+    # the batch size only decides how many workers get texts; the pool itself always has `workers` processes
+    busy_workers = min(workers, len(texts) // MIN_TEXTS_PER_WORKER)
+    if busy_workers <= 1:
+        return [tokenize(text) for text in texts]
+    chunksize = max(1, len(texts) // (busy_workers * 4))
+    return list(_get_executor(workers).map(tokenize, texts, chunksize=chunksize))
@@ -52,6 +52,8 @@ def main(args):
         }
     }
     onx = to_onnx(pipe, np.array(x_train)[1:], options=seps)
+    # Sonar.classes reads the column order of the probabilities from here
+    onx.metadata_props.add(key="classes", value=json.dumps([str(c) for c in pipe.classes_], ensure_ascii=False))
     with open(args.pipeline, "wb") as f:
         f.write(onx.SerializeToString())
 
@@ -11,9 +11,10 @@ from kabosu_core.language.njd.ja.lib.bunkai.constant import METACHAR_LINE_BREAK
 
 
 class LinebreakAnnotator(Annotator):
-    def __init__(self, *, path_model: Path):
+    def __init__(self, *, path_model: Path, **predictor_options: typing.Any):
+        """:param predictor_options: passed to Predictor (batch_size, backend, quantize, num_threads)."""
         super().__init__(LinebreakAnnotator.__name__)
-        self.linebreak_detector = Predictor(modelpath=path_model)
+        self.linebreak_detector = Predictor(modelpath=path_model, **predictor_options)
 
     @staticmethod
     def generate_sentence_structure(
@@ -63,13 +64,9 @@ class LinebreakAnnotator(Annotator):
                 current_index += 1
         return processed_spans
 
-    def annotate(self, original_text: str, spans: Annotations) -> Annotations:
-        """Tokenize済み結果をデータ加工する。Predictorが求める形式にする."""
-        sub_texts = self.generate_sentence_structure(spans)
-        # tokenizerを更新する。すでにTokenize済みの結果を利用する。
-        # self.linebreak_detector.reset_tokenizer(word_tokenizer_type='pre_tokenize', sentence2tokens=sentence2tokens)
-        __result = list(self.linebreak_detector.predict([sub_texts]))
-
+    def __add_predicted_layer(
+        self, original_text: str, spans: Annotations, __result: typing.List[typing.Set[int]]
+    ) -> Annotations:
         new_spans = spans.get_final_layer()
         morpheme_sequence = list(spans.get_annotation_layer(MorphAnnotatorJanome.__name__))
         if len(__result) > 0:
@@ -92,3 +89,21 @@ class LinebreakAnnotator(Annotator):
             spans.add_annotation_layer(self.rule_name, new_spans)
 
         return spans
+
+    def annotate(self, original_text: str, spans: Annotations) -> Annotations:
+        """Tokenize済み結果をデータ加工する。Predictorが求める形式にする."""
+        sub_texts = self.generate_sentence_structure(spans)
+        # tokenizerを更新する。すでにTokenize済みの結果を利用する。
+        # self.linebreak_detector.reset_tokenizer(word_tokenizer_type='pre_tokenize', sentence2tokens=sentence2tokens)
+        __result = list(self.linebreak_detector.predict([sub_texts]))
+        return self.__add_predicted_layer(original_text, spans, __result)
+
+    def annotate_batch(self, original_texts: typing.List[str], spans_list: typing.List[Annotations]) -> typing.List[Annotations]:
+        """全文書をまとめてPredictorに渡し、1回の推論で改行位置を予測する."""
+        sub_texts_list = [self.generate_sentence_structure(spans) for spans in spans_list]
+        __results = list(self.linebreak_detector.predict(sub_texts_list))
+        assert len(__results) == len(spans_list)
+        return [
+            self.__add_predicted_layer(original_text, spans, [__result])
+            for original_text, spans, __result in zip(original_texts, spans_list, __results)
+        ]
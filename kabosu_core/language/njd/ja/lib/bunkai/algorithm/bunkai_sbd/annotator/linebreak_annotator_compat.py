@@ -13,5 +13,5 @@ if install_with_lb:
 else:
     # void class for compat
     class LinebreakAnnotator:
-        def __init__(self, *, path_model):
+        def __init__(self, *, path_model, **predictor_options):
             raise Exception("You need to install bunkai with pip install -U bunkai[lb]")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 from pathlib import Path
-from typing import Iterator, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from kabosu_core.language.njd.ja.lib.bunkai.algorithm.bunkai_sbd.annotator import (
     BasicRule,
@@ -56,7 +56,8 @@ class BunkaiPipeline(AnnotatorPipeline):
 
 
 class BunkaiSentenceBoundaryDisambiguation(SentenceBoundaryDisambiguator):
-    def __init__(self, *, path_model: Optional[Path] = None):
+    def __init__(self, *, path_model: Optional[Path] = None, predictor_options: Optional[Dict[str, Any]] = None):
+        """:param predictor_options: options of the linebreak Predictor used with path_model."""
         morph_annotator = MorphAnnotatorJanome()
 
         _annotators = [
@@ -75,12 +76,13 @@ class BunkaiSentenceBoundaryDisambiguation(SentenceBoundaryDisambiguator):
         else:
             _idxs = [i for i, ann in enumerate(_annotators) if ann.rule_name == MorphAnnotatorJanome.__name__]
             assert len(_idxs) > 0, f"{MorphAnnotatorJanome.__name__} does not exist in a pipeline"
-            _annotators.insert(_idxs[0] + 1, LinebreakAnnotator(path_model=path_model))
+            _annotators.insert(_idxs[0] + 1, LinebreakAnnotator(path_model=path_model, **(predictor_options or {})))
 
         self.pipeline = BunkaiPipeline(_annotators)
         super().__init__()
 
-    def eos(self, text: str) -> Annotations:
+    @staticmethod
+    def __init_annotations(text: str) -> Annotations:
         annotations = Annotations()
         annotations.add_annotation_layer(
             LAYER_NAME_FIRST,
@@ -94,14 +96,30 @@ class BunkaiSentenceBoundaryDisambiguation(SentenceBoundaryDisambiguator):
                 )
             ],
         )
+        return annotations
+
+    def eos(self, text: str) -> Annotations:
+        annotations = self.__init_annotations(text)
         for rule_obj in self.pipeline:
             rule_obj.annotate(text, annotations)
         return annotations
 
+    def eos_batch(self, texts: List[str]) -> List[Annotations]:
+        """Run the pipeline rule by rule over all texts, so that LinebreakAnnotator predicts them at once."""
+        annotations_list = [self.__init_annotations(text) for text in texts]
+        for rule_obj in self.pipeline:
+            rule_obj.annotate_batch(texts, annotations_list)
+        return annotations_list
+
+    @staticmethod
+    def __get_end_index(annotations: Annotations) -> List[int]:
+        return list(sorted(list(set([s_a.end_index for s_a in annotations.get_final_layer()]))))
+
     def find_eos(self, text: str) -> List[int]:
-        annotations = self.eos(text)
-        end_index = list(sorted(list(set([s_a.end_index for s_a in annotations.get_final_layer()]))))
-        return end_index
+        return self.__get_end_index(self.eos(text))
+
+    def find_eos_batch(self, texts: List[str]) -> List[List[int]]:
+        return [self.__get_end_index(annotations) for annotations in self.eos_batch(texts)]
 
     def __call__(self, text: str) -> Iterator[str]:
         annotations = self.eos(text)
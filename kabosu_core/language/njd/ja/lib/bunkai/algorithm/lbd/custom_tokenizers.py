@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import collections
+import functools
 import logging
 import os
 import typing
@@ -120,6 +121,7 @@ class VibratoSubwordsTokenizer(BertTokenizer):
         pad_token="[PAD]",
         cls_token="[CLS]",
         mask_token="[MASK]",
+        word_cache_size: int = 65536,
         **kwargs,
     ):
         """
@@ -135,7 +137,15 @@ class VibratoSubwordsTokenizer(BertTokenizer):
                 Type of word tokenizer. basic / janome / pre_tokenize
         :arg subword_tokenizer_type: (`optional`) string (default "wordpiece") Type of subword tokenizer.
         :arg cls_token: No description.
+        :arg word_cache_size: (`optional`) int (default 65536) Number of tokenized words to cache. 0 disables it.
         """
+        # the base __init__ registers the special tokens through get_vocab(), so the vocab has to be loaded first
+        if os.path.isfile(vocab_file):
+            self.vocab = load_vocab(vocab_file)
+        else:
+            self.vocab = load_vocab(cached_file(vocab_file, "vocab.txt"))
+        self.ids_to_tokens = collections.OrderedDict([(ids, tok) for tok, ids in self.vocab.items()])
+
         super(BertTokenizer, self).__init__(
             unk_token=unk_token,
             sep_token=sep_token,
@@ -145,15 +155,8 @@ class VibratoSubwordsTokenizer(BertTokenizer):
             **kwargs,
         )
 
-        if os.path.isfile(vocab_file):
-            self.vocab = load_vocab(vocab_file)
-        else:
-            self.vocab = load_vocab(cached_file(vocab_file, "vocab.txt"))
-
         # add new vocab
-        self.add_tokens([" ", kabosu_core.bunkai.constant.METACHAR_LINE_BREAK])
-
-        self.ids_to_tokens = collections.OrderedDict([(ids, tok) for tok, ids in self.vocab.items()])
+        self.add_tokens([" ", kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK])
 
         self.do_word_tokenize = False
         self.do_subword_tokenize = True
@@ -166,15 +169,25 @@ class VibratoSubwordsTokenizer(BertTokenizer):
                 raise ValueError("Invalid subword_tokenizer_type '{}' is specified.".format(subword_tokenizer_type))
 
         self.janome_tokenizer = VibratoTokenizer()
+        # Predictor tokenizes the same words over and over, so string inputs are cached.
+        self._tokenize_str = (
+            functools.lru_cache(maxsize=word_cache_size)(self._tokenize_str_uncached)
+            if word_cache_size > 0
+            else self._tokenize_str_uncached
+        )
+
+    def _tokenize_str_uncached(self, text: str) -> typing.Tuple[str, ...]:
+        return tuple(self._tokenize_morphemes(self.janome_tokenizer.tokenize(text)))
 
     def tokenize(self, text: typing.Union[str, typing.List[str]]) -> typing.List[str]:
         if isinstance(text, str):
-            morphemes = self.janome_tokenizer.tokenize(text)
+            return list(self._tokenize_str(text))
         elif isinstance(text, list) and all([isinstance(t, str) for t in text]):
-            morphemes = text
+            return self._tokenize_morphemes(text)
         else:
             raise Exception(f"Invalid input-type {text}")
 
+    def _tokenize_morphemes(self, morphemes: typing.List[str]) -> typing.List[str]:
         if self.do_subword_tokenize:
             split_tokens = []
             for token in morphemes:
@@ -15,23 +15,109 @@ from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.corpus import LABEL_OT
 from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.custom_tokenizers import VibratoSubwordsTokenizer, VibratoTokenizer
 from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.train import BunkaiConfig, MyDataset
 from kabosu_core.language.njd.ja.lib.bunkai.base.annotation import Tokens
-from kabosu_core.language.njd.ja.lib.bunkai.third.utils_ner import InputExample, get_labels
+from kabosu_core.language.njd.ja.lib.bunkai.third.utils_ner import InputExample, InputFeatures, get_labels
 
 StringMorphemeInputType = typing.List[typing.List[str]]  # (batch-size * variable-length of sentence * tokens)
 
+ONNX_MODEL_NAME: str = "model.onnx"
+ONNX_QUANTIZED_MODEL_NAME: str = "model.quant.onnx"
+BACKENDS: typing.Tuple[str, ...] = ("torch", "onnx")
+
+
+def _model_input_names(model) -> typing.List[str]:
+    if model.base_model_prefix == "bert":  # hotfix
+        return ["input_ids", "attention_mask", "token_type_ids"]
+    return ["input_ids", "attention_mask"]
+
+
+def export_onnx(modelpath: Path, quantize: bool = False) -> Path:
+    """
+    Export the linebreak model in modelpath to ONNX, next to the original model.
+
+    :param quantize: also write an int8 dynamically quantized model (needs onnxruntime).
+    :return: path of the exported (or quantized) model.
+    """
+    model = AutoModelForTokenClassification.from_pretrained(str(modelpath))
+    model.eval()
+    input_names = _model_input_names(model)
+    dummy = torch.ones((1, 8), dtype=torch.long)
+
+    path_onnx = modelpath.joinpath(ONNX_MODEL_NAME)
+    torch.onnx.export(
+        model,
+        tuple(dummy for _ in input_names),
+        str(path_onnx),
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["logits"]},
+        opset_version=14,
+        dynamo=False,
+    )
+    if not quantize:
+        return path_onnx
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    path_quantized = modelpath.joinpath(ONNX_QUANTIZED_MODEL_NAME)
+    quantize_dynamic(str(path_onnx), str(path_quantized), weight_type=QuantType.QInt8)
+    return path_quantized
+
 
 class Predictor(object):
-    def __init__(self, modelpath: Path) -> None:
+    def __init__(
+        self,
+        modelpath: Path,
+        *,
+        batch_size: int = 32,
+        backend: str = "torch",
+        quantize: bool = False,
+        num_threads: typing.Optional[int] = None,
+    ) -> None:
         """
         Use VibratoTokenizer by default if the input is Document(String).
 
         If the input is Morpheme(String), Tokenizers are not called.
 
-        :param subword_tokenizer_type: pre_tokenize, janome, basic
+        :param batch_size: number of sub-documents in one forward pass.
+            Sub-documents are sorted by length and padded only up to the longest one in the batch.
+        :param backend: torch or onnx. onnx runs the model exported by export_onnx() with onnxruntime.
+        :param quantize: use an int8 dynamically quantized model (CPU only).
+        :param num_threads: number of intra-op threads for the model.
+            With the torch backend this calls torch.set_num_threads, which applies to the whole process.
         """
-        self.model = AutoModelForTokenClassification.from_pretrained(str(modelpath))
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = self.model.to(self.device)
+        if backend not in BACKENDS:
+            raise ValueError(f"backend should be one of {BACKENDS}, but got {backend}")
+        self.batch_size = batch_size
+        self.backend = backend
+        self.device = torch.device("cuda" if torch.cuda.is_available() and not quantize else "cpu")
+
+        if backend == "onnx":
+            import onnxruntime
+
+            path_onnx = modelpath.joinpath(ONNX_QUANTIZED_MODEL_NAME if quantize else ONNX_MODEL_NAME)
+            if not path_onnx.exists():
+                raise FileNotFoundError(
+                    f"{path_onnx} does not exist. Export it with "
+                    f"`python -m {__name__} --model {modelpath} --export-onnx" + (" --quantize`" if quantize else "`")
+                )
+            session_options = onnxruntime.SessionOptions()
+            if num_threads is not None:
+                session_options.intra_op_num_threads = num_threads
+            self.session = onnxruntime.InferenceSession(
+                str(path_onnx), sess_options=session_options, providers=["CPUExecutionProvider"]
+            )
+            self.input_names = [i.name for i in self.session.get_inputs()]
+            self.base_model_prefix = "bert" if "token_type_ids" in self.input_names else "distilbert"
+        else:
+            if num_threads is not None:
+                torch.set_num_threads(num_threads)
+            self.model = AutoModelForTokenClassification.from_pretrained(str(modelpath))
+            self.model.eval()
+            if quantize:
+                self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = self.model.to(self.device)
+            self.input_names = _model_input_names(self.model)
+            self.base_model_prefix = self.model.base_model_prefix
 
         self.labels = get_labels(str(modelpath.joinpath("labels.txt")))
         self.label_map: typing.Dict[int, str] = {i: label for i, label in enumerate(self.labels)}
@@ -43,8 +129,9 @@ class Predictor(object):
         self.tokenizer = VibratoSubwordsTokenizer(self.path_tokenizer_model)
 
         # hotfix
-        if self.model.base_model_prefix == "distilbert" and "token_type_ids" in self.tokenizer.model_input_names:
+        if self.base_model_prefix == "distilbert" and "token_type_ids" in self.tokenizer.model_input_names:
             self.tokenizer.model_input_names.remove("token_type_ids")
+        assert self.tokenizer.padding_side == "right", "dynamic padding expects right-padded features"
 
     def _split_long_text(
         self, tokens: typing.List[str]
@@ -59,10 +146,10 @@ class Predictor(object):
         tokenized_spans_list: typing.List[typing.List[str]] = []
         tmp_stack: typing.List[str] = []
         for __t in tokens:
-            if __t == kabosu_core.bunkai.constant.METACHAR_LINE_BREAK:
+            if __t == kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK:
                 if len(tmp_stack) > 0:
                     tokenized_spans_list.append(tmp_stack)
-                tokenized_spans_list.append([kabosu_core.bunkai.constant.METACHAR_LINE_BREAK])
+                tokenized_spans_list.append([kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK])
                 tmp_stack = []
             else:
                 # sub-word tokenize
@@ -113,23 +200,7 @@ class Predictor(object):
                     )
                 )
         ds = MyDataset(examples, self.labels, self.bc.max_seq_length, self.tokenizer, False)
-
-        kwargs = {
-            "input_ids": torch.tensor([f.input_ids for f in ds.features], device=self.device),
-            "attention_mask": torch.tensor([f.attention_mask for f in ds.features], device=self.device),
-        }
-        if self.model.base_model_prefix == "bert":  # hotfix
-            kwargs["token_type_ids"] = torch.tensor([f.token_type_ids for f in ds.features], device=self.device)
-
-        predictions = self.model(**kwargs).logits.to("cpu").detach().numpy()
-
-        assert isinstance(
-            predictions, np.ndarray
-        ), f"Unexpected error. A value type of a model prediction is {type(predictions)}. expect = numpy.ndarray"
-        assert len(predictions.shape) == 3, (
-            f"Unexpected error. A value tensor of a model prediction is {len(predictions.shape)} tensor. "
-            f"expect = 3rd tensor."
-        )
+        predictions = self._run_model(ds.features)
 
         out: typing.List[typing.Set[int]] = []
         word_idx_offset = 0
@@ -145,6 +216,9 @@ class Predictor(object):
                 num_sw: int = num_subwords[idx][word_idx]
                 while num_sw > 0:
                     sw_idx += 1
+                    if sw_idx >= len(pred):
+                        # truncated by max_seq_length
+                        break
                     label_high_prob = int(np.argmax(pred[sw_idx]))
                     if self.label_map[label_high_prob] == LABEL_SEP:
                         out[-1].add(word_idx + word_idx_offset)
@@ -152,6 +226,40 @@ class Predictor(object):
 
         return out
 
+    def _run_model(self, features: typing.List[InputFeatures]) -> typing.List[np.ndarray]:
+        """
+        Run the model with length-bucketed dynamic padding.
+
+        Features are padded to max_seq_length. They are sorted by their real length,
+        and each batch is cut down to the longest sequence within the batch.
+        :return: logits of each feature (real-length * num_labels), in the order of features.
+        """
+        name2arrays = {
+            "input_ids": np.asarray([f.input_ids for f in features], dtype=np.int64),
+            "attention_mask": np.asarray([f.attention_mask for f in features], dtype=np.int64),
+        }
+        if "token_type_ids" in self.input_names:
+            name2arrays["token_type_ids"] = np.asarray([f.token_type_ids for f in features], dtype=np.int64)
+        lengths = name2arrays["attention_mask"].sum(axis=1)
+
+        predictions: typing.List[np.ndarray] = [np.empty(0)] * len(features)
+        order = np.argsort(lengths, kind="stable")
+        for batch_indices in chunked(order, n=self.batch_size):
+            batch_indices = np.asarray(batch_indices)
+            max_length = int(lengths[batch_indices].max())
+            batch = {name: array[batch_indices, :max_length] for name, array in name2arrays.items()}
+
+            if self.backend == "onnx":
+                logits = self.session.run(["logits"], batch)[0]
+            else:
+                with torch.inference_mode():
+                    kwargs = {name: torch.from_numpy(array).to(self.device) for name, array in batch.items()}
+                    logits = self.model(**kwargs).logits.to("cpu").detach().numpy()
+
+            for i, feature_index in enumerate(batch_indices):
+                predictions[feature_index] = logits[i, : lengths[feature_index]]
+        return predictions
+
 
 def get_opts() -> argparse.Namespace:
     oparser = argparse.ArgumentParser()
@@ -165,6 +273,10 @@ def get_opts() -> argparse.Namespace:
     )
     oparser.add_argument("--model", "-m", type=Path, required=True)
     oparser.add_argument("--batch", "-b", type=int, default=1, help="Number of documents to feed a batch")
+    oparser.add_argument("--batch-size", type=int, default=32, help="Number of sub-documents in one forward pass")
+    oparser.add_argument("--backend", choices=BACKENDS, default="torch")
+    oparser.add_argument("--quantize", action="store_true", help="Use an int8 quantized model")
+    oparser.add_argument("--export-onnx", action="store_true", help="Export the model to ONNX and exit")
     return oparser.parse_args()
 
 
@@ -174,11 +286,11 @@ def generate_initial_annotation_obj(
     tokenizer = VibratoTokenizer()
     for document in input_stream:
         # document: a text = document
-        assert kabosu_core.bunkai.constant.METACHAR_SENTENCE_BOUNDARY not in document
+        assert kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY not in document
         document_spans: Tokens = annotation2spans(document[:-1])
         document_tokens: typing.List[str] = []
         for fragment in document_spans.spans:
-            if kabosu_core.bunkai.constant.METACHAR_LINE_BREAK in fragment:
+            if kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK in fragment:
                 document_tokens.append(fragment)
             else:
                 tokens = tokenizer.tokenize(fragment)
@@ -190,7 +302,10 @@ def generate_initial_annotation_obj(
 
 def main() -> None:
     opts = get_opts()
-    pdt = Predictor(opts.model)
+    if opts.export_onnx:
+        sys.stderr.write(f"Exported to {export_onnx(opts.model, quantize=opts.quantize)}\n")
+        return
+    pdt = Predictor(opts.model, batch_size=opts.batch_size, backend=opts.backend, quantize=opts.quantize)
 
     with opts.input as inf, opts.output as outf:
         for one_batch in chunked(generate_initial_annotation_obj(inf), n=opts.batch):
@@ -198,7 +313,7 @@ def main() -> None:
                 for tid, token in enumerate(one_batch[did]):
                     outf.write(token)
                     if tid in token_ids_seps:
-                        outf.write(kabosu_core.bunkai.constant.METACHAR_SENTENCE_BOUNDARY)
+                        outf.write(kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY)
                 else:
                     outf.write("\n")
 
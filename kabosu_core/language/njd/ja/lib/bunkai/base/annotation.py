@@ -61,12 +61,18 @@ class Annotations:
     name2spans: Dict[str, List[SpanAnnotation]] = dataclasses.field(default_factory=dict)
     name2order: Dict[str, int] = dataclasses.field(default_factory=dict)
     current_order: int = 0
+    # rule_name -> unique span annotations, rebuilt lazily when layers change.
+    _rule_name2spans: Optional[Dict[str, List[SpanAnnotation]]] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _n_indexed_spans: int = dataclasses.field(default=-1, init=False, repr=False, compare=False)
 
     def add_annotation_layer(self, annotator_name: str, annotations: List[SpanAnnotation]) -> None:
         self.name2spans[annotator_name] = annotations
         self.name2order[annotator_name] = self.current_order
         self.annotator_forward = annotator_name
         self.current_order += 1
+        self._rule_name2spans = None
 
     def add_flatten_annotations(self, annotations: List[SpanAnnotation]):
         self.name2spans = {
@@ -76,6 +82,7 @@ class Annotations:
                 key=lambda a: a.rule_name,
             )
         }
+        self._rule_name2spans = None
 
     def flatten(self) -> Iterator[SpanAnnotation]:
         return itertools.chain.from_iterable(self.name2spans.values())
@@ -86,12 +93,26 @@ class Annotations:
         else:
             return self.name2spans[self.annotator_forward]
 
+    def __get_rule_name2spans(self) -> Dict[str, List[SpanAnnotation]]:
+        """Index unique span annotations of all layers by rule_name.
+
+        Layers may be extended in place (e.g. LinebreakAnnotator appends to the final layer),
+        so the index is also rebuilt when the total number of spans changes.
+        """
+        n_spans = sum(len(layer) for layer in self.name2spans.values())
+        if self._rule_name2spans is None or self._n_indexed_spans != n_spans:
+            span_anns = {str(ann): ann for ann in self.flatten()}
+            rule_name2spans: Dict[str, List[SpanAnnotation]] = {}
+            for ann in span_anns.values():
+                if ann.rule_name is not None:
+                    rule_name2spans.setdefault(ann.rule_name, []).append(ann)
+            self._rule_name2spans = rule_name2spans
+            self._n_indexed_spans = n_spans
+        return self._rule_name2spans
+
     def get_annotation_layer(self, layer_name: str) -> Iterator[SpanAnnotation]:
-        assert layer_name in list(self.name2spans.keys()), f"{layer_name} not in analysis layers."
-        span_anns = {str(ann): ann for ann in itertools.chain.from_iterable(self.name2spans.values())}
-        for ann in span_anns.values():
-            if ann.rule_name is not None and ann.rule_name == layer_name:
-                yield ann
+        assert layer_name in self.name2spans, f"{layer_name} not in analysis layers."
+        yield from self.__get_rule_name2spans().get(layer_name, [])
         return
 
     def get_morph_analysis(self, name_annotation_layer: str = "MorphAnnotatorJanome") -> Iterator[TokenResult]:
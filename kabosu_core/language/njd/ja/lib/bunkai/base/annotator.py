@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import bisect
+import itertools
 import typing
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
@@ -10,18 +12,29 @@ from kabosu_core.language.njd.ja.lib.bunkai.base.annotation import Annotations,
 def func_filter_span(
     spans_wide: typing.List[SpanAnnotation], spans_narrow: typing.List[SpanAnnotation]
 ) -> typing.List[SpanAnnotation]:
-    """Compare spans_wide and spans_narrow. If there is an overlap, use wider one."""
+    """Compare spans_wide and spans_narrow. If there is an overlap, use wider one.
+
+    Wide spans are sorted by start index once, and each narrow span is checked against
+    the max end index of the wide spans starting at or before it, O((n + m) log m).
+    """
+    if len(spans_wide) == 0:
+        return list(spans_narrow)
+
+    # an empty range is within any range, a non-empty range is never within an empty one.
+    wide_ranges = sorted(
+        (f_ann.start_index, f_ann.end_index) for f_ann in spans_wide if f_ann.start_index < f_ann.end_index
+    )
+    wide_starts = [start for start, _ in wide_ranges]
+    wide_max_ends = list(itertools.accumulate((end for _, end in wide_ranges), max))
+
     __filtered = []
     for b_ann in spans_narrow:
-        is_skip = False
-        b_span = b_ann.get_spans()
-        for f_ann in spans_wide:
-            if b_span.within(f_ann.get_spans()):
-                is_skip = True
-            else:
-                pass
-        if is_skip is False:
-            __filtered.append(b_ann)
+        if b_ann.start_index >= b_ann.end_index:
+            continue
+        __i = bisect.bisect_right(wide_starts, b_ann.start_index)
+        if __i > 0 and wide_max_ends[__i - 1] >= b_ann.end_index:
+            continue
+        __filtered.append(b_ann)
     return __filtered
 
 
@@ -64,6 +77,10 @@ class Annotator(metaclass=ABCMeta):
     def annotate(self, original_text: str, spans: Annotations) -> Annotations:
         raise NotImplementedError()
 
+    def annotate_batch(self, original_texts: List[str], spans_list: List[Annotations]) -> List[Annotations]:
+        """Annotate many documents. Override this when a rule can share work across documents."""
+        return [self.annotate(text, spans) for text, spans in zip(original_texts, spans_list)]
+
 
 class AnnotationFilter(Annotator):
     @staticmethod
@@ -99,6 +116,12 @@ class SentenceBoundaryDisambiguator(metaclass=ABCMeta):
     def find_eos(self, text: str) -> List[int]:
         raise NotImplementedError()
 
+    def eos_batch(self, texts: List[str]) -> List[Annotations]:
+        return [self.eos(text) for text in texts]
+
+    def find_eos_batch(self, texts: List[str]) -> List[List[int]]:
+        return [self.find_eos(text) for text in texts]
+
     @abstractmethod
     def __call__(self, text: str) -> Iterator[str]:
         raise NotImplementedError()
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 
 import argparse
+import multiprocessing
 import sys
 import tempfile
 import typing
 import zipfile
 from pathlib import Path
 
+from more_itertools import chunked
+
 import kabosu_core.language.njd.ja.lib.bunkai.constant
 from kabosu_core.language.njd.ja.lib.bunkai import __version__
 from kabosu_core.language.njd.ja.lib.bunkai.algorithm.bunkai_sbd.bunkai_sbd import BunkaiSentenceBoundaryDisambiguation
@@ -56,6 +59,37 @@ def get_opts() -> argparse.Namespace:
         action="store_true",
         help="Print Morphological analyses result",
     )
+    oparser.add_argument(
+        "--batch-size",
+        "-b",
+        type=int,
+        default=1,
+        help="Number of lines analyzed together (a model runs one forward pass per batch)",
+    )
+    oparser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of worker processes",
+    )
+    oparser.add_argument(
+        "--lb-batch-size",
+        type=int,
+        default=32,
+        help="Number of sub-documents in one forward pass of a model",
+    )
+    oparser.add_argument(
+        "--lb-backend",
+        choices=["torch", "onnx"],
+        default="torch",
+        help="Inference backend of a model (onnx needs `python -m ...lbd.predict --export-onnx`)",
+    )
+    oparser.add_argument(
+        "--lb-quantize",
+        action="store_true",
+        help="Use an int8 quantized model",
+    )
     oparser.add_argument(
         "--version",
         "-v",
@@ -76,62 +110,111 @@ def is_install_with_lb() -> bool:
         return True
 
 
+def _preprocess(_text: str) -> str:
+    assert "\n" not in _text
+    assert kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY not in _text
+
+    return _text.replace(
+        kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK,
+        "\n",
+    )
+
+
+def _generate_ma(annotation_obj) -> typing.Iterator[str]:
+    tokens = annotation_obj.get_morph_analysis()
+    end_indices = set([s_a.end_index for s_a in annotation_obj.get_final_layer()])
+
+    position: int = 0
+    for (
+        idx,
+        token,
+    ) in enumerate(tokens):
+        prev_position: int = position
+        if token.node_obj is None or token.word_surface == "\n":
+            yield kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK
+            position += 1
+        else:
+            yield f"{token.word_surface}\t"
+            node = token.node_obj
+            yield f"{node.part_of_speech},{node.infl_type},{node.infl_form}"
+            yield f",{node.base_form},{node.reading},{node.phonetic}"
+            position += len(token.word_surface)
+        yield "\n"
+        for p in range(
+            prev_position,
+            position,
+        ):
+            if p + 1 in end_indices:
+                yield "EOS\n"
+
+
+def _generate_eos(text: str, __annotator_result: typing.List[int]) -> typing.Iterator[str]:
+    last: int = 0
+    for (
+        idx,
+        split_point,
+    ) in enumerate(__annotator_result):
+        yield text[last:split_point].replace(
+            "\n",
+            kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK,
+        )
+        if idx != len(__annotator_result) - 1:
+            yield kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY
+        last = split_point
+    yield "\n"
+
+
 def run(
     annotator,
     _text: str,
     ma: bool = False,
 ) -> typing.Iterator[str]:
-    assert "\n" not in _text
-    assert kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_SENTENCE_BOUNDARY not in _text
+    text: str = _preprocess(_text)
 
-    text: str = _text.replace(
-        kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_LINE_BREAK,
-        "\n",
-    )
+    if ma:
+        yield from _generate_ma(annotator.eos(text))
+    else:
+        yield from _generate_eos(text, annotator.find_eos(text))
+
+
+def run_batch(
+    annotator,
+    _texts: typing.List[str],
+    ma: bool = False,
+) -> typing.Iterator[str]:
+    """Same output as calling run() for each text, but the texts are analyzed together."""
+    texts: typing.List[str] = [_preprocess(_text) for _text in _texts]
 
     if ma:
-        annotation_obj = annotator.eos(text)
-        tokens = annotation_obj.get_morph_analysis()
-        end_indices = set([s_a.end_index for s_a in annotation_obj.get_final_layer()])
-
-        position: int = 0
-        for (
-            idx,
-            token,
-        ) in enumerate(tokens):
-            prev_position: int = position
-            if token.node_obj is None or token.word_surface == "\n":
-                yield kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_LINE_BREAK
-                position += 1
-            else:
-                yield f"{token.word_surface}\t"
-                node = token.node_obj
-                yield f"{node.part_of_speech},{node.infl_type},{node.infl_form}"
-                yield f",{node.base_form},{node.reading},{node.phonetic}"
-                position += len(token.word_surface)
-            yield "\n"
-            for p in range(
-                prev_position,
-                position,
-            ):
-                if p + 1 in end_indices:
-                    yield "EOS\n"
+        for annotation_obj in annotator.eos_batch(texts):
+            yield from _generate_ma(annotation_obj)
     else:
-        __annotator_result: typing.List[int] = annotator.find_eos(text)
-
-        last: int = 0
-        for (
-            idx,
-            split_point,
-        ) in enumerate(__annotator_result):
-            yield text[last:split_point].replace(
-                "\n",
-                kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_LINE_BREAK,
-            )
-            if idx != len(__annotator_result) - 1:
-                yield kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_SENTENCE_BOUNDARY
-            last = split_point
-        yield "\n"
+        for text, __annotator_result in zip(texts, annotator.find_eos_batch(texts)):
+            yield from _generate_eos(text, __annotator_result)
+
+
+_worker_annotator = None
+
+
+def get_annotator_kwargs(opts: argparse.Namespace) -> typing.Dict[str, typing.Any]:
+    kwargs: typing.Dict[str, typing.Any] = {"path_model": opts.model}
+    if opts.algorithm == DEFAULT_ALGORITHM and opts.model is not None:
+        kwargs["predictor_options"] = {
+            "batch_size": opts.lb_batch_size,
+            "backend": opts.lb_backend,
+            "quantize": opts.lb_quantize,
+        }
+    return kwargs
+
+
+def _init_worker(algorithm: str, annotator_kwargs: typing.Dict[str, typing.Any]) -> None:
+    global _worker_annotator
+    _worker_annotator = algorithm2class[algorithm](**annotator_kwargs)
+
+
+def _run_worker(args: typing.Tuple[typing.List[str], bool]) -> str:
+    texts, ma = args
+    return "".join(run_batch(_worker_annotator, texts, ma))
 
 
 def setup(
@@ -198,32 +281,50 @@ def main() -> None:
         )
         return
 
-    cls = algorithm2class[opts.algorithm]
-    annotator = cls(path_model=opts.model)
+    if opts.batch_size < 1 or opts.workers < 1:
+        raise ValueError("--batch-size and --workers should be positive")
+
     warned: bool = False
 
-    with opts.input.open() as inf, opts.output.open("w") as outf:
+    def read_lines(inf: typing.TextIO) -> typing.Iterator[str]:
+        nonlocal warned
         for line in inf:
             ol: str = line[:-1]
-            if kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_SENTENCE_BOUNDARY in ol:
+            if kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY in ol:
                 ol = ol.replace(
-                    kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_SENTENCE_BOUNDARY,
+                    kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY,
                     "",
                 )
                 if not warned:
                     sys.stderr.write(
                         "\033[91m"
-                        f"[Warning] All {kabosu_core.language.ja.nlp.bunkai.constant.METACHAR_SENTENCE_BOUNDARY} will be removed for input\n"
+                        f"[Warning] All {kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY} will be removed for input\n"
                         "\033[0m"
                     )
                     warned = True
+            yield ol
 
-            for op in run(
-                annotator,
-                ol,
-                opts.ma,
-            ):
-                outf.write(op)
+    with opts.input.open() as inf, opts.output.open("w") as outf:
+        batches = chunked(read_lines(inf), n=opts.batch_size)
+        if opts.workers == 1:
+            cls = algorithm2class[opts.algorithm]
+            annotator = cls(**get_annotator_kwargs(opts))
+            for batch in batches:
+                for op in run_batch(
+                    annotator,
+                    batch,
+                    opts.ma,
+                ):
+                    outf.write(op)
+        else:
+            with multiprocessing.Pool(
+                opts.workers,
+                initializer=_init_worker,
+                initargs=(opts.algorithm, get_annotator_kwargs(opts)),
+            ) as pool:
+                # imap keeps the input order
+                for op in pool.imap(_run_worker, ((batch, opts.ma) for batch in batches)):
+                    outf.write(op)
 
 
 if __name__ == "__main__":
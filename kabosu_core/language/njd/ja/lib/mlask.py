@@ -83,6 +83,56 @@ RE_VALANCE_NEU = re.compile(r'takaburi|odoroki|haji')
 RE_ACTIVATION_A = re.compile(r'takaburi|odoroki|haji|ikari|kowa')
 RE_ACTIVATION_P = re.compile(r'yasu|aware')
 RE_ACTIVATION_N = re.compile(r'iya|yorokobi|suki')
+MAX_EMOTION_WORDS = 7
+
+
+class _AhoCorasick(object):
+    """ Aho-Corasick automaton over characters, used to find emotemes in a text in one pass """
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for phrase in set(phrases):
+            if not phrase:
+                continue
+            node = 0
+            for char in phrase:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                node = next_node
+            self.output[node] = (phrase,)
+
+        # Breadth first, so that fail links of shallower nodes are ready
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self.goto[node].items():
+                queue.append(next_node)
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(char, 0)
+                self.fail[next_node] = fail
+                self.output[next_node] = self.output[next_node] + self.output[fail]
+
+    def findall(self, text):
+        """ Return the set of phrases occurring in text """
+        found = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
 
 
 class MLAsk(object):
@@ -136,6 +186,30 @@ class MLAsk(object):
             phrases = data.splitlines()
             self.emodic['emotion'][emotion_class] = phrases
 
+        self._compile_emodic()
+
+    def _compile_emodic(self):
+        """ Compile emotion dictionaries into matchers
+
+        Hits are kept with their (class, index) position so that results are
+        ordered the same way as scanning the dictionaries phrase by phrase.
+        """
+        self._emotem_index = collections.defaultdict(list)
+        for emotem_class, phrases in self.emodic['emotem'].items():
+            for index, phrase in enumerate(phrases):
+                self._emotem_index[phrase].append((emotem_class, index))
+        self._emotem_matcher = _AhoCorasick(self._emotem_index)
+
+        # Character trie of emotion phrases, walked along lemma boundaries
+        self._emotion_trie = {}
+        for rank, (emotion_class, phrases) in enumerate(self.emodic['emotion'].items()):
+            for index, phrase in enumerate(phrases):
+                node = self._emotion_trie
+                for char in phrase:
+                    node = node.setdefault(char, {})
+                node.setdefault(None, []).append((rank, index, emotion_class))
+        self._cvs_regex = {}
+
     def analyze(self, text):
         """ Detect emotion from text
 
@@ -196,6 +270,21 @@ class MLAsk(object):
             }
         return result
 
+    def analyze_batch(self, texts):
+        """ Detect emotion from many texts
+
+        Parameters
+        ----------
+        texts: iterable of str
+            Target texts.
+
+        Return
+        ------
+        list of dict
+            Result of emotion analysis per text, same as analyze().
+        """
+        return [self.analyze(text) for text in texts]
+
     def _normalize(self, text):
         text = text.replace('!', '！').replace('?', '？')
         return text
@@ -245,12 +334,16 @@ class MLAsk(object):
 
     def _find_emotem(self, lemmas, emoticons):
         """ Finding syntactical indicator of emotiveness """
+        matched = self._emotem_matcher.findall(lemmas['no_emotem'])
+        matched.add('')  # an empty line in a dictionary matches any text
+        hits = collections.defaultdict(list)
+        for emotem_item in matched:
+            for emotem_class, index in self._emotem_index.get(emotem_item, ()):
+                hits[emotem_class].append((index, emotem_item))
+
         emotemy = {}
-        for (emotem_class, emotem_items) in self.emodic['emotem'].items():
-            found = []
-            for emotem_item in emotem_items:
-                if emotem_item in lemmas['no_emotem']:
-                    found.append(emotem_item)
+        for emotem_class in self.emodic['emotem']:
+            found = [emotem_item for _, emotem_item in sorted(hits.get(emotem_class, ()))]
             if emotem_class == 'emotikony':
                 if len(emoticons) > 0:
                     found.append(','.join(emoticons))
@@ -266,24 +359,39 @@ class MLAsk(object):
     def _find_emotion(self, lemmas):
         """ Finding emotion word by dictionaries """
 
-        # Build all sentences comprised of words from the text (max number of words = 7)
-        total_length = len(lemmas['lemma_words'])
-        sentences = [''.join(lemmas['lemma_words'][i:j+1]) for i in range(total_length) for j in range(i, i + 7 if i + 7 <= total_length else total_length)]
-        text_sentences = set(sentences)
+        # Find phrases comprised of words from the text (max number of words = 7)
+        lemma_words = lemmas['lemma_words']
+        hits = set()
+        for i in range(len(lemma_words)):
+            node = self._emotion_trie
+            for lemma in lemma_words[i:i + MAX_EMOTION_WORDS]:
+                for char in lemma:
+                    node = node.get(char)
+                    if node is None:
+                        break
+                if node is None:
+                    break
+                hits.update(node.get(None, ()))
+
         found_emotions = collections.defaultdict(list)
-        for emotion_class, emotions in self.emodic['emotion'].items():
-            for emotion in emotions:
-                if emotion not in text_sentences:
-                    continue
-                cvs_regex = re.compile('%s(?:%s(%s))' % (emotion, RE_PARTICLES, RE_CVS))
-                # If there is Contextual Valence Shifters
-                if cvs_regex.findall(lemmas['all']):
-                    for new_emotion_class in CVS_TABLE[emotion_class]:
-                        found_emotions[new_emotion_class].append(emotion + "*CVS")
-                else:
-                    found_emotions[emotion_class].append(emotion)
+        for rank, index, emotion_class in sorted(hits):
+            emotion = self.emodic['emotion'][emotion_class][index]
+            # If there is Contextual Valence Shifters
+            if self._get_cvs_regex(emotion).search(lemmas['all']):
+                for new_emotion_class in CVS_TABLE[emotion_class]:
+                    found_emotions[new_emotion_class].append(emotion + "*CVS")
+            else:
+                found_emotions[emotion_class].append(emotion)
         return found_emotions if found_emotions else None
 
+    def _get_cvs_regex(self, emotion):
+        """ CVS pattern following the emotion word, compiled once per emotion """
+        cvs_regex = self._cvs_regex.get(emotion)
+        if cvs_regex is None:
+            cvs_regex = re.compile('%s(?:%s(%s))' % (emotion, RE_PARTICLES, RE_CVS))
+            self._cvs_regex[emotion] = cvs_regex
+        return cvs_regex
+
     def _estimate_sentiment_orientation(self, emotions):
         """ Estimating sentiment orientation (POSITIVE, NEUTRAL, NEGATIVE) """
         orientation = ''
@@ -23,6 +23,7 @@
 # SOFTWARE.
 
 #ver 0.4.3.1
+import functools
 import json
 
 
@@ -32,18 +33,48 @@ from kabosu_core.assets import OSETI_DIR
 
 NEGATION = ('ない', 'ず', 'ぬ')
 PARELLEL_PARTICLES = ('か', 'と', 'に', 'も', 'や', 'とか', 'だの', 'なり', 'やら')
+WAGO_MAX_PRECEDING_LEMMAS = 10
+_WAGO_KEY = None  # child key which never collides with a lemma
 
 
+@functools.lru_cache(maxsize=None)
+def _load_pn_dict(filename):
+    """pn_noun.json and pn_wago.json are loaded once per process and shared by Analyzer instances"""
+    with open(OSETI_DIR / filename) as f:
+        return json.load(f)
+
+
+def _compile_wago(wago_dict):
+    """Compile wago phrases into a trie over reversed lemma sequences
+
+    'A B C' is stored as root['C']['B']['A'][_WAGO_KEY] = 'A B C'
+    """
+    trie = {}
+    for wago in wago_dict:
+        node = trie
+        for lemma in reversed(wago.split(' ')):
+            node = node.setdefault(lemma, {})
+        node[_WAGO_KEY] = wago
+    return trie
+
+
+@functools.lru_cache(maxsize=None)
+def _load_default_wago_trie():
+    return _compile_wago(_load_pn_dict('pn_wago.json'))
+
 
 class Analyzer(object):
 
     def __init__(self, mecab_args='', word_dict={}, wago_dict={}):
-        self.word_dict = json.load(open(OSETI_DIR / 'pn_noun.json'))
+        self.word_dict = _load_pn_dict('pn_noun.json')
         if word_dict:
-            self.word_dict.update(word_dict)
-        self.wago_dict = json.load(open(OSETI_DIR / 'pn_wago.json'))
+            self.word_dict = {**self.word_dict, **word_dict}
+        self.wago_dict = _load_pn_dict('pn_wago.json')
         if wago_dict:
-            self.wago_dict.update(wago_dict)
+            self.wago_dict = {**self.wago_dict, **wago_dict}
+            self.wago_trie = _compile_wago(self.wago_dict)
+        else:
+            self.wago_trie = _load_default_wago_trie()
  
         self.tagger = vibrato.Tagger(dictionary="ipa-dic")
         self.bunkai = Bunkai()
@@ -51,11 +82,19 @@ class Analyzer(object):
     def _lookup_wago(self, lemma, lemmas):
         if lemma in self.wago_dict:
             return lemma
-        for i in range(10, 0, -1):
-            wago = ' '.join(lemmas[-i:]) + ' ' + lemma
-            if wago in self.wago_dict:
-                return wago
-        return ''
+        if not lemmas:
+            # ' '.join([]) + ' ' + lemma
+            return ' ' + lemma if ' ' + lemma in self.wago_dict else ''
+        # walk back from the current lemma, keeping the longest phrase
+        node = self.wago_trie.get(lemma)
+        wago = ''
+        for prev_lemma in reversed(lemmas[-WAGO_MAX_PRECEDING_LEMMAS:]):
+            if node is None:
+                break
+            node = node.get(prev_lemma)
+            if node is not None and _WAGO_KEY in node:
+                wago = node[_WAGO_KEY]
+        return wago
 
     def _has_arujanai(self, substring):
         return 'あるじゃない' in substring
@@ -78,7 +117,7 @@ class Analyzer(object):
             if 'BOS/EOS' not in feature:
                 substr_count += len(surface)
                 
-                lemma = feature[6] if feature[6] != '*' else word
+                lemma = feature[6] if feature[6] != '*' else surface
                 wago = ''
                 if lemma in self.word_dict:
                     polarity = 1 if self.word_dict[lemma] == 'p' else -1
@@ -119,6 +158,15 @@ class Analyzer(object):
                 lemmas.append(lemma)
         return polarities
 
+    def _count(self, polarities):
+        count = {'positive': 0, 'negative': 0}
+        for polarity in polarities:
+            if polarity[1] == 1:
+                count['positive'] += 1
+            elif polarity[1] == -1:
+                count['negative'] += 1
+        return count
+
     def count_polarity(self, text):
         """Calculate sentiment polarity counts per sentence
         Arg:
@@ -128,14 +176,8 @@ class Analyzer(object):
         """
         counts = []
         for sentence in self.bunkai(text):
-            count = {'positive': 0, 'negative': 0}
             polarities = self._calc_sentiment_polarity(sentence)
-            for polarity in polarities:
-                if polarity[1] == 1:
-                    count['positive'] += 1
-                elif polarity[1] == -1:
-                    count['negative'] += 1
-            counts.append(count)
+            counts.append(self._count(polarities))
         return counts
 
     def analyze(self, text):
@@ -148,12 +190,14 @@ class Analyzer(object):
         scores = []
         for sentence in self.bunkai(text):
             polarities = self._calc_sentiment_polarity(sentence)
-            if polarities:
-                scores.append(sum(p[1] for p in polarities) / len(polarities))
-            else:
-                scores.append(0)
+            scores.append(self._score(polarities))
         return scores
 
+    def _score(self, polarities):
+        if polarities:
+            return sum(p[1] for p in polarities) / len(polarities)
+        return 0
+
     def analyze_detail(self, text):
         """Calculate sentiment polarity scores per sentence
         Arg:
@@ -174,3 +218,38 @@ class Analyzer(object):
                 result = {'positive': [], 'negative': [], 'score': 0.0}
             results.append(result)
         return results
+
+    def analyze_batch(self, texts, detail=False, count=False):
+        """Calculate sentiment polarity per sentence for many texts
+        Sentences which appear more than once in texts are tokenized only once.
+        Arg:
+            texts (list[str])
+            detail (bool) : return analyze_detail() results
+            count (bool) : return count_polarity() results
+        Return:
+            results (list) : analyze() (or analyze_detail() / count_polarity()) result per text
+        """
+        sentences_list = [list(self.bunkai(text)) for text in texts]
+        sentence2polarities = {}
+        for sentences in sentences_list:
+            for sentence in sentences:
+                if sentence not in sentence2polarities:
+                    sentence2polarities[sentence] = self._calc_sentiment_polarity(sentence)
+
+        results = []
+        for sentences in sentences_list:
+            if detail:
+                result = []
+                for sentence in sentences:
+                    polarities = sentence2polarities[sentence]
+                    result.append({
+                        'positive': [p[0] for p in polarities if p[1] == 1],
+                        'negative': [p[0] for p in polarities if p[1] == -1],
+                        'score': self._score(polarities) if polarities else 0.0,
+                    })
+            elif count:
+                result = [self._count(sentence2polarities[sentence]) for sentence in sentences]
+            else:
+                result = [self._score(sentence2polarities[sentence]) for sentence in sentences]
+            results.append(result)
+        return results
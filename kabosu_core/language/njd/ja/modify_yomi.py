@@ -21,9 +21,10 @@
 #> TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 #> SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #/bAmFru).
+import functools
+
 from kabosu_core.language.types import NjdObject
 from kabosu_core.language.njd.ja.nani_predict import predict
-from sudachipy import dictionary, tokenizer
 
 def modify_kanji_yomi(
     text: str, pyopen_njd: list[NjdObject], multi_read_kanji_list: list[str]
@@ -77,11 +78,19 @@ def sudachi_analyze(text: str, multi_read_kanji_list: list[str]) -> list[list[st
         yomi_list (list[list[str]]): 漢字とその読み方のリスト
     """
 
+    from sudachipy import tokenizer
+
     text = text.replace("ー", "")
-    tokenizer_obj = dictionary.Dictionary().create()
     mode = tokenizer.Tokenizer.SplitMode.C
-    m_list = tokenizer_obj.tokenize(text, mode)
+    m_list = _sudachi_tokenizer().tokenize(text, mode)
     yomi_list = [
         [m.surface(), m.reading_form()] for m in m_list if m.surface() in multi_read_kanji_list
     ]
-    return yomi_list
\ No newline at end of file
+    return yomi_list
+
+@functools.lru_cache(maxsize=None)
+def _sudachi_tokenizer():
+    # sudachipy の import と辞書の読み込みは最初に使うときに一度だけ行う
+    from sudachipy import dictionary
+
+    return dictionary.Dictionary().create()
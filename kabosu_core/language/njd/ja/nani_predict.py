@@ -22,6 +22,7 @@
 #> SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #/bAmFru).
 
+import functools
 from typing import Union
 
 import numpy as np
@@ -31,10 +32,24 @@ from kabosu_core.assets import YOMI_MODEL_DIR
 
 X_COLS = ["pos", "pos_group1", "pos_group2", "pron", "ctype", "cform"]
 
-# ONNX モデルをロード
-# 非常に軽量なモデルのため、import 時に ONNX モデルをロードするオーバーヘッドはほとんどない
-try:
-    from onnxruntime import InferenceSession
+
+@functools.lru_cache(maxsize=None)
+def load_sessions():
+    """
+    ONNX モデルを最初に使うときに一度だけロードする
+
+    onnxruntime の import とセッションの作成は import 時ではなくここで行うので，
+    「何」を含まない文しか扱わないプロセスでは読み込まれない。
+    """
+    try:
+        from onnxruntime import InferenceSession
+    except ImportError:
+        # ONNX Runtime がインストールされていない場合は、モデルをロードしない
+        # ONNX Runtime は onnxruntime (無印, CPU 版)・onnxruntime-gpu (CUDA 版)・onnxruntime-directml (DirectML 版) などが提供されている
+        # ユーザーはこのうちいずれかのパッケージ「のみ」をインストールする必要があるため、ライブラリ側からは依存関係を明示できない
+        print("Warning: ONNX Runtime is not installed. Nani prediction will be disabled.")
+        print("Please install ONNX Runtime by `pip install pyopenjtalk-plus[onnxruntime]`")
+        return None, None
 
     enc_session = InferenceSession(
         YOMI_MODEL_DIR / "nani_enc.onnx",
@@ -44,17 +59,11 @@ try:
         YOMI_MODEL_DIR / "nani_model.onnx",
         providers=["CPUExecutionProvider"],
     )
-except ImportError:
-    # ONNX Runtime がインストールされていない場合は、モデルをロードしない
-    # ONNX Runtime は onnxruntime (無印, CPU 版)・onnxruntime-gpu (CUDA 版)・onnxruntime-directml (DirectML 版) などが提供されている
-    # ユーザーはこのうちいずれかのパッケージ「のみ」をインストールする必要があるため、ライブラリ側からは依存関係を明示できない
-    print("Warning: ONNX Runtime is not installed. Nani prediction will be disabled.")
-    print("Please install ONNX Runtime by `pip install pyopenjtalk-plus[onnxruntime]`")
-    enc_session = None
-    model_session = None
+    return enc_session, model_session
 
 
 def predict(input_njd: list[Union[NjdObject, None]]) -> int:
+    enc_session, model_session = load_sessions()
     # ONNX Runtime がインストールされていない場合は常に 0 を返す
     if enc_session is None or model_session is None:
         return 0
@@ -1,31 +1,45 @@
 
-import jaconv
+import functools
 import re
-import kanalizer
 
-from kabosu_core.language.njd.ja.lib.yomikata.dbert import dBert
-from kabosu_core.language.njd.ja.lib.yomikata.dictionary import Dictionary
 
+from kabosu_core.language.njd.ja.normalizer.itaiji import normalize_itaiji
 
-_global_reader = dBert()
-_global_dictreader = Dictionary()
+_FURIGANA_PATTERN = re.compile("{.+/.+}")
+_ALPHABET_PATTERN = re.compile("[a-z]+")
 
 
+# yomikata (torch, transformers) のモデルと辞書は，最初に読みを推定するときに一度だけ読み込む
+@functools.lru_cache(maxsize=None)
+def get_reader():
+    from kabosu_core.language.njd.ja.lib.yomikata.dbert import dBert
+    return dBert()
 
-from kabosu_core.language.njd.ja.normalizer.itaiji import normalize_itaiji
+@functools.lru_cache(maxsize=None)
+def get_dictreader():
+    from kabosu_core.language.njd.ja.lib.yomikata.dictionary import Dictionary
+    return Dictionary()
+
+
+def __getattr__(name: str):
+    if name == "_global_reader":
+        return get_reader()
+    if name == "_global_dictreader":
+        return get_dictreader()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-_FURIGANA_PATTERN = re.compile("{.+/.+}")
-_ALPHABET_PATTERN = re.compile("[a-z]+")
 
 def reader_furigana(text:str):
     # this liblary use include version yomikata
-    return _global_reader.furigana(text) #type: ignore
+    return get_reader().furigana(text) #type: ignore
 
 def dictreader_furigana(text:str):
-    return _global_dictreader.furigana(text) #type: ignore
+    return get_dictreader().furigana(text) #type: ignore
 
 
 def kanalizer_convert(text: str):
+    import kanalizer
+
     return kanalizer.convert(text, on_invalid_input="warning")
 
 def normalize_text(
@@ -43,7 +57,8 @@ def normalize_text(
     ## output
     str : normalized text
     """
-    
+    import jaconv
+
     if hankaku:
         text = jaconv.h2z(text)
 
@@ -21,12 +21,15 @@
 #> TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 #> SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #/bAmFru).
+from __future__ import annotations
+
 from kabosu_core.language.types import NjdObject
 
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-import jpreprocess
-from jpreprocess import JPreprocess
+if TYPE_CHECKING:
+    import jpreprocess
+    from jpreprocess import JPreprocess
 
 def process_odori_features(
     njd_features: list[NjdObject],
@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
 
 
+import functools
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 
-from nltk.corpus.util import LazyCorpusLoader
-from nltk.corpus.reader.cmudict import CMUDictCorpusReader
-
-from kabosu_core.language.njd.ko.jamo import h2j, j2hcj
+from kabosu_core.language.njd.ko.jamo import h2j, h2hcj
 #from nltk.corpus import cmudict
 from kabosu_core.language import vibrato as MeCab
 
@@ -20,7 +19,7 @@ from kabosu_core.language import vibrato as MeCab
 
 from kabosu_core.language.njd.ko.special import jyeo, ye, consonant_ui, josa_ui, vowel_ui, jamo, rieulgiyeok, rieulbieub, verb_nieun, balb, palatalize, modifying_rieul
 from kabosu_core.language.njd.ko.regular import link1, link2, link3, link4
-from kabosu_core.language.njd.ko.utils import annotate, compose, group, gloss, parse_table, get_rule_id2text
+from kabosu_core.language.njd.ko.utils import annotate, compose, group, gloss, parse_table, parse_idioms, get_rule_id2text, compile_rule, compile_rules, compile_prefilter
 from kabosu_core.language.njd.ko.normalaizer.english import convert_eng
 from kabosu_core.language.njd.ko.normalaizer.numerals import convert_num
 
@@ -30,27 +29,63 @@ from kabosu_core.language.njd.ko.normalaizer.japanese import convert_jpn
 from kabosu_core.language.njd.ko.korean import join_jamos, split_syllables
 #=============================================================
 
-from kabosu_core.assets import G2PK4_DICT_DIR, NLTK_DIR
+from kabosu_core.assets import G2PK4_DICT_DIR
+from kabosu_core.language.njd.cmudict import load_lexicon
+
+RE_ANNOTATION = re.compile("/[PJEB]")
+CODAS = [chr(code) for code in range(0x11A8, 0x11C3)]
+ONSETS = [chr(code) for code in range(0x1100, 0x1113)]
+
+
+def fix_rieul_nieun(inp):
+    '''8.5 Error Fix, 제 20항 적용 오류 해결
+    Applying it again does not change the result.
+    '''
+    inp_ = ""
+    inp = split_syllables(inp.strip())
+    i = 0
+    while i < len(inp) - 4:
+        if (inp[i:i+3] == 'ㅇㅡㄹ' or inp[i:i+3] == 'ㄹㅡㄹ') and inp[i+3] == ' ' and inp[i+4] == 'ㄹ':
+            inp_ += inp[i:i+3] + ' ' + 'ㄴ'
+            i += 5
+        else:
+            inp_ += inp[i]
+            i += 1
+    inp_ += inp[i:]
+    return join_jamos(inp_)
 
 
 class G2p(object):
-    def __init__(self,):
+    def __init__(self, word_cache_size: int = 0):
+        '''word_cache_size: if > 0, pronunciations of up to this many eojeol (words),
+        keyed by the annotated word, are cached and reused across calls.
+        '''
         
         self.vibrato = MeCab.Tagger()
         self.table = parse_table()
 
 
 
-        cmudict = LazyCorpusLoader(name="cmudict",
-                                    reader_cls=CMUDictCorpusReader,
-                                    nltk_data_subdir=NLTK_DIR,
-                                    fileids=["cmudict"]
-                                    )
-        self.cmu = cmudict.dict() # for English
+        self.cmu = load_lexicon() # for English, shared with the English G2p
 
         self.rule2text = get_rule_id2text() # for comments of main rules
         self.idioms_path = (G2PK4_DICT_DIR / "idioms.txt")
 
+        # idioms and the rule table are compiled once
+        idioms = parse_idioms()
+        self.idiom_rules = compile_rules(idioms)
+        self.idiom_prefilter = compile_prefilter([str1 for str1, _ in idioms])
+        self.table_rules = []
+        for str1, str2, rule_ids in self.table:
+            rule = "\n".join(self.rule2text.get(rule_id, "") for rule_id in rule_ids)
+            self.table_rules.append((compile_rule(str1, str2), rule))
+
+        self.word_cache_size = word_cache_size
+        if word_cache_size:
+            self._pronounce_unit = functools.lru_cache(maxsize=word_cache_size)(self._pronounce)
+            self.cross_word_pairs = self._find_cross_word_pairs()
+            self.boundary_jamo = frozenset(CODAS + ONSETS)
+
     def load_module_func(self, module_name):
         tmp = __import__(module_name, fromlist=[module_name])
         return tmp
@@ -70,16 +105,86 @@ class G2p(object):
         rule = "from idioms.txt"
         out = string
 
-        with open(self.idioms_path, 'r', encoding="utf8") as f:
-            for line in f:
-                line = line.split("#")[0].strip()
-                if "===" in line:
-                    str1, str2 = line.split("===")
-                    out = re.sub(str1, str2, out)
+        # no idiom matches: every rule would leave the string as it is
+        if self.idiom_prefilter is not None and not self.idiom_prefilter.search(out):
+            return out
+
+        for idiom_rule in self.idiom_rules:
+            out = idiom_rule(out)
+        if verbose:
             gloss(verbose, out, string, rule)
 
         return out
 
+    def _pronounce(self, string, descriptive=False, verbose=False):
+        '''STEP 5-8 of __call__ for an annotated string'''
+        # 5. decompose
+        inp = h2j(string)
+
+        # 6. special
+        for func in (jyeo, ye, consonant_ui, josa_ui, vowel_ui, \
+                     jamo, rieulgiyeok, rieulbieub, verb_nieun, \
+                     balb, palatalize, modifying_rieul):
+            inp = func(inp, descriptive, verbose)
+        inp = RE_ANNOTATION.sub("", inp)
+        return self._regular(inp, descriptive, verbose)
+
+    def _regular(self, inp, descriptive=False, verbose=False):
+        '''STEP 7-8 of __call__ for a decomposed string'''
+        # 7. regular table: batchim + onset
+        if verbose:
+            for table_rule, rule in self.table_rules:
+                _inp = inp
+                inp = table_rule(inp)
+                gloss(verbose, inp, _inp, rule)
+        else:
+            for table_rule, _ in self.table_rules:
+                inp = table_rule(inp)
+
+        # 8 link
+        for func in (link1, link2, link3, link4):
+            inp = func(inp, descriptive, verbose)
+        return inp
+
+    def _find_cross_word_pairs(self):
+        '''(coda, onset) pairs which STEP 7-8 changes across the space between two words.
+        The table rules are written as coda + "( ?)" + onset, so most of them also apply between words.
+        They never look further than the coda and the onset, so probing each pair alone is enough.
+        The onset "" stands for anything else after the space: (coda, "") means the coda removes the space itself
+        (e.g. ᆶ(\\W|$) -> ᆯ), and then the next word is always joined.
+        '''
+        onsets_alone = {onset: self._regular(onset) for onset in ONSETS + [""]}
+        pairs = set()
+        for coda in CODAS:
+            coda_alone = self._regular(coda)
+            for onset in ONSETS + [""]:
+                if self._regular(coda + " " + onset) != coda_alone + " " + onsets_alone[onset]:
+                    pairs.add((coda, onset))
+        # a word starting with a bare coda may turn into an onset first (ᇂᄉ -> ᄊ) and then join the previous coda
+        pairs.update((coda, next_coda) for coda in CODAS for next_coda in CODAS)
+        return frozenset(pairs)
+
+    def _pronounce_words(self, string, descriptive=False):
+        '''STEP 5-8 assembled from cached eojeol (word) pronunciations.
+        Words are processed alone except where a rule works across the space:
+        a word is joined to the previous one when the final coda and its onset are in `cross_word_pairs`,
+        or when the previous word ends with "ᆯ/E" (modifying_rieul).
+        '''
+        units = []
+        last = ""
+        for word in string.split(" "):
+            bare = RE_ANNOTATION.sub("", word)
+            first = h2j(bare[:1])[:1]
+            if first not in self.boundary_jamo:
+                first = ""
+            if units and (units[-1].endswith("/E") or (last, first) in self.cross_word_pairs
+                          or (last, "") in self.cross_word_pairs):
+                units[-1] += " " + word
+            else:
+                units.append(word)
+            last = h2j(bare[-1:])[-1:]
+        return " ".join(self._pronounce_unit(unit, descriptive) for unit in units)
+
     def __call__(self,
                 string, 
                 descriptive: bool  = False,
@@ -132,58 +237,16 @@ class G2p(object):
         # 4. Spell out arabic numbers
         string = convert_num(string)
 
-        # 5. decompose
-        inp = h2j(string)
-
-        # 6. special
-        for func in (jyeo, ye, consonant_ui, josa_ui, vowel_ui, \
-                     jamo, rieulgiyeok, rieulbieub, verb_nieun, \
-                     balb, palatalize, modifying_rieul):
-            inp = func(inp, descriptive, verbose)
-        inp = re.sub("/[PJEB]", "", inp)
-
-        # 7. regular table: batchim + onset
-        for str1, str2, rule_ids in self.table:
-            _inp = inp
-            inp = re.sub(str1, str2, inp)
-
-            if len(rule_ids)>0:
-                rule = "\n".join(self.rule2text.get(rule_id, "") for rule_id in rule_ids)
-            else:
-                rule = ""
-            gloss(verbose, inp, _inp, rule)
-
-        # 8 link
-        for func in (link1, link2, link3, link4):
-            inp = func(inp, descriptive, verbose)
+        # 5-8. decompose, special, regular table and link
+        if self.word_cache_size and not verbose:
+            inp = self._pronounce_words(string, descriptive)
+        else:
+            inp = self._pronounce(string, descriptive, verbose)
 
         #==============================================================
         # added from kdrkdrkdr/g2pk3
         # 8.5 Error Fix, 제 20항 적용 오류 해결
-        inp_ = ""
-        inp = split_syllables(inp.strip())
-        i = 0
-        while i < len(inp) - 4:
-            if (inp[i:i+3] == 'ㅇㅡㄹ' or inp[i:i+3] == 'ㄹㅡㄹ') and inp[i+3] == ' ' and inp[i+4] == 'ㄹ':
-                inp_ += inp[i:i+3] + ' ' + 'ㄴ'
-                i += 5
-            else:
-                inp_ += inp[i]
-                i += 1
-        inp_ += inp[i:]
-        inp = join_jamos(inp_)        # 8.5 Error Fix, 제 20항 적용 오류 해결
-        inp_ = ""
-        inp = split_syllables(inp.strip())
-        i = 0
-        while i < len(inp) - 4:
-            if (inp[i:i+3] == 'ㅇㅡㄹ' or inp[i:i+3] == 'ㄹㅡㄹ') and inp[i+3] == ' ' and inp[i+4] == 'ㄹ':
-                inp_ += inp[i:i+3] + ' ' + 'ㄴ'
-                i += 5
-            else:
-                inp_ += inp[i]
-                i += 1
-        inp_ += inp[i:]
-        inp = join_jamos(inp_)
+        inp = fix_rieul_nieun(inp)
         #==============================================================
 
         # 9. postprocessing
@@ -195,23 +258,55 @@ class G2p(object):
 
         if to_hcj:
 
-            out = []
+            # same as [j2hcj(h2j(c)) for c in word], one table lookup per syllable
+            return [list(map(h2hcj, word)) for word in inp.split()]
 
-            for word in inp.split():
-                word_list = []
+                
 
-                for i in range(len(word)):
-                    chr = word[i]
-                    cur_jamo = j2hcj(h2j(chr))
-                    word_list.append(cur_jamo)
+        return inp
 
-                out.append(word_list)
+    def batch(self,
+              strings: list[str],
+              workers: int = 1,
+              chunksize: int | None = None,
+              **kwargs,
+              ) -> list[str | list[list[str]]]:
+        '''Convert many strings. Results are identical to calling `self(string, **kwargs)` one by one.
+        strings: input strings.
+        workers: number of processes. Each worker process builds its own G2p once.
+        chunksize: strings sent to a worker at a time.
+        kwargs: options of __call__.
+
+        Identical strings are converted only once.
+        '''
+        unique = list(dict.fromkeys(strings))
+        if workers <= 1 or len(unique) <= 1:
+            converted = [self(string, **kwargs) for string in unique]
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(unique) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.word_cache_size,)) as executor:
+                converted = list(executor.map(_convert_worker, unique, [kwargs] * len(unique), chunksize=chunksize))
 
-            return out
+        results = dict(zip(unique, converted))
+        if kwargs.get("to_hcj", False):
+            # do not share the nested lists between duplicated strings
+            return [[list(word) for word in results[string]] for string in strings]
+        return [results[string] for string in strings]
 
-                
 
-        return inp
+_worker_g2p = None
+
+
+def _init_worker(word_cache_size=0):
+    global _worker_g2p
+    _worker_g2p = G2p(word_cache_size=word_cache_size)
+
+
+def _convert_worker(string, kwargs):
+    return _worker_g2p(string, **kwargs)
+
 
 if __name__ == "__main__":
     g2p = G2p()
@@ -281,7 +281,8 @@ def _jamo_to_hangul_char(lead, vowel, tail=0):
     return chr(tail + (vowel - 1) * 28 + (lead - 1) * 588 + _JAMO_OFFSET)
 
 
-def _jamo_char_to_hcj(char):
+def _jamo_char_to_hcj_by_name(char):
+    """Name based conversion, used to build the translation tables."""
     if is_jamo(char):
         hcj_name = re.sub(r"(?<=HANGUL )(\w+)",
                           "LETTER",
@@ -291,6 +292,18 @@ def _jamo_char_to_hcj(char):
     return char
 
 
+def _jamo_char_to_hcj(char):
+    if char in _NAMELESS_JAMO:
+        raise InvalidJamoError("Not jamo or nameless jamo character", char)
+    return _JAMO_TO_HCJ_TABLE.get(ord(char), char)
+
+
+def _check_nameless_jamo(string):
+    match = _RE_NAMELESS_JAMO.search(string)
+    if match:
+        raise InvalidJamoError("Not jamo or nameless jamo character", match.group())
+
+
 def _get_unicode_name(char):
     """Fetch the unicode name for jamo characters.
     """
@@ -389,6 +402,34 @@ def get_jamo_class(jamo):
         raise InvalidJamoError("Invalid or classless jamo argument.", jamo)
 
 
+# Translation tables built once at import.
+# jamo (U+11xx, extended A/B) -> HCJ, via the unicode names in the bundled JSON
+_JAMO_CODEPOINTS = chain(range(0x1100, 0x1200), range(0xA960, 0xA97D),
+                         range(0xD7B0, 0xD7C7), range(0xD7CB, 0xD7FC))
+_JAMO_TO_HCJ_TABLE = {}
+_NAMELESS_JAMO = set()
+for _code in _JAMO_CODEPOINTS:
+    try:
+        _hcj = _jamo_char_to_hcj_by_name(chr(_code))
+    except InvalidJamoError:
+        _NAMELESS_JAMO.add(chr(_code))
+        continue
+    if _hcj != chr(_code):
+        _JAMO_TO_HCJ_TABLE[_code] = _hcj
+_RE_NAMELESS_JAMO = re.compile("[" + "".join(sorted(_NAMELESS_JAMO)) + "]") if _NAMELESS_JAMO \
+    else re.compile("(?!)")
+
+# Hangul syllable -> U+11xx jamo, arithmetic decomposition of U+AC00 to U+D7A3
+_HANGUL_TO_JAMO_TABLE = {_code: "".join(_hangul_char_to_jamo(chr(_code)))
+                         for _code in range(0xAC00, 0xD7A4)}
+
+# Hangul syllable or jamo -> HCJ, i.e. j2hcj(h2j(char))
+_HANGUL_TO_HCJ_TABLE = dict(_JAMO_TO_HCJ_TABLE)
+for _code, _jamo in _HANGUL_TO_JAMO_TABLE.items():
+    _HANGUL_TO_HCJ_TABLE[_code] = _jamo.translate(_JAMO_TO_HCJ_TABLE)
+del _code, _hcj, _jamo
+
+
 def jamo_to_hcj(data):
     """Convert jamo to HCJ.
     Arguments may be iterables or single characters.
@@ -411,9 +452,22 @@ def j2hcj(jamo):
 
     j2hcj is the string version of jamo_to_hcj, the generator version.
     """
+    if isinstance(jamo, str):
+        if _NAMELESS_JAMO:
+            _check_nameless_jamo(jamo)
+        return jamo.translate(_JAMO_TO_HCJ_TABLE)
     return ''.join(jamo_to_hcj(jamo))
 
 
+def h2hcj(hangul_string):
+    """Convert a string of Hangul and jamo into HCJ.
+    Same as j2hcj(h2j(hangul_string)), done in one table lookup per character.
+    """
+    if _NAMELESS_JAMO:
+        _check_nameless_jamo(hangul_string)
+    return hangul_string.translate(_HANGUL_TO_HCJ_TABLE)
+
+
 def hcj_to_jamo(hcj_char, position="vowel"):
     """Convert a HCJ character to a jamo character.
     Arguments may be single characters along with the desired jamo class
@@ -466,6 +520,8 @@ def h2j(hangul_string):
 
     h2j is the string version of hangul_to_jamo, the generator version.
     """
+    if isinstance(hangul_string, str):
+        return hangul_string.translate(_HANGUL_TO_JAMO_TABLE)
     return ''.join(hangul_to_jamo(hangul_string))
 
 
@@ -478,6 +534,11 @@ def jamo_to_hangul(lead, vowel, tail=''):
 
     This function is identical to j2h.
     """
+    # Modern U+11xx jamo: compose arithmetically
+    if isinstance(lead, str) and isinstance(vowel, str) and len(lead) == 1 and len(vowel) == 1 and\
+       0x1100 <= ord(lead) <= 0x1112 and 0x1161 <= ord(vowel) <= 0x1175 and\
+       (not tail or (isinstance(tail, str) and len(tail) == 1 and 0x11A8 <= ord(tail) <= 0x11C2)):
+        return _jamo_to_hangul_char(lead, vowel, tail)
     # Internally, we convert everything to a jamo char,
     # then pass it to _jamo_to_hangul_char
     lead = hcj_to_jamo(lead, "lead")
@@ -12,7 +12,7 @@ from kabosu_core.language.njd.ko.utils import adjust, compose, to_choseong, to_j
 def convert_eng(string, cmu):
     '''Convert a string such that English words inside are turned into Hangul.
     string: input string.
-    cmu: cmu dict object.
+    cmu: cmu dict object, such as the CMULexicon from load_lexicon().
 
     >>> convert_eng("그 사람 좀 old school이야", cmu)
     그 사람 좀 올드 스쿨이야
@@ -146,14 +146,7 @@ def convert_eng(string, cmu):
     return string
 
 if __name__ == "__main__":
-    from nltk.corpus.util import LazyCorpusLoader
-    from nltk.corpus.reader.cmudict import CMUDictCorpusReader
-    from kabosu_core.asseets import NLTK_DIR
-
-    cmudict = LazyCorpusLoader(name="cmudict",
-                                reader_cls=CMUDictCorpusReader,
-                                nltk_data_subdir=NLTK_DIR,
-                                fileids=["cmudict"]
-                                )
-    cmu = cmudict.dict()
+    from kabosu_core.language.njd.cmudict import load_lexicon
+
+    cmu = load_lexicon()
     print(convert_eng("오늘 학교에서 밥을 먹고 집에 와서 game을 했다", cmu))
\ No newline at end of file
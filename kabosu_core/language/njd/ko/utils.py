@@ -1,3 +1,4 @@
+import functools
 import re
 from kabosu_core.language.njd.ko.jamo import h2j, j2h
 
@@ -162,6 +163,49 @@ def parse_table():
     return table
 
 
+def parse_idioms():
+    '''Parse `idioms.txt` into (pattern, replacement) pairs'''
+    data = (G2PK4_DICT_DIR / 'idioms.txt').read_text(encoding='utf8')
+    idioms = []
+    for line in data.splitlines():
+        line = line.split("#")[0].strip()
+        if "===" in line:
+            str1, str2 = line.split("===")
+            idioms.append((str1, str2))
+    return idioms
+
+
+############## Rule compilation ##############
+RE_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def compile_rule(str1, str2):
+    '''Compile `re.sub(str1, str2, ...)` once.
+    Rules without regex syntax become `str.replace`, which gives the same result.
+    '''
+    if not RE_SPECIAL_CHARS.intersection(str1) and "\\" not in str2:
+        return lambda string: string.replace(str1, str2)
+    return functools.partial(re.compile(str1).sub, str2)
+
+
+def compile_rules(pairs):
+    '''Compile (pattern, replacement) pairs which are applied in order'''
+    return [compile_rule(str1, str2) for str1, str2 in pairs]
+
+
+def compile_prefilter(patterns):
+    '''One alternation of all the patterns.
+    If it finds nothing in a string, none of the rules applied in order changes it.
+    Returns None when the patterns cannot be combined safely (e.g. backreferences).
+    '''
+    if any(re.search(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)", pattern) for pattern in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    except re.error:
+        return None
+
+
 ############## Preprocessing ##############
 def annotate(string, mecab):
     parsed_str = mecab.parse(string)
@@ -0,0 +1,137 @@
+"""
+kabosu_core のモジュールを import するのにかかる時間とメモリを測る
+
+モジュールごとに新しいインタープリタを `python -X importtime` で起動して import し，
+全体の時間・RSS の増分・読み込まれた重い依存ライブラリと，累積時間の長い順に import されたモジュールを表示する。
+重い依存 (torch, onnxruntime など) は使うときに読み込む方針なので，ここに出てきたら import の連鎖を見直す。
+
+実行コマンドは `python -m kabosu_core.profile_startup [module ...] --top 10` である。
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = (
+    "kabosu_core.language",
+    "kabosu_core.language.njd.ja",
+    "kabosu_core.language.njd.ja.normalizer",
+)
+
+# import 時には読み込まれてほしくないライブラリ
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "onnxruntime",
+    "sudachipy",
+    "kanalizer",
+    "jpreprocess",
+    "marine",
+)
+
+# 子プロセスで実行するコード。import の前後の時間と RSS を JSON で標準出力に書く
+_MARKER = "-- kabosu_core.profile_startup: start --"
+_CHILD = """
+import json, sys, time
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+rss_before = rss_kib()
+sys.stderr.write(sys.argv[3] + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+__import__(sys.argv[1])  # importlib.import_module では対象自身が -X importtime に出ない
+seconds = time.perf_counter() - start
+print(json.dumps({
+    "seconds": seconds,
+    "rss_before_kib": rss_before,
+    "rss_after_kib": rss_kib(),
+    "heavy_modules": [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    -X importtime の出力を読む
+
+    Returns:
+        list[tuple[str, int, int]]: (モジュール名, 自身の時間 [us], 累積時間 [us])
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 見出しの行
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+
+def profile_import(module: str, top: int = 10) -> dict:
+    """
+    新しいインタープリタで module を import して測る
+
+    Args:
+        module (str): import するモジュール名
+        top (int): 累積時間の長い順に何個のモジュールを返すか
+
+    Returns:
+        dict: seconds (import にかかった秒数), rss_mib (RSS の増分 [MiB]), heavy_modules (読み込まれた HEAVY_MODULES),
+            slowest (累積時間の長いモジュールの [名前, 累積時間 [ms]] のリスト)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, module, json.dumps(HEAVY_MODULES), _MARKER],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"failed to import {module}:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # 計測用のコード自身の import (json など) は除き，対象の import 以降だけを数える
+    entries = parse_importtime(completed.stderr.split(_MARKER, 1)[-1])
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        "module": module,
+        "seconds": result["seconds"],
+        "rss_mib": (result["rss_after_kib"] - result["rss_before_kib"]) / 1024,
+        "heavy_modules": result["heavy_modules"],
+        "slowest": [[name.strip(), cumulative / 1000] for name, _, cumulative in slowest],
+    }
+
+
+def format_report(results: list[dict]) -> str:
+    lines = []
+    for result in results:
+        heavy = ", ".join(result["heavy_modules"]) or "-"
+        lines.append(f"{result['module']}: {result['seconds'] * 1000:.1f} ms, +{result['rss_mib']:.1f} MiB RSS, heavy: {heavy}")
+        for name, milliseconds in result["slowest"]:
+            lines.append(f"    {milliseconds:>10.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="kabosu_core の import にかかる時間とメモリを測る")
+    parser.add_argument("modules", nargs="*", default=list(TARGETS), help="測るモジュール。省略すると TARGETS")
+    parser.add_argument("--top", type=int, default=10, help="累積時間の長い順に表示するモジュールの数")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    results = [profile_import(module, top=args.top) for module in args.modules]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(results))
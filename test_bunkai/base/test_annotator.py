@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import itertools
+import random
+import typing
+import unittest
+
+from kabosu_core.language.njd.ja.lib.bunkai.base.annotation import Annotations, SpanAnnotation
+from kabosu_core.language.njd.ja.lib.bunkai.base.annotator import func_filter_span
+
+
+def func_filter_span_naive(
+    spans_wide: typing.List[SpanAnnotation], spans_narrow: typing.List[SpanAnnotation]
+) -> typing.List[SpanAnnotation]:
+    return [
+        b_ann
+        for b_ann in spans_narrow
+        if not any(b_ann.get_spans().within(f_ann.get_spans()) for f_ann in spans_wide)
+    ]
+
+
+def random_spans(rnd: random.Random, rule_name: str, n: int, text_length: int) -> typing.List[SpanAnnotation]:
+    __spans = []
+    for _ in range(n):
+        start = rnd.randrange(text_length)
+        end = min(text_length, start + rnd.randrange(8))
+        __spans.append(
+            SpanAnnotation(
+                rule_name=rule_name,
+                start_index=start,
+                end_index=end,
+                split_string_type=None,
+                split_string_value=None,
+            )
+        )
+    return __spans
+
+
+class TestFuncFilterSpan(unittest.TestCase):
+    def test_same_as_naive(self):
+        rnd = random.Random(0)
+        for n_wide, n_narrow in itertools.product([0, 1, 5, 50], [0, 1, 5, 50]):
+            spans_wide = random_spans(rnd, "wide", n_wide, 100)
+            spans_narrow = random_spans(rnd, "narrow", n_narrow, 100)
+            self.assertEqual(
+                func_filter_span(spans_wide, spans_narrow),
+                func_filter_span_naive(spans_wide, spans_narrow),
+            )
+
+
+class TestAnnotations(unittest.TestCase):
+    def test_get_annotation_layer(self):
+        rnd = random.Random(0)
+        annotations = Annotations()
+        first = random_spans(rnd, "first", 30, 100)
+        second = random_spans(rnd, "second", 30, 100)
+        annotations.add_annotation_layer("first", first)
+        annotations.add_annotation_layer("second", second + first[:10])
+
+        expected = {str(ann): ann for ann in first if str(ann)}
+        self.assertEqual(list(annotations.get_annotation_layer("first")), list(expected.values()))
+
+        # the index follows layers that are extended in place
+        extra = random_spans(rnd, "first", 1, 100)[0]
+        extra.start_index, extra.end_index = 100, 101
+        annotations.get_final_layer().append(extra)
+        self.assertEqual(list(annotations.get_annotation_layer("first"))[-1], extra)
+
+
+if __name__ == "__main__":
+    unittest.main()
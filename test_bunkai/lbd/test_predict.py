@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import dataclasses
+import json
 import pathlib
+import tempfile
 import typing
 import unittest
 from unittest.mock import MagicMock, Mock, patch
@@ -8,12 +10,11 @@ from unittest.mock import MagicMock, Mock, patch
 import numpy
 import torch
 
-from kabosu_core import bunkai
-import kabosu_core.bunkai.algorithm.lbd.predict
-from kabosu_core.bunkai.algorithm.bunkai_sbd.annotator import MorphAnnotatorJanome
-from kabosu_core.bunkai.base.annotation import Annotations, SpanAnnotation
-from kabosu_core.bunkai.constant import METACHAR_LINE_BREAK
-from kabosu_core.bunkai.third.utils_ner import InputFeatures
+import kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict
+from kabosu_core.language.njd.ja.lib.bunkai.algorithm.bunkai_sbd.annotator import MorphAnnotatorJanome
+from kabosu_core.language.njd.ja.lib.bunkai.base.annotation import Annotations, SpanAnnotation
+from kabosu_core.language.njd.ja.lib.bunkai.constant import METACHAR_LINE_BREAK
+from kabosu_core.language.njd.ja.lib.bunkai.third.utils_ner import InputFeatures
 
 
 @dataclasses.dataclass
@@ -2126,8 +2127,8 @@ class TestPredictor(unittest.TestCase):
 
             from typing import List
 
-            from bunkai.algorithm.lbd.custom_tokenizers import VibratoSubwordsTokenizer
-            from bunkai.third.utils_ner import InputExample
+            from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.custom_tokenizers import VibratoSubwordsTokenizer
+            from kabosu_core.language.njd.ja.lib.bunkai.third.utils_ner import InputExample
 
             # note: this function must be here because this function refers test_case objects.
             def func_dummy_convert_examples_to_features(
@@ -2156,14 +2157,14 @@ class TestPredictor(unittest.TestCase):
                 return test_case.return_value.subword_tokens
 
             with patch(
-                "bunkai.algorithm.lbd.train.convert_examples_to_features",
+                "kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.train.convert_examples_to_features",
                 side_effect=func_dummy_convert_examples_to_features,
             ):
-                with patch("bunkai.algorithm.lbd.predict.Predictor.__init__", predictor_init):
+                with patch("kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict.Predictor.__init__", predictor_init):
                     with patch(
-                        "bunkai.algorithm.lbd.predict.Predictor._split_long_text", bunkai_predictor_mock_split_long_text
+                        "kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict.Predictor._split_long_text", bunkai_predictor_mock_split_long_text
                     ):
-                        predictor = bunkai.algorithm.lbd.predict.Predictor(modelpath=pathlib.Path(path_model))
+                        predictor = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict.Predictor(modelpath=pathlib.Path(path_model))
                         predictor.labels = test_case.return_value.labels
                         predictor.label_map = test_case.return_value.label_map
 
@@ -2217,6 +2218,11 @@ class TestPredictor(unittest.TestCase):
                             predictor.model = DummyModelDistilBert()  # type: ignore
                         else:
                             raise Exception("unexpected case.")
+                        predictor.backend = "torch"
+                        predictor.batch_size = 32
+                        predictor.input_names = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict._model_input_names(
+                            predictor.model
+                        )
 
                         tokenized_layer = self.init_tokenized_layer(test_case.text)
                         tokens = self.reformat_data_structure(tokenized_layer)
@@ -2225,5 +2231,98 @@ class TestPredictor(unittest.TestCase):
                         self.check_all_prediction_point(tokens, res[0])  # type: ignore
 
 
+class TestPredictorModel(unittest.TestCase):
+    """tiny BERT model saved in the same layout as a trained linebreak model"""
+
+    documents = [
+        ["ラウンジ", "も", "気軽", "に", "利用", "でき", "、", METACHAR_LINE_BREAK, "ホテル", "内", "の", "部屋", "も"],
+        ["申し分", "ない", "です", "。", METACHAR_LINE_BREAK, METACHAR_LINE_BREAK, "また", "利用", "します"],
+        ["部屋", "も", "ゆったり", "でき", "まし", "た", "。"] * 6 + [METACHAR_LINE_BREAK, "ホテル"],
+        ["。"],
+    ]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        from transformers import BertConfig, BertForTokenClassification
+
+        from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.corpus import LABELS
+
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.modelpath = pathlib.Path(cls.tmpdir.name)
+        chars = sorted({c for document in cls.documents for word in document for c in word})
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + [f"##{c}" for c in chars]
+        cls.modelpath.joinpath("vocab.txt").write_text("\n".join(vocab) + "\n", encoding="utf-8")
+        cls.modelpath.joinpath("labels.txt").write_text("\n".join(LABELS) + "\n", encoding="utf-8")
+        # short enough that the long document is split into sub-documents
+        cls.modelpath.joinpath("bunkai.json").write_text(
+            json.dumps({"max_seq_length": 24, "base_model": "tiny"}), encoding="utf-8"
+        )
+
+        torch.manual_seed(0)
+        config = BertConfig(
+            vocab_size=len(vocab) + 2,  # " " and METACHAR_LINE_BREAK are added by the tokenizer
+            hidden_size=16,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=32,
+            max_position_embeddings=32,
+            num_labels=len(LABELS),
+        )
+        BertForTokenClassification(config).save_pretrained(str(cls.modelpath))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmpdir.cleanup()
+
+    def features(self, predictor) -> typing.List[InputFeatures]:
+        from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.corpus import LABEL_OTHER
+        from kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.train import MyDataset
+        from kabosu_core.language.njd.ja.lib.bunkai.third.utils_ner import InputExample
+
+        examples = []
+        for d_id, document in enumerate(self.documents):
+            for s_id, words in enumerate(predictor._split_long_text(document)[0]):
+                examples.append(InputExample(f"{d_id}-{s_id}", words, [LABEL_OTHER] * len(words), s_id == 0))
+        return MyDataset(examples, predictor.labels, predictor.bc.max_seq_length, predictor.tokenizer, False).features
+
+    def test_dynamic_padding(self):
+        predict = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict
+        batched = predict.Predictor(self.modelpath, batch_size=3)
+        single = predict.Predictor(self.modelpath, batch_size=1)
+        features = self.features(batched)
+        self.assertGreater(len(features), len(self.documents))
+
+        # sorted, batched and padded to the longest sub-document vs one unpadded sub-document at a time
+        for logits, feature in zip(batched._run_model(features), features):
+            self.assertEqual(len(logits), sum(feature.attention_mask))
+            numpy.testing.assert_allclose(logits, single._run_model([feature])[0], atol=1e-5)
+        self.assertEqual(batched.predict(self.documents), [single.predict([d])[0] for d in self.documents])
+
+    def test_onnx_backend(self):
+        predict = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict
+        predict.export_onnx(self.modelpath)
+        torch_predictor = predict.Predictor(self.modelpath, batch_size=2)
+        onnx_predictor = predict.Predictor(self.modelpath, batch_size=2, backend="onnx", num_threads=1)
+        features = self.features(torch_predictor)
+        for torch_logits, onnx_logits in zip(torch_predictor._run_model(features), onnx_predictor._run_model(features)):
+            numpy.testing.assert_allclose(torch_logits, onnx_logits, atol=1e-4)
+        self.assertEqual(onnx_predictor.predict(self.documents), torch_predictor.predict(self.documents))
+
+    def test_quantize(self):
+        predict = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict
+        self.assertEqual(predict.export_onnx(self.modelpath, quantize=True).name, predict.ONNX_QUANTIZED_MODEL_NAME)
+        for backend in predict.BACKENDS:
+            predictor = predict.Predictor(self.modelpath, backend=backend, quantize=True)
+            result = predictor.predict(self.documents)
+            self.assertEqual(len(result), len(self.documents))
+            for document, indices in zip(self.documents, result):
+                self.assertTrue(all(0 <= i < len(document) for i in indices))
+
+    def test_unknown_backend(self):
+        predict = kabosu_core.language.njd.ja.lib.bunkai.algorithm.lbd.predict
+        with self.assertRaises(ValueError):
+            predict.Predictor(self.modelpath, backend="tensorrt")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,9 +2,9 @@
 import unittest
 from collections import namedtuple
 
-import kabosu_core.bunkai.constant
-from kabosu_core.bunkai import cli as cli_module
-from kabosu_core.bunkai.algorithm.bunkai_sbd.bunkai_sbd import BunkaiSentenceBoundaryDisambiguation
+import kabosu_core.language.njd.ja.lib.bunkai.constant
+from kabosu_core.language.njd.ja.lib.bunkai import cli as cli_module
+from kabosu_core.language.njd.ja.lib.bunkai.algorithm.bunkai_sbd.bunkai_sbd import BunkaiSentenceBoundaryDisambiguation
 
 NewlineTestCase = namedtuple("NewlineTestCase", ("text", "n_sentences", "return_value"))
 
@@ -28,11 +28,24 @@ class TestCli(unittest.TestCase):
         model = BunkaiSentenceBoundaryDisambiguation(path_model=None)
         for test_case in self.seq_test_case:
             output = "".join(
-                [o for o in cli_module.run(model, test_case.text.replace("\n", kabosu_core.bunkai.constant.METACHAR_LINE_BREAK))]
+                [o for o in cli_module.run(model, test_case.text.replace("\n", kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK))]
             )
-            outsents = output.split(kabosu_core.bunkai.constant.METACHAR_SENTENCE_BOUNDARY)
+            outsents = output.split(kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_SENTENCE_BOUNDARY)
             self.assertEqual(len(outsents), test_case.n_sentences, msg=f"false sentence split={output}")
 
+    def test_cli_batch(self):
+        model = BunkaiSentenceBoundaryDisambiguation(path_model=None)
+        texts = [
+            test_case.text.replace("\n", kabosu_core.language.njd.ja.lib.bunkai.constant.METACHAR_LINE_BREAK)
+            for test_case in self.seq_test_case
+        ]
+        expected = "".join(["".join(cli_module.run(model, text)) for text in texts])
+        self.assertEqual("".join(cli_module.run_batch(model, texts)), expected)
+        self.assertEqual(
+            model.find_eos_batch([test_case.text for test_case in self.seq_test_case]),
+            [model.find_eos(test_case.text) for test_case in self.seq_test_case],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+"""asapy のリソース読み込み(起動)にかかる時間とメモリの測定"""
+
+import argparse
+import resource
+import time
+
+
+def _max_rss_mb() -> float:
+    # Linux では KiB 単位
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_startup(n_instances: int, use_cache: bool) -> None:
+    """`LoadJson` を n_instances 個作る時間と最大 RSS を測定する。"""
+    from kabosu_core.language.njd.ja.lib.asapy.load import LoadJson
+
+    rss_before = _max_rss_mb()
+    start = time.perf_counter()
+    instances = [LoadJson(use_cache=use_cache)]
+    first = time.perf_counter() - start
+    rss_first = _max_rss_mb()
+
+    start = time.perf_counter()
+    for _ in range(n_instances - 1):
+        instances.append(LoadJson(use_cache=use_cache))
+    rest = time.perf_counter() - start
+    rss_rest = _max_rss_mb()
+
+    print(f"first LoadJson: {first:.4f} sec, +{rss_first - rss_before:.1f} MB")
+    if n_instances > 1:
+        print(
+            f"next {n_instances - 1} LoadJson: {rest / (n_instances - 1):.6f} sec/instance, "
+            f"+{rss_rest - rss_first:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.asapy_startup` である。
+    # pickle キャッシュの効果は 2 回目以降のプロセスで確認できる。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, default=10, help="作成する LoadJson の数")
+    parser.add_argument("--no-cache", action="store_true", help="pickle キャッシュを使わずに json/tsv をパースする")
+    args = parser.parse_args()
+
+    benchmark_startup(args.instances, use_cache=not args.no_cache)
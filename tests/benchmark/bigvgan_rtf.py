@@ -0,0 +1,74 @@
+"""BigVGAN の実行環境の実時間係数 (RTF, 合成時間 / 音声の長さ) の測定"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from tests.benchmark.utility import benchmark_time
+
+
+def random_checkpoint(directory: Path, channels: int) -> Path:
+    """重みが乱数の 24 kHz, 100 バンドのモデルを書き出す。速度は重みの値によらない"""
+    import torch
+
+    from kabosu_core.io.tts.bigvgan import BigVGANConfig
+    from kabosu_core.io.tts.bigvgan.model import BigVGAN
+
+    config = BigVGANConfig(upsample_initial_channel=channels)
+    config.to_json(directory / "config.json")
+    torch.save({"generator": BigVGAN(config).state_dict()}, directory / "bigvgan_generator.pt")
+    return directory / "bigvgan_generator.pt"
+
+
+def benchmark_vocoder(vocoder, mel: np.ndarray, chunk_frames: int, context_frames: int | None = None) -> dict[str, float]:
+    """一括での合成とストリーミングでの合成の RTF と，最初の波形が出るまでの時間を返す。"""
+    seconds = mel.shape[1] * vocoder.hop_size / vocoder.sampling_rate
+    vocoder(mel[:, :chunk_frames])  # 初回の呼び出しの準備を除く
+
+    def stream():
+        stream = vocoder.stream(chunk_frames=chunk_frames, context_frames=context_frames)
+        first = None
+        start = time.perf_counter()
+        # 音響モデルが 1 フレームずつ出す場合を想定する
+        for i in range(mel.shape[1]):
+            if len(stream.push(mel[:, i:i + 1])) and first is None:
+                first = time.perf_counter() - start
+        stream.flush()
+        return first
+
+    first_audio = stream()
+    return {
+        "offline RTF": benchmark_time(lambda: vocoder(mel), n_repeat=3) / seconds,
+        "streaming RTF": benchmark_time(stream, n_repeat=3) / seconds,
+        "first audio [sec]": first_audio,
+    }
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.bigvgan_rtf` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkpoint", type=Path, default=None, help="測るチェックポイント。省略すると重みが乱数のモデル")
+    parser.add_argument("--channels", type=int, default=512, help="乱数のモデルの upsample_initial_channel")
+    parser.add_argument("--seconds", type=float, default=5.0, help="合成する音声の長さ (秒)")
+    parser.add_argument("--chunk-frames", type=int, default=32, help="ストリーミングで 1 回に合成するフレーム数")
+    parser.add_argument("--context-frames", type=int, default=None, help="チャンクの前後に付けるフレーム数。省略すると receptive_field")
+    parser.add_argument("--threads", type=int, default=None, help="スレッド数")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"], help="測るバックエンド")
+    args = parser.parse_args()
+
+    from kabosu_core.io.tts.bigvgan import Vocoder, export_onnx
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint = args.checkpoint or random_checkpoint(Path(tmp_dir), args.channels)
+        onnx_path = Path(tmp_dir) / "bigvgan.onnx"
+        for backend in args.backends:
+            if backend == "onnx":
+                export_onnx(checkpoint, onnx_path=onnx_path)
+            vocoder = Vocoder(checkpoint, backend=backend, onnx_path=onnx_path, num_threads=args.threads)
+            frames = int(args.seconds * vocoder.sampling_rate / vocoder.hop_size)
+            mel = np.random.default_rng(0).standard_normal((vocoder.config.num_mels, frames)).astype(np.float32)
+            for name, value in benchmark_vocoder(vocoder, mel, args.chunk_frames, args.context_frames).items():
+                print(f"{backend} {name}: {value:.4f}")
@@ -0,0 +1,71 @@
+"""bunkai のスパン処理にかかる時間の測定"""
+
+import argparse
+import random
+
+from kabosu_core.language.njd.ja.lib.bunkai.base.annotation import Annotations, SpanAnnotation
+from kabosu_core.language.njd.ja.lib.bunkai.base.annotator import func_filter_span
+from tests.benchmark.utility import benchmark_time
+
+CHAT_LINE = "これ、テスト文なんですけど(笑)本当?にこんなテキストでいいのかな☆\n10秒で考えて書いたよ．おすすめ度No.1の和室3.5畳はあります。"
+
+
+def _random_spans(rnd: random.Random, rule_name: str, n: int, text_length: int) -> list[SpanAnnotation]:
+    spans = []
+    for _ in range(n):
+        start = rnd.randrange(text_length)
+        spans.append(
+            SpanAnnotation(
+                rule_name=rule_name,
+                start_index=start,
+                end_index=min(text_length, start + rnd.randrange(1, 16)),
+                split_string_type=None,
+                split_string_value=None,
+            )
+        )
+    return spans
+
+
+def benchmark_func_filter_span(text_length: int) -> float:
+    """`func_filter_span` にかかる時間を測定する。"""
+    rnd = random.Random(0)
+    spans_wide = _random_spans(rnd, "wide", text_length // 10, text_length)
+    spans_narrow = _random_spans(rnd, "narrow", text_length // 5, text_length)
+    return benchmark_time(lambda: func_filter_span(spans_wide, spans_narrow), n_repeat=10)
+
+
+def benchmark_get_annotation_layer(text_length: int) -> float:
+    """レイヤーごとに `get_annotation_layer` を繰り返し呼ぶ時間を測定する。"""
+    rnd = random.Random(0)
+    annotations = Annotations()
+    layer_names = [f"layer{i}" for i in range(10)]
+    for name in layer_names:
+        annotations.add_annotation_layer(name, _random_spans(rnd, name, text_length // 5, text_length))
+
+    def execute() -> None:
+        for name in layer_names:
+            list(annotations.get_annotation_layer(name))
+
+    return benchmark_time(execute, n_repeat=10)
+
+
+def benchmark_bunkai_eos(text_length: int) -> float:
+    """`BunkaiSentenceBoundaryDisambiguation.eos` にかかる時間を測定する。"""
+    from kabosu_core.language.njd.ja.lib.bunkai import Bunkai
+
+    bunkai = Bunkai()
+    text = (CHAT_LINE * (text_length // len(CHAT_LINE) + 1))[:text_length]
+    return benchmark_time(lambda: bunkai.eos(text), n_repeat=3)
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.bunkai_annotation` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--length", type=int, default=10000, help="文書の文字数")
+    parser.add_argument("--eos", action="store_true", help="vibrato 辞書を使って eos 全体も計測する")
+    args = parser.parse_args()
+
+    print(f"func_filter_span ({args.length} chars): {benchmark_func_filter_span(args.length):.4f} sec")
+    print(f"get_annotation_layer ({args.length} chars): {benchmark_get_annotation_layer(args.length):.4f} sec")
+    if args.eos:
+        print(f"Bunkai.eos ({args.length} chars): {benchmark_bunkai_eos(args.length):.4f} sec")
@@ -0,0 +1,50 @@
+"""英語 G2P の同形異義語の有無による変換時間の測定"""
+
+import argparse
+
+from tests.benchmark.utility import benchmark_time
+
+PLAIN_LINES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "She sells sea shells by the sea shore.",
+    "We walked to the station in the rain.",
+    "Popular pets, e.g. cats and dogs, need care.",
+]
+
+HOMOGRAPH_LINES = [
+    "I refuse to collect the refuse around here.",
+    "They live near the live music venue.",
+    "The wind was too strong to wind the sail.",
+    "Please record the record in the record book.",
+]
+
+
+def benchmark_g2p_en(texts: list[str]) -> dict[str, float]:
+    """1 文ずつ呼ぶ場合と batch でまとめて呼ぶ場合の時間を測定する。"""
+    from kabosu_core.language.njd.en import G2p
+
+    g2p = G2p()
+
+    def per_sentence() -> None:
+        for text in texts:
+            g2p(text)
+
+    def batch() -> None:
+        g2p.batch(texts)
+
+    return {
+        "per sentence": benchmark_time(per_sentence, n_repeat=3),
+        "batch": benchmark_time(batch, n_repeat=3),
+    }
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.g2p_en_homograph` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=1000, help="変換する行数")
+    args = parser.parse_args()
+
+    for name, lines in [("homograph-free", PLAIN_LINES), ("homograph-heavy", HOMOGRAPH_LINES)]:
+        texts = (lines * (args.lines // len(lines) + 1))[:args.lines]
+        for mode, elapsed in benchmark_g2p_en(texts).items():
+            print(f"{name} {mode} ({len(texts)} lines): {elapsed:.4f} sec, {len(texts) / elapsed:.1f} lines/sec")
@@ -0,0 +1,50 @@
+"""g2pk4 の韓国語 G2P にかかる時間の測定"""
+
+import argparse
+from pathlib import Path
+
+from tests.benchmark.utility import benchmark_time
+
+NEWS_LINES = [
+    "정부는 오늘 내년도 예산안을 국회에 제출했다고 밝혔다.",
+    "서울 아파트 매매 가격이 3주 연속 상승세를 이어가고 있다.",
+    "기상청은 내일 전국에 비가 내리고 기온이 크게 떨어질 것으로 내다봤다.",
+    "한국은행은 기준금리를 연 3.5%로 동결했다.",
+    "대표팀은 어젯밤 열린 평가전에서 2대 1로 역전승을 거뒀다.",
+    "전문가들은 AI 기술이 산업 구조를 빠르게 바꾸고 있다고 분석했다.",
+    "시민들은 늦은 밤까지 광장에 모여 새해를 맞이했다.",
+    "나의 친구가 mp3 file 3개를 다운받고 있다",
+]
+
+
+def _load_corpus(path: Path | None, n_lines: int) -> list[str]:
+    if path is not None:
+        lines = [line.strip() for line in path.read_text(encoding="utf8").splitlines() if line.strip()]
+    else:
+        lines = NEWS_LINES
+    return (lines * (n_lines // len(lines) + 1))[:n_lines]
+
+
+def benchmark_g2pk4(texts: list[str]) -> float:
+    """`G2p.__call__` を 1 行ずつ呼ぶ時間を測定する。"""
+    from kabosu_core.language.njd.ko import G2p
+
+    g2p = G2p()
+
+    def execute() -> None:
+        for text in texts:
+            g2p(text)
+
+    return benchmark_time(execute, n_repeat=3)
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.g2pk4_corpus` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=None, help="1 行 1 文の韓国語ニュースコーパス")
+    parser.add_argument("--lines", type=int, default=500, help="変換する行数")
+    args = parser.parse_args()
+
+    texts = _load_corpus(args.corpus, args.lines)
+    elapsed = benchmark_g2pk4(texts)
+    print(f"G2p ({len(texts)} lines): {elapsed:.4f} sec, {len(texts) / elapsed:.1f} lines/sec")
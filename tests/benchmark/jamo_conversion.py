@@ -0,0 +1,43 @@
+"""jamo の h2j / j2hcj 変換にかかる時間の測定"""
+
+import argparse
+import random
+
+from tests.benchmark.utility import benchmark_time
+
+
+def _random_text(n_chars: int) -> str:
+    rnd = random.Random(0)
+    syllables = [chr(code) for code in range(0xAC00, 0xD7A4)]
+    return "".join(rnd.choice(syllables) if rnd.random() > 0.2 else " " for _ in range(n_chars))
+
+
+def benchmark_jamo(text: str) -> dict[str, float]:
+    """文字ごとの変換と文字列単位の変換の時間を測定する。"""
+    from kabosu_core.language.njd.ko.jamo import h2hcj, h2j, j2hcj
+
+    def per_char() -> None:
+        [j2hcj(h2j(c)) for c in text]
+
+    def whole_string() -> None:
+        j2hcj(h2j(text))
+
+    def translate() -> None:
+        h2hcj(text)
+
+    return {
+        "j2hcj(h2j(c)) per char": benchmark_time(per_char, n_repeat=3),
+        "j2hcj(h2j(text))": benchmark_time(whole_string, n_repeat=3),
+        "h2hcj(text)": benchmark_time(translate, n_repeat=3),
+    }
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.jamo_conversion` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, default=1_000_000, help="変換する文字数")
+    args = parser.parse_args()
+
+    text = _random_text(args.chars)
+    for name, elapsed in benchmark_jamo(text).items():
+        print(f"{name} ({len(text)} chars): {elapsed:.4f} sec")
@@ -0,0 +1,45 @@
+"""MLAsk の感情解析スループットの測定"""
+
+import argparse
+from pathlib import Path
+
+from tests.benchmark.utility import benchmark_time
+
+REVIEW_CHAT_LINES = [
+    "この店のラーメンは最高においしかった！また行きたい。",
+    "配送が遅すぎて本当に腹が立つ。二度と頼まない。",
+    "彼のことが嫌いではないけど、ちょっと怖い(;´Д`)",
+    "えー、まじで？すごく嬉しいんだけど！！",
+    "値段の割には普通かな。可もなく不可もなく。",
+    "悲しいニュースばかりで気が滅入るね…",
+    "うわぁ、びっくりした！急に大きな音がするんだもん",
+    "今日は一日のんびりできて安らいだ〜",
+]
+
+
+def _load_corpus(path: Path | None, n_lines: int) -> list[str]:
+    if path is not None:
+        lines = [line for line in path.read_text(encoding="utf8").splitlines() if line.strip()]
+    else:
+        lines = REVIEW_CHAT_LINES
+    return (lines * (n_lines // len(lines) + 1))[:n_lines]
+
+
+def benchmark_mlask(texts: list[str]) -> float:
+    """`MLAsk.analyze_batch` にかかる時間を測定する。"""
+    from kabosu_core.language.njd.ja.lib.mlask import MLAsk
+
+    mla = MLAsk()
+    return benchmark_time(lambda: mla.analyze_batch(texts), n_repeat=3)
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.mlask_throughput` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=None, help="1 行 1 文のレビュー・チャットコーパス")
+    parser.add_argument("--lines", type=int, default=1000, help="解析する行数")
+    args = parser.parse_args()
+
+    texts = _load_corpus(args.corpus, args.lines)
+    elapsed = benchmark_mlask(texts)
+    print(f"MLAsk.analyze_batch ({len(texts)} lines): {elapsed:.4f} sec, {len(texts) / elapsed:.1f} lines/sec")
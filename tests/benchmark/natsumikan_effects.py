@@ -0,0 +1,30 @@
+"""natsumikan のリバーブと再生速度変換にかかる時間の測定"""
+
+import argparse
+
+import numpy as np
+
+from tests.benchmark.utility import benchmark_time
+
+
+def benchmark_natsumikan(samples: np.ndarray) -> dict[str, float]:
+    """ndarray に対する add_reverb と change_speed_ndarray の時間を測定する。"""
+    from kabosu_core.io.tts.natsumikan import add_reverb, change_speed_ndarray
+
+    return {
+        "add_reverb": benchmark_time(lambda: add_reverb(samples), n_repeat=3),
+        "change_speed_ndarray": benchmark_time(lambda: change_speed_ndarray(samples, speed=1.25), n_repeat=3),
+    }
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.natsumikan_effects` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10.0, help="音声の長さ (分)")
+    parser.add_argument("--samplerate", type=int, default=24000, help="サンプリング周波数")
+    args = parser.parse_args()
+
+    n_samples = int(args.minutes * 60 * args.samplerate)
+    samples = np.random.default_rng(0).standard_normal(n_samples) * 0.1
+    for name, elapsed in benchmark_natsumikan(samples).items():
+        print(f"{name} ({args.minutes} min, {args.samplerate} Hz): {elapsed:.4f} sec")
@@ -0,0 +1,54 @@
+"""natsumikan のピッチ変換の速度と精度の測定"""
+
+import argparse
+
+import numpy as np
+import pyworld as pw
+
+from tests.benchmark.utility import benchmark_time
+
+
+def synthetic_voice(samplerate: int, seconds: float) -> np.ndarray:
+    """F0 が 115〜165 Hz で揺れる倍音の多い信号に，無音区間とわずかなノイズを加えたもの"""
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    f0 = 140 + 25 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / samplerate
+    voice = sum(0.3 / k * np.sin(k * phase) for k in range(1, 15)) * (np.sin(2 * np.pi * 0.3 * t) > -0.7)
+    return voice + 0.003 * np.random.default_rng(0).standard_normal(len(t))
+
+
+def pitch_error(source: np.ndarray, shifted: np.ndarray, samplerate: int, n_steps: float) -> float:
+    """harvest で求めた F0 の，目標の高さからのずれ (セント) の中央値"""
+    source_f0, _ = pw.harvest(source, samplerate)
+    shifted_f0, _ = pw.harvest(np.ascontiguousarray(shifted, dtype=np.float64), samplerate)
+    n = min(len(source_f0), len(shifted_f0))
+    voiced = (source_f0[:n] > 0) & (shifted_f0[:n] > 0)
+    cents = 1200 * np.log2(shifted_f0[:n][voiced] / (source_f0[:n][voiced] * 2 ** (n_steps / 12)))
+    return float(np.median(np.abs(cents)))
+
+
+def benchmark_pitch(samples: np.ndarray, samplerate: int, n_steps: float) -> dict[str, tuple[float, float]]:
+    """バックエンドごとに (実行時間, F0 のずれ) を返す。"""
+    from kabosu_core.io.tts.natsumikan import PITCH_SHIFT_BACKENDS, pitch_change_ndarray
+
+    results = {}
+    for backend in PITCH_SHIFT_BACKENDS:
+        # librosa の初回の JIT コンパイルを除くために 1 度呼んでおく
+        pitch_change_ndarray(samples[:samplerate], samplerate, n_steps, backend=backend)
+        elapsed = benchmark_time(lambda: pitch_change_ndarray(samples, samplerate, n_steps, backend=backend), n_repeat=3)
+        shifted = pitch_change_ndarray(samples, samplerate, n_steps, backend=backend)
+        results[backend] = (elapsed, pitch_error(samples, shifted, samplerate, n_steps))
+    return results
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.natsumikan_pitch` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0, help="音声の長さ (秒)")
+    parser.add_argument("--samplerate", type=int, default=24000, help="サンプリング周波数")
+    parser.add_argument("--n-steps", type=float, default=3.6, help="変える半音の数")
+    args = parser.parse_args()
+
+    samples = synthetic_voice(args.samplerate, args.seconds)
+    for backend, (elapsed, cents) in benchmark_pitch(samples, args.samplerate, args.n_steps).items():
+        print(f"{backend}: {elapsed:.4f} sec (RTF {elapsed / args.seconds:.4f}), F0 error {cents:.1f} cents")
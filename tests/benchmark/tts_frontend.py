@@ -0,0 +1,81 @@
+"""フルコンテキストラベルから音響モデルの入力の配列を作る時間の測定"""
+
+import argparse
+import re
+
+import numpy as np
+
+from tests.benchmark.utility import benchmark_time
+
+SENTENCES = [
+    "こんにちは、ヒホです。",
+    "今日はいい天気ですね。",
+    "明日の会議は何時からですか？",
+    "音声合成のための学習データを準備しています。",
+]
+
+
+def _numeric_feature_by_regex(regex: str, s: str) -> int:
+    match = re.search(regex, s)
+    return 0 if match is None else int(match.group(1))
+
+
+def encode_labels_loop(labels_batch: list[list[str]]) -> list[dict[str, np.ndarray]]:
+    """比較用: pyopenjtalk_g2p_prosody と同じくラベルを 1 つずつ正規表現で読み，発話ごとに配列にする実装"""
+    from kabosu_core.io.tts.frontend import PHONEME_TO_ID, PROSODY_FALL, PROSODY_PHRASE_BOUNDARY, PROSODY_RISE, UNK_ID
+
+    outputs = []
+    for labels in labels_batch:
+        phonemes, accents, prosody, positions, positions_backward = [], [], [], [], []
+        for n, label in enumerate(labels):
+            p3 = re.search(r"\-(.*?)\+", label).group(1)
+            if p3 in "AEIOU":
+                p3 = p3.lower()
+            phonemes.append(PHONEME_TO_ID.get(p3, UNK_ID))
+            if p3 in ("sil", "pau"):
+                accents.append(0), prosody.append(0), positions.append(0), positions_backward.append(0)
+                continue
+            a1 = _numeric_feature_by_regex(r"/A:([0-9\-]+)\+", label)
+            a2 = _numeric_feature_by_regex(r"\+(\d+)\+", label)
+            a3 = _numeric_feature_by_regex(r"\+(\d+)/", label)
+            f1 = _numeric_feature_by_regex(r"/F:(\d+)_", label)
+            f2 = _numeric_feature_by_regex(r"/F:\d+_(\d+)#", label)
+            a2_next = _numeric_feature_by_regex(r"\+(\d+)\+", labels[n + 1])
+            accents.append(int(f2 == 1 if a2 == 1 else (f2 == 0 or a2 <= f2)))
+            if a3 == 1 and a2_next == 1 and p3 in "aeiouAEIOUNcl":
+                prosody.append(PROSODY_PHRASE_BOUNDARY)
+            elif a1 == 0 and a2_next == a2 + 1 and a2 != f1:
+                prosody.append(PROSODY_FALL)
+            elif a2 == 1 and a2_next == 2:
+                prosody.append(PROSODY_RISE)
+            else:
+                prosody.append(0)
+            positions.append(a2)
+            positions_backward.append(a3)
+        outputs.append({"phonemes": np.array(phonemes), "accents": np.array(accents), "prosody": np.array(prosody),
+                        "mora_positions": np.array(positions), "mora_positions_backward": np.array(positions_backward)})
+    return outputs
+
+
+def benchmark_frontend(labels_batch: list[list[str]]) -> dict[str, float]:
+    """発話ごとのループと encode_labels の時間を測定する。"""
+    from kabosu_core.io.tts.frontend import encode_labels
+
+    return {
+        "loop": benchmark_time(lambda: encode_labels_loop(labels_batch), n_repeat=3),
+        "encode_labels": benchmark_time(lambda: encode_labels(labels_batch), n_repeat=3),
+    }
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m tests.benchmark.tts_frontend` である。
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utterances", type=int, default=10000, help="バッチの発話数")
+    args = parser.parse_args()
+
+    from kabosu_core.language import extract_fullcontext
+
+    labels = [extract_fullcontext(sentence) for sentence in SENTENCES]
+    labels_batch = [labels[i % len(labels)] for i in range(args.utterances)]
+    for name, elapsed in benchmark_frontend(labels_batch).items():
+        print(f"{name} ({args.utterances} utterances): {elapsed:.4f} sec")
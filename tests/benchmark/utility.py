@@ -0,0 +1,16 @@
+"""速度ベンチマーク用のユーティリティ"""
+
+import time
+from collections.abc import Callable
+
+
+def benchmark_time(target_function: Callable[[], object], n_repeat: int) -> float:
+    """対象関数の平均実行時間を計測する。"""
+    scores: list[float] = []
+    for _ in range(n_repeat):
+        start = time.perf_counter()
+        target_function()
+        end = time.perf_counter()
+        scores += [end - start]
+    average = sum(scores) / len(scores)
+    return average
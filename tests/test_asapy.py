@@ -0,0 +1,103 @@
+import json
+import random
+
+import pytest
+
+from kabosu_core.language.njd.ja.lib.asapy import load
+from kabosu_core.language.njd.ja.lib.asapy.load import LoadJson, build_noun_index
+from kabosu_core.language.njd.ja.lib.asapy.parse.semantic.calculate import _greedy_match_naive, greedy_match
+
+SYLLABLES = "あいうかきくさしす"
+
+
+@pytest.mark.parametrize("scores", [
+    (0.0, 0.5, 1.0, 1.0, 2.0, 2.0, 3.0),
+    (-1.0, -0.5, 0.0, 0.5, 1.0, 1.0, 2.0),
+])
+def test_greedy_match(scores):
+    rnd = random.Random(0)
+    for _ in range(5000):
+        cases = [rnd.choice("がをにで") for _ in range(rnd.randint(1, 5))]
+        chunks = [object() for _ in range(rnd.randint(0, 5))]
+        comb = [(rnd.choice(scores), case, chunk) for chunk in chunks for case in cases]
+        expected = _greedy_match_naive(comb, key=lambda c: c[1])
+        result = greedy_match(comb, key=lambda c: c[1])
+        # 事例の格は値で，文節は同一性で区別されるので両方とも is で比べる
+        assert len(result) == len(expected)
+        assert all(r is e for r, e in zip(result, expected))
+
+
+def _find_noun_linear(nouns, noun):
+    # 索引を作る前の get_frame_noun の線形探索
+    if noun:
+        for frame in nouns['dict']:
+            head = frame['head'] if frame['head'] else ''
+            support = frame['support'] if frame['support'] else ''
+            if (head == noun) or (head + support == noun) or (head == noun[:-1]) or (head + support == noun[:-1]):
+                return frame
+    return None
+
+
+def test_noun_index():
+    rnd = random.Random(0)
+    heads = [None, ""] + ["".join(rnd.choices(SYLLABLES, k=rnd.randint(1, 3))) for _ in range(30)]
+    nouns = {"dict": [
+        {"head": rnd.choice(heads), "support": rnd.choice([None, "", rnd.choice(SYLLABLES)]), "id": i}
+        for i in range(200)
+    ]}
+    # アセットを読まずに索引だけを持たせる
+    dicts = LoadJson.__new__(LoadJson)
+    dicts.nouns = nouns
+    dicts.noun_index = build_noun_index(nouns)
+
+    for noun in [""] + ["".join(rnd.choices(SYLLABLES, k=rnd.randint(1, 4))) for _ in range(3000)]:
+        expected = _find_noun_linear(nouns, noun)
+        assert dicts.get_frame_noun(noun) is expected, noun
+        assert dicts.isframe_noun(noun) == (expected is not None), noun
+
+
+@pytest.fixture
+def asset_dir(tmp_path, monkeypatch):
+    """load_resources が読む小さなアセットを一時ディレクトリに作る"""
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / load.FRAME_RESOURCE).write_text("する\t0\t10\n食べる\t10\t20", encoding="utf8")
+    for name, jsonpath in load.JSON_RESOURCES.items():
+        (assets / jsonpath).write_text(json.dumps({"dict": [{"head": name, "support": None}]}))
+    monkeypatch.setattr(load, "ASAPY_JSON_DIR", assets)
+    monkeypatch.setattr(load, "ASAPY_TSV_DIR", assets)
+    load.load_resources.cache_clear()
+    yield assets
+    load.load_resources.cache_clear()
+
+
+def test_load_resources_shared(asset_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    first = LoadJson(cache_dir=cache_dir)
+    second = LoadJson(cache_dir=cache_dir)
+    assert first.frames == {"する": (0, 10), "食べる": (10, 20)}
+    for name in ["frames", "noun_index"] + list(load.JSON_RESOURCES):
+        assert getattr(first, name) is getattr(second, name), name
+
+
+def test_load_resources_cache(asset_dir, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    nouns = LoadJson(cache_dir=cache_dir).nouns
+    (cache_file,) = cache_dir.glob(f"{load.CACHE_NAME}.*.pickle")
+
+    # 別のプロセスと同じく，パースせずに pickle から読む
+    load.load_resources.cache_clear()
+    with monkeypatch.context() as m:
+        m.setattr(load, "_load_resources", lambda: pytest.fail("parsed although the cache is valid"))
+        assert LoadJson(cache_dir=cache_dir).nouns == nouns
+
+    # アセットの中身が変わるとファイル名のハッシュが変わり，古いキャッシュは消える
+    (asset_dir / load.JSON_RESOURCES["nouns"]).write_text(json.dumps({"dict": [{"head": "犬", "support": "語"}]}))
+    load.load_resources.cache_clear()
+    dicts = LoadJson(cache_dir=cache_dir)
+    assert dicts.isframe_noun("犬語")
+    (new_cache_file,) = cache_dir.glob(f"{load.CACHE_NAME}.*.pickle")
+    assert new_cache_file != cache_file
+    assert not cache_file.exists()
@@ -20,8 +20,10 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import sys
 import unittest
 from pprint import pprint
+from unittest.mock import patch
 
 from kabosu_core.language.njd.ja.lib.asari.api import Sonar
 
@@ -46,3 +48,37 @@ class TestAPI(unittest.TestCase):
             self.assertIn("confidence", d)
             self.assertIsInstance(d["class_name"], str)
             self.assertIsInstance(d["confidence"], float)
+
+    def test_ping_batch(self):
+        sonar = Sonar(intra_op_num_threads=1)
+        texts = [self.text, "最高の一日だった", self.text]
+        res = sonar.ping_batch(texts, batch_size=2)
+        self.assertEqual(res, [sonar.ping(text) for text in texts])
+        proba = sonar.ping_batch(texts, return_proba=True)
+        self.assertEqual(proba.shape, (len(texts), len(sonar.classes)))
+        self.assertEqual(sonar.classes, [d["class_name"] for d in res[0]["classes"]])
+        for row, r in zip(proba, res):
+            self.assertEqual(sonar.classes[row.argmax()], r["top_class"])
+
+    def test_classes_without_metadata(self):
+        # the shipped pipeline was exported before train.py wrote the "classes" metadata
+        sonar = Sonar()
+        self.assertNotIn("classes", sonar.sess.get_modelmeta().custom_metadata_map)
+        self.assertIsNone(sonar.classes)
+        with patch.dict(sys.modules, {"onnx": None}):  # onnx is not a dependency
+            proba = sonar.ping_batch([self.text], return_proba=True)
+        self.assertEqual(sonar.classes, [d["class_name"] for d in sonar.ping(self.text)["classes"]])
+        self.assertEqual(proba.shape, (1, len(sonar.classes)))
+
+    def test_tokenize_batch_pool(self):
+        from kabosu_core.language.njd.ja.lib.asari import preprocess
+
+        texts = [self.text, "最高の一日だった"] * preprocess.MIN_TEXTS_PER_WORKER
+        expected = [preprocess.tokenize(text) for text in texts]
+        self.assertEqual(preprocess.tokenize_batch(texts[:10], workers=4), expected[:10])
+        self.assertNotIn(4, preprocess._executors)  # small batches stay in this process
+        self.assertEqual(preprocess.tokenize_batch(texts, workers=4), expected)
+        executor = preprocess._executors[4]
+        # a different batch size reuses the same processes
+        self.assertEqual(preprocess.tokenize_batch(texts * 3, workers=4), expected * 3)
+        self.assertIs(preprocess._executors[4], executor)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from kabosu_core.io.tts.bigvgan import BigVGANConfig, Vocoder, export_onnx
+from kabosu_core.io.tts.bigvgan.model import BigVGAN
+
+
+def _tiny_checkpoint(tmp_path, resblock="1"):
+    config = BigVGANConfig(num_mels=8, upsample_rates=[4, 2], upsample_kernel_sizes=[8, 4], upsample_initial_channel=16,
+                           resblock=resblock, resblock_kernel_sizes=[3, 5], resblock_dilation_sizes=[[1, 3], [1, 3]],
+                           sampling_rate=8000, hop_size=8)
+    torch.manual_seed(0)
+    model = BigVGAN(config)
+    for name, parameter in model.named_parameters():
+        if name.endswith("alpha") or name.endswith("beta"):
+            parameter.data.normal_(0, 0.3)
+    # 学習時のチェックポイントと同じく weight norm のパラメータで保存する
+    state_dict = {}
+    for key, value in model.state_dict().items():
+        if key.endswith(".weight") and value.dim() == 3:
+            norm = value.flatten(1).norm(dim=1).view(-1, 1, 1)
+            state_dict[key[:-len("weight")] + "weight_g"] = norm
+            state_dict[key[:-len("weight")] + "weight_v"] = 2 * value
+        else:
+            state_dict[key] = value
+    torch.save({"generator": state_dict}, tmp_path / "g.pt")
+    config.to_json(tmp_path / "config.json")
+    return model, tmp_path / "g.pt"
+
+
+@pytest.mark.parametrize("resblock", ["1", "2"])
+def test_vocoder(tmp_path, resblock):
+    model, checkpoint = _tiny_checkpoint(tmp_path, resblock)
+    mel = np.random.default_rng(0).standard_normal((8, 50)).astype(np.float32)
+    vocoder = Vocoder(checkpoint, num_threads=1)
+    audio = vocoder(mel)
+    assert audio.shape == (50 * 8,) and audio.dtype == np.float32
+    with torch.no_grad():
+        expected = model.eval()(torch.from_numpy(mel)[None]).numpy()[0, 0]
+    np.testing.assert_allclose(audio, expected, atol=1e-6)
+
+
+def test_vocoder_stream(tmp_path):
+    _, checkpoint = _tiny_checkpoint(tmp_path)
+    mel = np.random.default_rng(0).standard_normal((8, 101)).astype(np.float32)
+    vocoder = Vocoder(checkpoint)
+    expected = vocoder(mel)
+
+    for chunk_frames in [1, 7, 32, 200]:
+        stream = vocoder.stream(chunk_frames=chunk_frames)
+        outputs = [stream.push(mel[:, i:i + 13]) for i in range(0, 101, 13)]
+        audio = np.concatenate(outputs + [stream.flush()])
+        np.testing.assert_allclose(audio, expected, atol=1e-5)
+
+    pieces = list(vocoder.synthesize_stream((mel[:, i:i + 3] for i in range(0, 101, 3)), chunk_frames=10))
+    assert len(pieces) > 5
+    np.testing.assert_allclose(np.concatenate(pieces), expected, atol=1e-5)
+
+
+def test_vocoder_onnx(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    _, checkpoint = _tiny_checkpoint(tmp_path)
+    mel = np.random.default_rng(0).standard_normal((8, 40)).astype(np.float32)
+    assert export_onnx(checkpoint) == tmp_path / "g.onnx"
+    vocoder = Vocoder(checkpoint, backend="onnx", num_threads=1)
+    np.testing.assert_allclose(vocoder(mel), Vocoder(checkpoint)(mel), atol=1e-5)
+
+    stream = vocoder.stream(chunk_frames=16)
+    audio = np.concatenate([stream.push(mel[:, :25]), stream.push(mel[:, 25:]), stream.flush()])
+    np.testing.assert_allclose(audio, vocoder(mel), atol=1e-5)
@@ -0,0 +1,49 @@
+import random
+
+from kabosu_core.language.njd.en import G2p
+
+g2p = G2p()
+
+
+def test_predict_batch():
+    rnd = random.Random(0)
+    words = ["activationist", "kabosu", "yuzuponzu", "o'neill", "re-tweet", "a", ""]
+    words += ["".join(rnd.choices("abcdefghijklmnopqrstuvwxyz", k=rnd.randint(2, 14))) for _ in range(500)]
+    expected = [g2p.predict(word) for word in words]
+    assert g2p.predict_batch(words) == expected
+    assert g2p.predict_batch(words, batch_size=7) == expected
+    assert g2p.predict_batch([]) == []
+
+
+def test_lexicon():
+    from kabosu_core.language.njd.cmudict import CMULexicon, build_lexicon
+
+    entries = [("read", ["R", "EH1", "D"]), ("a", ["AH0"]), ("read", ["R", "IY1", "D"]), ("a", ["EY1"]), ("aa", ["AA1"])]
+    lexicon = CMULexicon(build_lexicon(entries))
+    assert len(lexicon) == 3
+    assert lexicon["read"] == [["R", "EH1", "D"], ["R", "IY1", "D"]]
+    assert lexicon["a"] == [["AH0"], ["EY1"]]
+    assert "aa" in lexicon and "ab" not in lexicon and "" not in lexicon
+    assert lexicon.get("ab") is None
+    assert g2p.cmu["hello"] == [["HH", "AH0", "L", "OW1"], ["HH", "EH0", "L", "OW1"]]
+
+
+def test_oov_cache(tmp_path):
+    path = tmp_path / "oov.json"
+    cached = G2p(oov_cache_size=2, oov_cache_path=path)
+    assert cached("kabosu yuzuponzu sudachi") == g2p("kabosu yuzuponzu sudachi")
+    assert len(cached.oov_cache) == 2
+    cached.save_oov_cache()
+
+    loaded = G2p(oov_cache_path=path)
+    assert loaded.oov_cache == cached.oov_cache
+
+
+def test_batch():
+    texts = ["I refuse to collect the refuse around here.", "I have $250 in my pocket.",
+             "popular pets, e.g. cats and dogs", "I'm an activationist.", ""]
+    assert g2p(texts) == [g2p(text) for text in texts]
+
+    pron1, pron2, _ = g2p.homograph2features["refuse"]
+    out = " ".join(g2p(texts[0]))
+    assert " ".join(pron1) in out and " ".join(pron2) in out
@@ -0,0 +1,50 @@
+import random
+
+from kabosu_core.language.njd.ko import G2p
+
+g2p = G2p()
+
+WORDS = ("나의 친구가 mp3 file 3개를 다운받고 있다 국민 한라산 신라 학교에 "
+         "먹는 물을 마을 라면 설날 읽다 밟고 넓죽 같이 할 수록 의자 희망").split()
+
+
+def _sentences(n):
+    rnd = random.Random(0)
+    return [" ".join(rnd.choices(WORDS, k=rnd.randint(1, 8))) for _ in range(n)]
+
+
+def test_batch():
+    sentences = _sentences(3000)
+    expected = [g2p(sentence) for sentence in sentences]
+    assert g2p.batch(sentences) == expected
+    assert g2p.batch(sentences, workers=2) == expected
+
+
+def test_batch_options():
+    sentences = _sentences(100)
+    expected = [g2p(sentence, to_hcj=True, descriptive=True) for sentence in sentences]
+    assert g2p.batch(sentences, workers=2, to_hcj=True, descriptive=True) == expected
+
+
+def test_word_cache():
+    cached = G2p(word_cache_size=1024)
+    # table.csv writes the rules as coda + "( ?)" + onset, so e.g. ᆨ + ᄀ is tensified across the space
+    assert (chr(0x11A8), chr(0x1100)) in cached.cross_word_pairs
+    sentences = list(dict.fromkeys(_sentences(1000) + ["먹을 거 할 거 살 게 갈 데", "갈 수록 할 걸 그랬다",
+                                                       "국 가 밥 값 닭 흙 꽃 옷 앞 부엌 싫 어"]))
+    for descriptive in (False, True):
+        assert [cached(s, descriptive=descriptive) for s in sentences] == \
+            [g2p(s, descriptive=descriptive) for s in sentences]
+    # each sentence is converted only once per option, so the hits come from words shared between sentences
+    assert cached._pronounce_unit.cache_info().hits > len(sentences)
+
+
+def test_jamo_tables():
+    from kabosu_core.language.njd.ko import jamo
+
+    syllables = "".join(map(chr, range(0xAC00, 0xD7A4)))
+    text = syllables + " mp3 " + "".join(map(chr, jamo._JAMO_TO_HCJ_TABLE))
+    decomposed = "".join("".join(jamo._hangul_char_to_jamo(c)) for c in text)
+    assert jamo.h2j(text) == decomposed
+    assert jamo.j2hcj(decomposed) == "".join(jamo._jamo_char_to_hcj_by_name(c) for c in decomposed)
+    assert jamo.h2hcj(text) == jamo.j2hcj(decomposed)
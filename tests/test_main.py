@@ -51,3 +51,16 @@ def test_njd_features_to_dakuten():
     dakuten_fullcontext = pyopenjtalk.extract_fullcontext("それでも、僕は知らないッ",  dakuten=True)
     assert fullcontext != dakuten_fullcontext
 
+
+def test_stream_fullcontext():
+    text = "今日はいい天気ですね。散歩に行きましょう！\n明日は雨です。"
+    results = list(pyopenjtalk.stream_fullcontext(text))
+    assert [sentence for sentence, _ in results] == ["今日はいい天気ですね。", "散歩に行きましょう！", "明日は雨です。"]
+    for sentence, labels in results:
+        assert labels == pyopenjtalk.extract_fullcontext(sentence)
+
+def test_stream_fullcontext_parallel_keeps_order():
+    lines = ["吾輩は猫である。名前はまだ無い。", "どこで生れたかとんと見当がつかぬ。"] * 4
+    sequential = list(pyopenjtalk.stream_fullcontext(lines))
+    parallel = list(pyopenjtalk.stream_fullcontext(lines, workers=2, lookahead=3))
+    assert parallel == sequential
@@ -87,3 +87,7 @@ def test__estimate_activation():
 
 def test__get_representative_emotion():
     assert mla._get_representative_emotion({'iya': ['嫌い', '嫌']}) == ('iya', ['嫌い', '嫌'])
+
+def test_analyze_batch():
+    texts = ['彼は嫌いではない！(;´Д`)', '', '気持ちがよい', 'すごい']
+    assert mla.analyze_batch(texts) == [mla.analyze(text) for text in texts]
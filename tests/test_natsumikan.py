@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+import pyworld as pw
+import soundfile as sf
+from scipy import interpolate
+
+from kabosu_core.io.tts.natsumikan import (EffectChain, WorldFeatures, add_echo_ndarray, add_reverb, change_speed_ndarray,
+                                           merge_features, merge_wav_batch, pitch_change_ndarray)
+
+
+def _reverb_loop(samples, reverberance, damping, room_scale):
+    delay_samples = int(8000 * room_scale / 100 * 0.1)
+    gain = reverberance / 100 * (1 - damping / 100)
+    reverb_samples = np.zeros_like(samples)
+    for i in range(len(samples)):
+        if i < delay_samples:
+            reverb_samples[i] = samples[i]
+        else:
+            reverb_samples[i] = samples[i] + gain * reverb_samples[i - delay_samples]
+    return reverb_samples
+
+
+def test_add_reverb():
+    samples = np.random.default_rng(0).standard_normal(5000)
+    for reverberance, damping, room_scale in [(50, 50, 75), (100, 0, 100), (60, 40, 80), (50, 50, 0)]:
+        np.testing.assert_allclose(add_reverb(samples, reverberance, damping, room_scale),
+                                   _reverb_loop(samples, reverberance, damping, room_scale), atol=1e-12)
+    stereo = np.random.default_rng(1).standard_normal((3000, 2))
+    np.testing.assert_allclose(add_reverb(stereo), _reverb_loop(stereo, 50, 50, 75), atol=1e-12)
+
+
+def test_change_speed():
+    samples = np.random.default_rng(0).standard_normal(2000)
+    f = interpolate.interp1d(range(len(samples)), samples, kind="cubic")
+    for speed in [0.5, 0.77, 1.3, 2.0]:
+        count = int((len(samples) - 1) / speed)
+        np.testing.assert_allclose(change_speed_ndarray(samples, speed), [f(i * speed) for i in range(count)], atol=1e-12)
+
+
+def test_add_echo():
+    samplerate = 16000
+    samples = np.random.default_rng(0).standard_normal(samplerate * 2).astype(np.float32) * 0.1
+    echoed = add_echo_ndarray(samples, samplerate, delay=250, num_echos=3, decay=500)
+    assert echoed.dtype == np.float32 and echoed.shape == samples.shape
+    np.testing.assert_array_equal(echoed[:4000], samples[:4000])
+    assert not np.allclose(echoed[4000:], samples[4000:])
+    np.testing.assert_array_equal(add_echo_ndarray(samples, samplerate, num_echos=0), samples)
+
+
+def test_effect_chain():
+    samplerate = 16000
+    samples = np.random.default_rng(0).standard_normal(samplerate).astype(np.float32) * 0.1
+    chain = EffectChain([("echo", {"delay": 300}), "reverb", ("speed", {"speed": 1.5}), lambda x, sr: x * 0.5])
+    out = chain(samples, samplerate)
+    expected = change_speed_ndarray(add_reverb(add_echo_ndarray(samples, samplerate, delay=300), 60, 40, 80), 1.5) * 0.5
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, expected, atol=1e-6)
+
+
+def _voice(samplerate, f0, seconds=1.0, seed=0):
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    return 0.3 * np.sin(2 * np.pi * f0 * t) + 0.01 * np.random.default_rng(seed).standard_normal(len(t))
+
+
+def test_world_features(tmp_path):
+    features = WorldFeatures.analyze(_voice(16000, 220), 16000)
+    for compress, mmap_mode in [(True, None), (False, "r")]:
+        path = tmp_path / f"speaker_{compress}.npz"
+        features.save(path, compress=compress)
+        loaded = WorldFeatures.load(path, mmap_mode=mmap_mode)
+        assert isinstance(loaded.sp, np.memmap) == (mmap_mode is not None)
+        for name in ["f0", "sp", "ap", "raw_f0"]:
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(features, name))
+        assert (loaded.samplerate, loaded.frame_period) == (features.samplerate, features.frame_period)
+
+
+def test_merge_wav_batch(tmp_path):
+    speaker = WorldFeatures.analyze(_voice(16000, 220), 16000)
+    speaker.save(tmp_path / "speaker.npz", compress=False)
+    paths = []
+    for i, f0 in enumerate([110, 130]):
+        paths.append(tmp_path / f"base{i}.wav")
+        sf.write(paths[-1], _voice(16000, f0, seed=i + 1), 16000)
+
+    outputs = merge_wav_batch(paths, tmp_path / "speaker.npz", tmp_path / "out")
+    for path, output in zip(paths, outputs):
+        base = WorldFeatures.analyze(sf.read(path)[0], 16000)
+        converted, _ = sf.read(output)
+        assert converted.shape == merge_features(base, speaker).shape
+
+
+def test_merge_wav_batch_same_name(tmp_path):
+    speaker = WorldFeatures.analyze(_voice(16000, 220), 16000)
+    paths = [tmp_path / "a" / "x.wav", tmp_path / "b" / "x.wav", tmp_path / "b" / "c" / "x.wav"]
+    for i, path in enumerate(paths):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(path, _voice(16000, 110, seconds=0.5 + 0.1 * i, seed=i + 1), 16000)
+
+    # 入力の共通の親からの相対パスで書き出すので，同じ名前でも上書きし合わない
+    outputs = merge_wav_batch(paths, speaker, tmp_path / "out", workers=2)
+    assert outputs == [tmp_path / "out" / "a" / "x.wav", tmp_path / "out" / "b" / "x.wav",
+                       tmp_path / "out" / "b" / "c" / "x.wav"]
+    for path, output in zip(paths, outputs):
+        base = WorldFeatures.analyze(sf.read(path)[0], 16000)
+        assert sf.read(output)[0].shape == merge_features(base, speaker).shape
+
+    with pytest.raises(ValueError):
+        merge_wav_batch([paths[0], paths[0]], speaker, tmp_path / "out")
+
+
+def test_effect_chain_streaming(tmp_path):
+    samplerate = 16000
+    samples = (_voice(samplerate, 150, seconds=5.0) + 0.2 * _voice(samplerate, 0, seconds=5.0, seed=3)).astype(np.float32)
+    sf.write(tmp_path / "input.wav", samples, samplerate, subtype="FLOAT")
+    chain = EffectChain([("echo", {"delay": 300, "num_echos": 4}), "reverb", ("speed", {"speed": 1.37}), "reverb"])
+    chain.process_file(tmp_path / "input.wav", tmp_path / "memory.wav")
+    for blocksize in [1000, 65536]:
+        chain.process_file(tmp_path / "input.wav", tmp_path / "stream.wav", blocksize=blocksize)
+        np.testing.assert_allclose(sf.read(tmp_path / "stream.wav")[0], sf.read(tmp_path / "memory.wav")[0], atol=1e-4)
+
+
+def test_effect_chain_streaming_list_spec(tmp_path):
+    samplerate = 16000
+    sf.write(tmp_path / "input.wav", _voice(samplerate, 150).astype(np.float32), samplerate, subtype="FLOAT")
+    # JSON から読んだ指定は (名前, パラメータ) が list になる
+    EffectChain([["echo", {"delay": 300}]]).process_file(tmp_path / "input.wav", tmp_path / "stream.wav", blocksize=1000)
+    EffectChain([("echo", {"delay": 300})]).process_file(tmp_path / "input.wav", tmp_path / "memory.wav")
+    np.testing.assert_allclose(sf.read(tmp_path / "stream.wav")[0], sf.read(tmp_path / "memory.wav")[0], atol=1e-4)
+
+    for effect in ["robot", lambda samples, samplerate: samples]:
+        with pytest.raises(ValueError, match="streaming"):
+            EffectChain([effect]).process_file(tmp_path / "input.wav", tmp_path / "stream.wav", blocksize=1000)
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_effect_chain_streaming_pitch(tmp_path, channels):
+    samplerate = 16000
+    samples = _voice(samplerate, 150, seconds=3.0).astype(np.float32)
+    if channels == 2:
+        samples = np.stack([samples, 0.5 * samples], axis=1)
+    sf.write(tmp_path / "input.wav", samples, samplerate, subtype="FLOAT")
+    # チャンクより長い入力で，重ね合わせと flush の両方を通す
+    chain = EffectChain([("pitch_change", {"n_steps": 4, "chunk": 1.0, "backend": "psola"})])
+    for blocksize in [1000, 65536]:
+        chain.process_file(tmp_path / "input.wav", tmp_path / "stream.wav", blocksize=blocksize)
+        streamed, _ = sf.read(tmp_path / "stream.wav")
+        assert streamed.shape == samples.shape
+        assert np.all(np.isfinite(streamed)) and np.abs(streamed).max() > 0
+
+
+@pytest.mark.parametrize("backend", ["world", "psola"])
+@pytest.mark.parametrize("n_steps", [4, -3])
+def test_pitch_backends(backend, n_steps):
+    samplerate = 16000
+    samples = _voice(samplerate, 150)
+    shifted = pitch_change_ndarray(samples, samplerate, n_steps, backend=backend)
+    assert shifted.shape == samples.shape
+
+    f0, _ = pw.harvest(np.ascontiguousarray(shifted, dtype=np.float64), samplerate)
+    cents = 1200 * np.log2(np.median(f0[f0 > 0]) / (150 * 2 ** (n_steps / 12)))
+    assert abs(cents) < 30
+
+
+def test_pitch_backend_unknown():
+    with pytest.raises(ValueError):
+        pitch_change_ndarray(np.zeros(100), 16000, 2, backend="rubberband")
+
+
+def test_run_augmentation(tmp_path):
+    from kabosu_core.io.tts.natsumikan_augment import plan_jobs, read_manifest, run_augmentation
+
+    (tmp_path / "corpus" / "a").mkdir(parents=True)
+    for name in ["a/1.wav", "a/2.wav", "3.wav"]:
+        sf.write(tmp_path / "corpus" / name, _voice(16000, 150, 0.5), 16000)
+    (tmp_path / "corpus" / "list.txt").write_text("a/1.wav\na/2.wav\n# comment\n3.wav\n")
+    inputs = read_manifest(tmp_path / "corpus" / "list.txt")
+    spec = {"seed": 1, "variants": [
+        {"name": "noisy", "effects": [["white_noise", {"noise_level": [0.01, 0.05]}]]},
+        {"name": "room", "count": 2, "effects": [["reverb", {"reverberance": [30, 80]}], ("speed", {"speed": {"choice": [0.9, 1.1]}})]},
+    ]}
+    jobs = plan_jobs(inputs, spec, tmp_path / "out")
+    assert len(jobs) == 9
+    assert jobs == plan_jobs(inputs, spec, tmp_path / "out")
+    assert {job["output"] for job in jobs} >= {str(tmp_path / "out" / "room" / "a" / "1_1.wav"), str(tmp_path / "out" / "noisy" / "3.wav")}
+
+    stats = run_augmentation(inputs[:2], spec, tmp_path / "out", workers=2, input_root=tmp_path / "corpus")
+    assert stats["reverb"].files == 4 and stats["white_noise"].files == 2
+    first = sf.read(tmp_path / "out" / "noisy" / "a" / "1.wav")[0]
+
+    # 再開すると残りのファイルだけを処理する
+    (tmp_path / "out" / "noisy" / "a" / "1.wav").unlink()
+    stats = run_augmentation(inputs, spec, tmp_path / "out")
+    assert stats["reverb"].files == 2 and stats["white_noise"].files == 2
+    np.testing.assert_array_equal(sf.read(tmp_path / "out" / "noisy" / "a" / "1.wav")[0], first)
+    assert len((tmp_path / "out" / "manifest.jsonl").read_text().splitlines()) == 10
+    assert run_augmentation(inputs, spec, tmp_path / "out") == {}
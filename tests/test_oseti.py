@@ -88,3 +88,19 @@ def test_analyze_detail():
     assert actual == [{'positive': [], 'negative': ['お金-NEGATION', '希望-NEGATION'], 'score': -1.0}]
     actual = a.analyze_detail('お金がないわけではない')
     assert actual == [{'positive': ['お金'], 'negative': [], 'score': 1.0}]
+
+def test_lookup_wago_user_dict():
+    a = oseti.Analyzer(wago_dict={'尻 が 重い': 'ネガ（評価）'})
+    actual = a._lookup_wago('重い', ['腰', '尻', 'が'])
+    assert actual == '尻 が 重い'
+    b = oseti.Analyzer()
+    assert b._lookup_wago('重い', ['腰', '尻', 'が']) == ''
+
+def test_analyze_batch():
+    a = oseti.Analyzer()
+    texts = ['遅刻したけど楽しかったし嬉しかった。すごく充実した！',
+             'そこにはいつもと変わらない日常があった。',
+             'お金も希望もない！すごく充実した！']
+    assert a.analyze_batch(texts) == [a.analyze(text) for text in texts]
+    assert a.analyze_batch(texts, detail=True) == [a.analyze_detail(text) for text in texts]
+    assert a.analyze_batch(texts, count=True) == [a.count_polarity(text) for text in texts]
@@ -0,0 +1,13 @@
+import pytest
+
+from kabosu_core.profile_startup import TARGETS, profile_import
+
+# import だけで重い依存を読み込むと数秒かかる。手元では各モジュール 50 ms 程度なので，余裕を持たせた上限
+IMPORT_TIME_BUDGET = 1.0
+
+
+@pytest.mark.parametrize("module", TARGETS)
+def test_import_budget(module):
+    result = profile_import(module)
+    assert result["heavy_modules"] == []
+    assert result["seconds"] < IMPORT_TIME_BUDGET, result["slowest"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from kabosu_core.io.tts.frontend import PHONEME_TO_ID, PROSODY_FALL, PROSODY_NONE, PROSODY_RISE, encode_labels
+
+# pyopenjtalk.extract_fullcontext("こんにちは、ヒホです。") の出力
+HELLO_HIHO = [
+    "xx^xx-sil+k=o/A:xx+xx+xx/B:xx-xx_xx/C:xx_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:xx_xx#xx_xx@xx_xx|xx_xx/G:5_5%0_xx_xx/H:xx_xx/I:xx-xx@xx+xx&xx-xx|xx+xx/J:1_5/K:2+2-9",
+    "xx^sil-k+o=N/A:-4+1+5/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "sil^k-o+N=n/A:-4+1+5/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "k^o-N+n=i/A:-3+2+4/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "o^N-n+i=ch/A:-2+3+3/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "N^n-i+ch=i/A:-2+3+3/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "n^i-ch+i=w/A:-1+4+2/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "i^ch-i+w=a/A:-1+4+2/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "ch^i-w+a=pau/A:0+5+1/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "i^w-a+pau=h/A:0+5+1/B:xx-xx_xx/C:09_xx+xx/D:09+xx_xx/E:xx_xx!xx_xx-xx/F:5_5#0_xx@1_1|1_5/G:4_1%0_xx_0/H:xx_xx/I:1-5@1+2&1-2|1+9/J:1_4/K:2+2-9",
+    "w^a-pau+h=i/A:xx+xx+xx/B:09-xx_xx/C:xx_xx+xx/D:09+xx_xx/E:5_5!0_xx-xx/F:xx_xx#xx_xx@xx_xx|xx_xx/G:4_1%0_xx_xx/H:1_5/I:xx-xx@xx+xx&xx-xx|xx+xx/J:1_4/K:2+2-9",
+    "a^pau-h+i=h/A:0+1+4/B:09-xx_xx/C:09_xx+xx/D:22+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "pau^h-i+h=o/A:0+1+4/B:09-xx_xx/C:09_xx+xx/D:22+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "h^i-h+o=d/A:1+2+3/B:09-xx_xx/C:22_xx+xx/D:10+7_2/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "i^h-o+d=e/A:1+2+3/B:09-xx_xx/C:22_xx+xx/D:10+7_2/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "h^o-d+e=s/A:2+3+2/B:22-xx_xx/C:10_7+2/D:xx+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "o^d-e+s=U/A:2+3+2/B:22-xx_xx/C:10_7+2/D:xx+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "d^e-s+U=sil/A:3+4+1/B:22-xx_xx/C:10_7+2/D:xx+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "e^s-U+sil=xx/A:3+4+1/B:22-xx_xx/C:10_7+2/D:xx+xx_xx/E:5_5!0_xx-0/F:4_1#0_xx@1_1|1_4/G:xx_xx%xx_xx_xx/H:1_5/I:1-4@2+1&2-1|6+4/J:xx_xx/K:2+2-9",
+    "s^U-sil+xx=xx/A:xx+xx+xx/B:10-7_2/C:xx_xx+xx/D:xx+xx_xx/E:4_1!0_xx-xx/F:xx_xx#xx_xx@xx_xx|xx_xx/G:xx_xx%xx_xx_xx/H:1_4/I:xx-xx@xx+xx&xx-xx|xx+xx/J:xx_xx/K:2+2-9",
+]
+
+
+def test_encode_labels():
+    question = [label.replace("!0_xx-xx", "!1_xx-xx") if label.startswith("s^U-sil") else label for label in HELLO_HIHO]
+    batch = encode_labels([HELLO_HIHO, HELLO_HIHO[:1] + HELLO_HIHO[11:], question])
+    assert batch.phonemes.shape == (3, 20) and batch.phonemes.dtype == np.int64
+    np.testing.assert_array_equal(batch.lengths, [20, 10, 20])
+    np.testing.assert_array_equal(batch.is_question, [False, False, True])
+
+    phonemes = "sil k o N n i ch i w a pau h i h o d e s u sil".split()
+    np.testing.assert_array_equal(batch.phonemes[0], [PHONEME_TO_ID[p] for p in phonemes])
+    np.testing.assert_array_equal(batch.accents[0], [0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0])
+    np.testing.assert_array_equal(batch.mora_positions[0], [0, 1, 1, 2, 3, 3, 4, 4, 5, 5, 0, 1, 1, 2, 2, 3, 3, 4, 4, 0])
+    np.testing.assert_array_equal(batch.mora_positions_backward[0], [0, 5, 5, 4, 3, 3, 2, 2, 1, 1, 0, 4, 4, 3, 3, 2, 2, 1, 1, 0])
+    prosody = np.full(20, PROSODY_NONE)
+    prosody[2], prosody[12] = PROSODY_RISE, PROSODY_FALL  # "ko[Nnichiwa", "hi]hodesu"
+    np.testing.assert_array_equal(batch.prosody[0], prosody)
+
+    # 2 つ目の発話はパディングされる
+    assert (batch.phonemes[1, 10:] == 0).all() and not batch.mask[1, 10:].any()
+    np.testing.assert_array_equal(batch.phonemes[1, :10], [PHONEME_TO_ID[p] for p in ["sil"] + phonemes[11:]])
+
+    # 無声化した母音を残す
+    assert encode_labels([HELLO_HIHO], drop_unvoiced_vowels=False).phonemes[0, 18] == PHONEME_TO_ID["U"]
+
+    with pytest.raises(ValueError):
+        encode_labels([["sil"]])
+
+
+def test_encode_labels_to_torch():
+    pytest.importorskip("torch")
+    batch = encode_labels([HELLO_HIHO])
+    tensors = batch.to_torch()
+    tensors["phonemes"][0, 1] = 0
+    assert batch.phonemes[0, 1] == 0